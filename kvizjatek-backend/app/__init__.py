@@ -1,6 +1,6 @@
 from flask import Flask
 from config import Config
-from .extensions import db, jwt, migrate, ma
+from .extensions import db, jwt, migrate, ma, jobs, question_pool, ai_cache, ai_client, question_index, ai_metrics, table_versions, quiz_cache, quiz_search, quick_play, answer_keys, result_writer
 
 def create_app(config_class=Config):
 
@@ -12,6 +12,18 @@ def create_app(config_class=Config):
     jwt.init_app(app)
     migrate.init_app(app, db)
     ma.init_app(app)
+    jobs.init_app(app)
+    question_pool.init_app(app)
+    ai_cache.init_app(app)
+    ai_client.init_app(app)
+    question_index.init_app(app)
+    ai_metrics.init_app(app)
+    table_versions.init_app(app)
+    quiz_cache.init_app(app)
+    quiz_search.init_app(app)
+    quick_play.init_app(app)
+    answer_keys.init_app(app)
+    result_writer.init_app(app)
     
     from .api.auth import auth_bp
     from .api.topics import topics_bp
@@ -29,6 +41,9 @@ def create_app(config_class=Config):
     app.register_blueprint(profile_bp, url_prefix='/api/profile')
     app.register_blueprint(leaderboard_bp, url_prefix='/api/leaderboard')
 
+    from .cli import register_commands
+    register_commands(app)
+
     @app.route('/api/health')
     def health_check():
         return {"status": "ok"}, 200
@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+import time
+from flask import current_app
+from .caching import LRUCache
+
+def normalize_text(value):
+    """Case-folds and collapses whitespace, so "Roman  history" == "roman History"."""
+    return ' '.join(str(value).split()).casefold()
+
+def make_cache_key(topic, difficulty, num_questions):
+    return json.dumps([normalize_text(topic), normalize_text(difficulty), int(num_questions)])
+
+class SQLiteCacheTier:
+    """
+    Optional persistent tier of the AI response cache.
+    A plain SQLite file (separate from the application database),
+    so cached generations survive restarts and are shared by all workers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_response_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM ai_response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl if ttl else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM ai_response_cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM ai_response_cache")
+
+class AICache:
+    """
+    Response cache in front of generate_quiz_questions.
+
+    Keys are the normalized (topic, difficulty, num_questions) triple.
+    Values are the generated question lists, stored JSON encoded, so every
+    hit hands out fresh objects. Lookups go to the in-process LRU first,
+    then to the optional SQLite tier (AI_CACHE_SQLITE_PATH).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_CACHE_ENABLED', True)
+        app.config.setdefault('AI_CACHE_TTL', 3600)
+        app.config.setdefault('AI_CACHE_MAX_ENTRIES', 256)
+        app.config.setdefault('AI_CACHE_SQLITE_PATH', None)
+
+        path = app.config['AI_CACHE_SQLITE_PATH']
+        app.extensions['ai_cache'] = {
+            'memory': LRUCache(app.config['AI_CACHE_MAX_ENTRIES'], app.config['AI_CACHE_TTL']),
+            'persistent': SQLiteCacheTier(path) if path else None,
+            'lock': threading.Lock(),
+            'persistent_hits': 0,
+        }
+
+    def _state(self):
+        return current_app.extensions['ai_cache']
+
+    @property
+    def enabled(self):
+        return current_app.config['AI_CACHE_ENABLED']
+
+    def get(self, topic, difficulty, num_questions):
+        """Returns the cached question list or None."""
+        state = self._state()
+        key = make_cache_key(topic, difficulty, num_questions)
+
+        raw = state['memory'].get(key)
+        if raw is None and state['persistent'] is not None:
+            raw = state['persistent'].get(key)
+            if raw is not None:
+                # Promote into the in-process tier
+                state['memory'].set(key, raw)
+                with state['lock']:
+                    state['persistent_hits'] += 1
+
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, topic, difficulty, num_questions, questions):
+        state = self._state()
+        key = make_cache_key(topic, difficulty, num_questions)
+        raw = json.dumps(questions)
+
+        state['memory'].set(key, raw)
+        if state['persistent'] is not None:
+            state['persistent'].set(key, raw, current_app.config['AI_CACHE_TTL'])
+
+    def delete(self, topic, difficulty, num_questions):
+        state = self._state()
+        key = make_cache_key(topic, difficulty, num_questions)
+
+        state['memory'].delete(key)
+        if state['persistent'] is not None:
+            state['persistent'].delete(key)
+
+    def clear(self):
+        state = self._state()
+        state['memory'].clear()
+        if state['persistent'] is not None:
+            state['persistent'].clear()
+
+    def stats(self):
+        state = self._state()
+        stats = state['memory'].stats()
+        # A persistent hit is counted as a miss by the in-process tier
+        stats['persistent_hits'] = state['persistent_hits']
+        stats['misses'] -= state['persistent_hits']
+        stats['hits'] += state['persistent_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+        stats['enabled'] = self.enabled
+        stats['persistent'] = state['persistent'] is not None
+        return stats
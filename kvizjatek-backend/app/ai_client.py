@@ -0,0 +1,171 @@
+import threading
+import time
+from contextlib import contextmanager
+import openai
+from flask import current_app
+
+class UpstreamError(Exception):
+    """Base class for non-OpenAI provider failures that should trip the circuit breaker."""
+
+# Upstream failures that count against the circuit breaker.
+# Client side problems (bad request, auth, invalid JSON from the model) do not.
+UPSTREAM_ERRORS = (
+    openai.APIConnectionError, # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+    UpstreamError,
+)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the AI API while the circuit breaker is open."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(
+            f"The AI service failed repeatedly, requests are suspended for {retry_after:.0f} more seconds."
+        )
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    After `failure_threshold` consecutive upstream failures the circuit opens
+    and calls fail fast for `reset_timeout` seconds. Then a single trial call
+    is let through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half_open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Ends a call without a verdict (it was abandoned), so the next one may be the trial."""
+        with self._lock:
+            self.trial_in_flight = False
+
+class AIClientManager:
+    """
+    App-scoped owner of the OpenAI client.
+
+    One client (and with it one HTTP connection pool with keep-alive) is
+    created lazily per application and reused by every request and job,
+    instead of paying connection and TLS setup on each generation.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('OPENAI_CONNECT_TIMEOUT', 5.0)
+        app.config.setdefault('OPENAI_READ_TIMEOUT', 60.0)
+        app.config.setdefault('OPENAI_MAX_RETRIES', 2)
+        app.config.setdefault('AI_CIRCUIT_FAILURE_THRESHOLD', 5)
+        app.config.setdefault('AI_CIRCUIT_RESET_TIMEOUT', 30)
+        app.extensions['ai_client'] = {
+            'client': None,
+            'lock': threading.Lock(),
+            'breaker': CircuitBreaker(
+                app.config['AI_CIRCUIT_FAILURE_THRESHOLD'],
+                app.config['AI_CIRCUIT_RESET_TIMEOUT']
+            ),
+        }
+
+    def _state(self):
+        return current_app.extensions['ai_client']
+
+    @property
+    def breaker(self):
+        return self._state()['breaker']
+
+    def get_client(self):
+        """
+        Returns the shared OpenAI client, creating it on first use.
+        Raises ValueError if OPENAI_API_KEY is not configured.
+        """
+        state = self._state()
+        if state['client'] is not None:
+            return state['client']
+
+        config = current_app.config
+        if not config.get('OPENAI_API_KEY'):
+            raise ValueError("OPENAI_API_KEY is not configured in the application config.")
+
+        with state['lock']:
+            if state['client'] is None:
+                state['client'] = openai.OpenAI(
+                    api_key=config['OPENAI_API_KEY'],
+                    # None falls back to the default OpenAI endpoint
+                    base_url=config.get('OPENAI_BASE_URL') or None,
+                    timeout=openai.Timeout(config['OPENAI_READ_TIMEOUT'], connect=config['OPENAI_CONNECT_TIMEOUT']),
+                    max_retries=config['OPENAI_MAX_RETRIES'],
+                )
+        return state['client']
+
+    @contextmanager
+    def circuit(self):
+        """
+        Guards one upstream call with the circuit breaker.
+        Raises CircuitOpenError without calling the API while the circuit is open.
+        A streamed response is guarded until it has been read to the end.
+        """
+        breaker = self.breaker
+        breaker.before_call()
+        try:
+            yield
+        except UPSTREAM_ERRORS:
+            breaker.record_failure()
+            raise
+        except Exception:
+            # The API answered, the failure is on our side of the call
+            breaker.record_success()
+            raise
+        except BaseException:
+            # Abandoned mid-call (e.g. the streaming client went away)
+            breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+
+    def close(self):
+        state = self._state()
+        with state['lock']:
+            if state['client'] is not None:
+                state['client'].close()
+                state['client'] = None
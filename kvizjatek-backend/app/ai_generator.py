@@ -1,48 +1,20 @@
 import json
-from openai import OpenAI
+import re
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
+from .ai_cache import normalize_text
+from .ai_client import CircuitOpenError
+from .ai_providers import get_ai_provider
+from .extensions import ai_cache, ai_client, ai_metrics
 
-def get_ai_client():
-    """
-    Initializes and returns the OpenAI client configured 
-    with the api_key from the app config.
-    """
-    api_key = current_app.config.get('OPENAI_API_KEY')
-    
-    # Check for required configuration
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY is not configured in the application config.")
-        
-    client = OpenAI(
-        api_key=api_key
-        # No base_url is needed, client defaults to OpenAI's API
-    )
-    return client
-
-def generate_quiz_questions(topic, difficulty, num_questions=5):
-    """
-    Generates a list of quiz questions using the configured OpenAI model.
-    
-    Args:
-        topic (str): The topic for the quiz (e.g., "Roman History").
-        difficulty (str): The difficulty (e.g., "Medium").
-        num_questions (int): The number of questions to generate (default 5).
-
-    Returns:
-        list: A list of question objects formatted for the database.
-        dict: An error dictionary if the request fails.
-    """
-    
-    try:
-        client = get_ai_client()
-    except ValueError as e:
-        # This catches the missing API key error
-        return {"error": "Configuration Error", "details": str(e)}
+# The model itself is reached through the provider selected by AI_PROVIDER
+# (app.ai_providers): the OpenAI API or the offline load-testing stand-in.
 
+def _build_system_prompt(topic, difficulty, num_questions, exclude=None):
     # This system prompt is optimized for JSON mode.
     # It asks for a JSON object with a specific key ("questions")
     # which aligns perfectly with response_format={"type": "json_object"}.
-    system_prompt = f"""
+    prompt = f"""
         You are an expert quiz generator. Your task is to generate {num_questions} multiple-choice quiz questions
         on the topic of "{topic}" with a difficulty of "{difficulty}".
         
@@ -63,41 +35,283 @@ def generate_quiz_questions(topic, difficulty, num_questions=5):
         - "correct_option_index" MUST be the integer index (0, 1, 2, or 3) of the correct answer.
         - Ensure the correct answer's position is varied across questions.
     """
+
+    if exclude:
+        # Used by fan-out top-ups and replacements: steer the model away from known questions
+        prompt += "\n        The following questions already exist. Do NOT repeat or rephrase any of them:\n"
+        prompt += ''.join(f"        - {text}\n" for text in exclude)
+
+    return prompt
+
+def generate_quiz_questions(topic, difficulty, num_questions=5, use_cache=True):
+    """
+    Generates a list of quiz questions using the configured AI provider.
+    Successful generations are cached by the normalized
+    (topic, difficulty, num_questions) key, see app.ai_cache.
     
-    try:
-        completion = client.chat.completions.create(
-            # This is the model you requested
-            model="gpt-5-nano", 
-            messages=[
-                {"role": "system", "content": system_prompt}
-            ],
-            temperature=1,
-            # This forces the model to output a valid JSON object
-            response_format={"type": "json_object"}, 
+    Args:
+        topic (str): The topic for the quiz (e.g., "Roman History").
+        difficulty (str): The difficulty (e.g., "Medium").
+        num_questions (int): The number of questions to generate (default 5).
+        use_cache (bool): Set to False to always call the model (default True).
+
+    Returns:
+        list: A list of question objects formatted for the database.
+        dict: An error dictionary if the request fails.
+    """
+    use_cache = use_cache and ai_cache.enabled
+
+    if use_cache:
+        cached = ai_cache.get(topic, difficulty, num_questions)
+        if cached is not None:
+            return cached
+
+    if current_app.config.get('AI_FANOUT_ENABLED') and num_questions > current_app.config['AI_FANOUT_CHUNK_SIZE']:
+        questions = _fan_out_quiz_questions(topic, difficulty, num_questions)
+    else:
+        questions = _request_quiz_questions(topic, difficulty, num_questions)
+
+    if use_cache and isinstance(questions, list) and questions:
+        ai_cache.set(topic, difficulty, num_questions, questions)
+
+    return questions
+
+def generate_replacement_questions(topic, difficulty, num_questions, exclude):
+    """
+    Asks for `num_questions` fresh questions that differ from the `exclude`
+    question texts, e.g. to replace near-duplicates of stored questions.
+    Never cached. Same return contract as generate_quiz_questions.
+    """
+    return _request_quiz_questions(topic, difficulty, num_questions, exclude=exclude)
+
+def _question_tokens(question):
+    return frozenset(re.findall(r'\w+', normalize_text(question.get('question_text', ''))))
+
+def _is_near_duplicate(tokens, seen_tokens, threshold):
+    """Jaccard similarity of the question words against every question kept so far."""
+    for other in seen_tokens:
+        union = len(tokens | other)
+        if union and len(tokens & other) / union >= threshold:
+            return True
+    return False
+
+def _merge_unique(questions, kept, kept_tokens, threshold):
+    """Appends the questions that are not (near-)duplicates of the kept ones."""
+    for question in questions:
+        if not isinstance(question, dict):
+            continue
+        tokens = _question_tokens(question)
+        if _is_near_duplicate(tokens, kept_tokens, threshold):
+            continue
+        kept.append(question)
+        kept_tokens.append(tokens)
+
+def _fan_out_quiz_questions(topic, difficulty, num_questions):
+    """
+    Splits a large request into AI_FANOUT_CHUNK_SIZE sized completions that
+    run concurrently, so the wall-clock time follows the chunk size instead
+    of the total count. Results are merged, (near-)duplicates dropped and a
+    single top-up call asked for whatever is still missing.
+    Same return contract as generate_quiz_questions.
+    """
+    app = current_app._get_current_object()
+    chunk_size = app.config['AI_FANOUT_CHUNK_SIZE']
+    threshold = app.config['AI_FANOUT_SIMILARITY_THRESHOLD']
+
+    # e.g. 15 -> [5, 5, 5], 12 -> [4, 4, 4] instead of [5, 5, 2]
+    num_chunks = -(-num_questions // chunk_size)
+    chunks = [num_questions // num_chunks + (1 if i < num_questions % num_chunks else 0) for i in range(num_chunks)]
+
+    def run_chunk(size):
+        with app.app_context():
+            return _request_quiz_questions(topic, difficulty, size)
+
+    with ThreadPoolExecutor(max_workers=min(num_chunks, app.config['AI_FANOUT_MAX_WORKERS'])) as executor:
+        responses = list(executor.map(run_chunk, chunks))
+
+    errors = [r for r in responses if isinstance(r, dict)]
+    if len(errors) == len(responses):
+        return errors[0]
+
+    kept, kept_tokens = [], []
+    for response in responses:
+        if isinstance(response, list):
+            _merge_unique(response, kept, kept_tokens, threshold)
+
+    missing = num_questions - len(kept)
+    if missing > 0:
+        top_up = _request_quiz_questions(
+            topic, difficulty, missing, exclude=[q.get('question_text', '') for q in kept]
         )
-        
-        raw_response = completion.choices[0].message.content
-        data = json.loads(raw_response)
-        
-        # Robustly extract the list of questions from the expected key
-        if not isinstance(data, dict) or "questions" not in data:
-            raise json.JSONDecodeError(
-                "AI response was not a dict or missing the 'questions' key.",
-                raw_response, 0
-            )
-        
-        questions_list = data.get("questions")
-        
-        if not isinstance(questions_list, list):
-             raise json.JSONDecodeError(
-                "AI response 'questions' key did not contain a list.",
-                raw_response, 0
-            )
+        if isinstance(top_up, list):
+            _merge_unique(top_up, kept, kept_tokens, threshold)
+
+    return kept[:num_questions]
+
+def _request_quiz_questions(topic, difficulty, num_questions, exclude=None):
+    """
+    Calls the model for a fresh set of questions (no caching).
+    Same return contract as generate_quiz_questions.
+    """
+    
+    try:
+        provider = get_ai_provider()
+        provider.prepare()
+    except ValueError as e:
+        # This catches the missing API key error
+        return {"error": "Configuration Error", "details": str(e)}
+
+    system_prompt = _build_system_prompt(topic, difficulty, num_questions, exclude)
+    
+    try:
+        with ai_metrics.track('complete', provider, num_questions) as call:
+            with ai_client.circuit():
+                raw_response = provider.complete(system_prompt, topic, difficulty, num_questions, call)
+
+            data = json.loads(raw_response)
+
+            # Robustly extract the list of questions from the expected key
+            if not isinstance(data, dict) or "questions" not in data:
+                call.outcome = 'schema_error'
+                raise json.JSONDecodeError(
+                    "AI response was not a dict or missing the 'questions' key.",
+                    raw_response, 0
+                )
+
+            questions_list = data.get("questions")
+
+            if not isinstance(questions_list, list):
+                call.outcome = 'schema_error'
+                raise json.JSONDecodeError(
+                    "AI response 'questions' key did not contain a list.",
+                    raw_response, 0
+                )
 
         return questions_list
 
+    except CircuitOpenError as e:
+        # Fail fast while the upstream is known to be down
+        return {"error": "AI service temporarily unavailable", "details": str(e), "retry_after": round(e.retry_after)}
     except json.JSONDecodeError as e:
         return {"error": "AI returned invalid JSON or unexpected schema", "details": str(e), "raw_response": raw_response}
     except Exception as e:
         # Handle API errors (e.g., auth, rate limits, model not found)
-        return {"error": "AI API request failed", "details": str(e)}
\ No newline at end of file
+        return {"error": "AI API request failed", "details": str(e)}
+
+
+class QuestionStreamParser:
+    """
+    Incremental parser for the model's {"questions": [ {...}, {...} ]} output.
+
+    Text chunks are fed in as they arrive; every question object inside the
+    "questions" array is returned as soon as its closing brace is seen,
+    without waiting for the rest of the document.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.last_key = None
+        self.in_questions = False
+        self.finished = False
+        self._key_chars = None
+        self._object_chars = None
+
+    def feed(self, chunk):
+        """Consumes a text chunk and returns the list of question dicts completed by it."""
+        completed = []
+        for c in chunk:
+            if self._object_chars is not None:
+                self._object_chars.append(c)
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if self._key_chars is not None:
+                        self.last_key = ''.join(self._key_chars)
+                        self._key_chars = None
+                elif self._key_chars is not None:
+                    self._key_chars.append(c)
+                continue
+
+            if c == '"':
+                self.in_string = True
+                # Strings directly inside the top level object are its keys (or plain values)
+                self._key_chars = [] if self.depth == 1 else None
+            elif c in '{[':
+                self.depth += 1
+                if c == '[' and self.depth == 2 and self.last_key == 'questions':
+                    self.in_questions = True
+                elif c == '{' and self.in_questions and self.depth == 3:
+                    self._object_chars = ['{']
+            elif c in '}]':
+                if c == '}' and self.in_questions and self.depth == 3 and self._object_chars is not None:
+                    # Raises json.JSONDecodeError for a malformed question object
+                    completed.append(json.loads(''.join(self._object_chars)))
+                    self._object_chars = None
+                elif c == ']' and self.in_questions and self.depth == 2:
+                    self.in_questions = False
+                    self.finished = True
+                self.depth -= 1
+        return completed
+
+def stream_quiz_questions(topic, difficulty, num_questions=5, use_cache=True):
+    """
+    Streaming counterpart of generate_quiz_questions.
+
+    Yields each question dict as soon as the model has finished writing it.
+    On failure a single error dictionary (same shape as the errors of
+    generate_quiz_questions) is yielded as the last item.
+    A cached generation is replayed instantly; a complete fresh one is cached.
+    """
+    use_cache = use_cache and ai_cache.enabled
+
+    if use_cache:
+        cached = ai_cache.get(topic, difficulty, num_questions)
+        if cached is not None:
+            yield from cached
+            return
+
+    try:
+        provider = get_ai_provider()
+        provider.prepare()
+    except ValueError as e:
+        yield {"error": "Configuration Error", "details": str(e)}
+        return
+
+    system_prompt = _build_system_prompt(topic, difficulty, num_questions)
+    parser = QuestionStreamParser()
+    questions = []
+
+    try:
+        with ai_metrics.track('stream', provider, num_questions) as call:
+            # The upstream can fail while the chunks are read, not only when the stream is opened
+            with ai_client.circuit():
+                for chunk in provider.stream(system_prompt, topic, difficulty, num_questions, call):
+                    for question in parser.feed(chunk):
+                        if not isinstance(question, dict):
+                            call.outcome = 'schema_error'
+                            raise json.JSONDecodeError("AI response 'questions' item is not an object.", str(question), 0)
+                        questions.append(question)
+                        yield question
+
+            if not parser.finished:
+                raise json.JSONDecodeError("AI response ended before the 'questions' array was closed.", '', 0)
+
+    except CircuitOpenError as e:
+        yield {"error": "AI service temporarily unavailable", "details": str(e), "retry_after": round(e.retry_after)}
+        return
+    except json.JSONDecodeError as e:
+        yield {"error": "AI returned invalid JSON or unexpected schema", "details": str(e)}
+        return
+    except Exception as e:
+        yield {"error": "AI API request failed", "details": str(e)}
+        return
+
+    if use_cache and questions:
+        ai_cache.set(topic, difficulty, num_questions, questions)
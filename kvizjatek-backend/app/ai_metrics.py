@@ -0,0 +1,240 @@
+import bisect
+import datetime
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from contextlib import contextmanager
+import openai
+from flask import current_app
+from .ai_client import CircuitOpenError, UpstreamError
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+def classify_error(exc):
+    """Maps an exception raised during an AI call to an outcome class."""
+    # APITimeoutError is a subclass of APIConnectionError, so it goes first
+    if isinstance(exc, (openai.APITimeoutError, TimeoutError)):
+        return 'timeout'
+    if isinstance(exc, openai.RateLimitError):
+        return 'rate_limit'
+    if isinstance(exc, openai.APIConnectionError):
+        return 'connection_error'
+    if isinstance(exc, (openai.InternalServerError, UpstreamError)):
+        return 'server_error'
+    if isinstance(exc, (openai.AuthenticationError, openai.PermissionDeniedError)):
+        return 'auth_error'
+    if isinstance(exc, openai.BadRequestError):
+        return 'bad_request'
+    if isinstance(exc, CircuitOpenError):
+        return 'circuit_open'
+    if isinstance(exc, json.JSONDecodeError):
+        return 'bad_json'
+    if isinstance(exc, GeneratorExit):
+        # The client went away in the middle of a stream
+        return 'cancelled'
+    return 'error'
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread-safe, guarded by AIMetrics)."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (the max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+class AICall:
+    """
+    Measurements of one upstream AI call, filled in by the generator and the provider.
+    `outcome` may be set before an exception to refine its class (e.g. 'schema_error').
+    """
+
+    __slots__ = ('kind', 'provider', 'num_questions', 'model', 'started', 'first_byte_at',
+                 'prompt_tokens', 'completion_tokens', 'outcome')
+
+    def __init__(self, kind, provider, num_questions):
+        self.kind = kind
+        self.provider = provider
+        self.num_questions = num_questions
+        self.model = None
+        self.started = time.perf_counter()
+        self.first_byte_at = None
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.outcome = None
+
+    def first_byte(self):
+        """Marks the arrival of the first response data (only the first mark counts)."""
+        if self.first_byte_at is None:
+            self.first_byte_at = time.perf_counter()
+
+    def usage(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens if isinstance(prompt_tokens, int) else None
+        self.completion_tokens = completion_tokens if isinstance(completion_tokens, int) else None
+
+class AIMetrics:
+    """
+    Per-process instrumentation of the upstream AI calls.
+
+    Every call records its wall time, time to first byte (first streamed
+    chunk, or the whole response for non-streaming calls), token usage,
+    model and outcome class into in-memory histograms and counters.
+    With AI_METRICS_LOG_FILE set, each call is also appended as one JSON
+    line to a size-rotated log file.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_METRICS_LOG_FILE', None)
+        app.config.setdefault('AI_METRICS_LOG_MAX_BYTES', 10 * 1024 * 1024)
+        app.config.setdefault('AI_METRICS_LOG_BACKUP_COUNT', 5)
+
+        handler = None
+        if app.config['AI_METRICS_LOG_FILE']:
+            handler = logging.handlers.RotatingFileHandler(
+                app.config['AI_METRICS_LOG_FILE'],
+                maxBytes=app.config['AI_METRICS_LOG_MAX_BYTES'],
+                backupCount=app.config['AI_METRICS_LOG_BACKUP_COUNT'],
+                encoding='utf-8',
+                delay=True
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+
+        app.extensions['ai_metrics'] = {'lock': threading.Lock(), 'log_handler': handler}
+        self._reset_state(app.extensions['ai_metrics'])
+
+    def _state(self):
+        return current_app.extensions['ai_metrics']
+
+    def _reset_state(self, state):
+        state.update({
+            'since': datetime.datetime.utcnow(),
+            'calls': 0,
+            'outcomes': {},
+            'duration': Histogram(),
+            'ttfb': Histogram(),
+            # model -> {"calls", "prompt_tokens", "completion_tokens", "duration"}
+            'models': {},
+            # "complete" / "stream" -> Histogram of successful calls
+            'kinds': {},
+        })
+
+    @contextmanager
+    def track(self, kind, provider, num_questions):
+        """
+        Measures one upstream call. Yields the AICall for the provider to fill in;
+        an exception escaping the block is classified and re-raised.
+        """
+        call = AICall(kind, getattr(provider, 'name', None), num_questions)
+        try:
+            yield call
+        except BaseException as e:
+            self.record(call, call.outcome or classify_error(e))
+            raise
+        else:
+            self.record(call, call.outcome or 'ok')
+
+    def record(self, call, outcome):
+        finished = time.perf_counter()
+        duration = finished - call.started
+        ttfb = call.first_byte_at - call.started if call.first_byte_at is not None else None
+        state = self._state()
+
+        with state['lock']:
+            state['calls'] += 1
+            state['outcomes'][outcome] = state['outcomes'].get(outcome, 0) + 1
+            state['duration'].observe(duration)
+            if ttfb is not None:
+                state['ttfb'].observe(ttfb)
+            if outcome == 'ok':
+                state['kinds'].setdefault(call.kind, Histogram()).observe(duration)
+
+            model = state['models'].setdefault(call.model or 'unknown', {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "duration": Histogram()
+            })
+            model["calls"] += 1
+            model["prompt_tokens"] += call.prompt_tokens or 0
+            model["completion_tokens"] += call.completion_tokens or 0
+            model["duration"].observe(duration)
+
+        handler = state['log_handler']
+        if handler is not None:
+            handler.handle(logging.makeLogRecord({'msg': json.dumps({
+                "ts": datetime.datetime.utcnow().isoformat(),
+                "kind": call.kind,
+                "provider": call.provider,
+                "model": call.model,
+                "num_questions": call.num_questions,
+                "outcome": outcome,
+                "duration": round(duration, 4),
+                "ttfb": round(ttfb, 4) if ttfb is not None else None,
+                "prompt_tokens": call.prompt_tokens,
+                "completion_tokens": call.completion_tokens,
+            })}))
+
+    def snapshot(self):
+        state = self._state()
+        with state['lock']:
+            return {
+                "since": state['since'].isoformat(),
+                "calls": state['calls'],
+                "outcomes": dict(state['outcomes']),
+                "duration_seconds": state['duration'].snapshot(),
+                "ttfb_seconds": state['ttfb'].snapshot(),
+                "successful_duration_by_kind": {
+                    kind: histogram.snapshot() for kind, histogram in state['kinds'].items()
+                },
+                "models": {
+                    name: {
+                        "calls": model["calls"],
+                        "prompt_tokens": model["prompt_tokens"],
+                        "completion_tokens": model["completion_tokens"],
+                        "duration_seconds": model["duration"].snapshot(),
+                    }
+                    for name, model in state['models'].items()
+                },
+                "log_file": current_app.config['AI_METRICS_LOG_FILE'],
+            }
+
+    def reset(self):
+        state = self._state()
+        with state['lock']:
+            self._reset_state(state)
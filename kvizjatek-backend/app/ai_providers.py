@@ -0,0 +1,215 @@
+import abc
+import json
+import random
+import threading
+import time
+from flask import current_app
+from .ai_client import UpstreamError
+from .extensions import ai_client
+
+class AIProvider(abc.ABC):
+    """
+    Interface of the LLM backends behind app.ai_generator.
+
+    A provider turns one generation request into the model's raw text
+    (expected to be the {"questions": [...]} JSON document). Parsing,
+    validation, caching and the circuit breaker stay in the generator,
+    so they behave the same whatever backend is configured (AI_PROVIDER).
+    """
+
+    name = None
+
+    def prepare(self):
+        """Checks the configuration. Raises ValueError if the provider cannot be used."""
+
+    @abc.abstractmethod
+    def complete(self, system_prompt, topic, difficulty, num_questions, call):
+        """
+        Returns the complete raw response text.
+        `call` (app.ai_metrics.AICall) receives the model name and token usage.
+        """
+
+    @abc.abstractmethod
+    def stream(self, system_prompt, topic, difficulty, num_questions, call):
+        """
+        Starts a streaming generation and returns an iterator of text chunks.
+        Connection level failures are raised by this call, not by the iterator.
+        """
+
+def _completion_kwargs(system_prompt, stream=False):
+    """Request parameters shared by the plain and the streaming completion call."""
+    return dict(
+        # This is the model you requested
+        model="gpt-5-nano",
+        messages=[
+            {"role": "system", "content": system_prompt}
+        ],
+        temperature=1,
+        # This forces the model to output a valid JSON object
+        response_format={"type": "json_object"},
+        stream=stream,
+        # Streams only report token usage when asked to (in a final chunk without choices)
+        **({"stream_options": {"include_usage": True}} if stream else {}),
+    )
+
+def _record_usage(call, response):
+    """Copies the model name and token usage of an OpenAI response or chunk onto the call."""
+    if isinstance(getattr(response, 'model', None), str):
+        call.model = response.model
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        call.usage(getattr(usage, 'prompt_tokens', None), getattr(usage, 'completion_tokens', None))
+
+class OpenAIProvider(AIProvider):
+    """The OpenAI chat completions API (or anything compatible at OPENAI_BASE_URL)."""
+
+    name = 'openai'
+
+    def prepare(self):
+        ai_client.get_client()
+
+    def complete(self, system_prompt, topic, difficulty, num_questions, call):
+        kwargs = _completion_kwargs(system_prompt)
+        call.model = kwargs['model']
+        completion = ai_client.get_client().chat.completions.create(**kwargs)
+        call.first_byte()
+        _record_usage(call, completion)
+        return completion.choices[0].message.content
+
+    def stream(self, system_prompt, topic, difficulty, num_questions, call):
+        kwargs = _completion_kwargs(system_prompt, stream=True)
+        call.model = kwargs['model']
+        response = ai_client.get_client().chat.completions.create(**kwargs)
+
+        def generate():
+            for chunk in response:
+                call.first_byte()
+                _record_usage(call, chunk)
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ''
+
+        return generate()
+
+class SimulatedUpstreamError(UpstreamError):
+    """A failure injected by the offline provider (counts against the circuit breaker)."""
+
+def parse_latency(spec):
+    """
+    Parses an AI_OFFLINE_LATENCY spec into a sampler function rng -> seconds:
+    "fixed:0.5", "uniform:0.2,1.5", "normal:1.0,0.3" or "lognormal:0,0.5".
+    """
+    kind, _, args = str(spec).partition(':')
+    params = [float(p) for p in args.split(',') if p.strip()]
+
+    if kind == 'fixed':
+        return lambda rng: params[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(params[0], params[1])
+    raise ValueError(f"Unknown AI_OFFLINE_LATENCY distribution: {spec!r}")
+
+class OfflineProvider(AIProvider):
+    """
+    Deterministic local stand-in for load testing without the paid API.
+
+    Generates well-formed questions from a seeded RNG and simulates
+    latency (AI_OFFLINE_LATENCY), upstream failures (AI_OFFLINE_ERROR_RATE)
+    and truncated JSON (AI_OFFLINE_MALFORMED_RATE). The same seed and call
+    order always give the same questions, latencies and failures.
+    """
+
+    name = 'offline'
+
+    def __init__(self, config):
+        self.sample_latency = parse_latency(config.get('AI_OFFLINE_LATENCY', 'fixed:0'))
+        self.error_rate = float(config.get('AI_OFFLINE_ERROR_RATE', 0))
+        self.malformed_rate = float(config.get('AI_OFFLINE_MALFORMED_RATE', 0))
+        self.stream_chunk_size = int(config.get('AI_OFFLINE_STREAM_CHUNK_SIZE', 24))
+        self.seed = config.get('AI_OFFLINE_SEED', 0)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next_rng(self):
+        with self._lock:
+            self.calls += 1
+            return random.Random(f"{self.seed}:{self.calls}")
+
+    def _simulate(self, topic, difficulty, num_questions):
+        """Returns (latency, raw_text) for one call, or raises SimulatedUpstreamError."""
+        rng = self._next_rng()
+        latency = self.sample_latency(rng)
+
+        if rng.random() < self.error_rate:
+            time.sleep(latency)
+            raise SimulatedUpstreamError("Simulated upstream failure (offline AI provider)")
+
+        questions = []
+        for _ in range(num_questions):
+            token = rng.getrandbits(32)
+            questions.append({
+                "question_text": f"[{topic} / {difficulty}] Offline question {token:08x}?",
+                "options": [f"Answer {token:08x}-{i}" for i in range(4)],
+                "correct_option_index": rng.randrange(4)
+            })
+        raw = json.dumps({"questions": questions})
+
+        if rng.random() < self.malformed_rate:
+            raw = raw[:len(raw) // 2]
+
+        return latency, raw
+
+    def _record_usage(self, call, system_prompt, raw):
+        # Rough token counts (about 4 characters per token), enough for sizing tests
+        call.usage(len(system_prompt) // 4, len(raw) // 4)
+
+    def complete(self, system_prompt, topic, difficulty, num_questions, call):
+        call.model = self.name
+        latency, raw = self._simulate(topic, difficulty, num_questions)
+        time.sleep(latency)
+        call.first_byte()
+        self._record_usage(call, system_prompt, raw)
+        return raw
+
+    def stream(self, system_prompt, topic, difficulty, num_questions, call):
+        call.model = self.name
+        latency, raw = self._simulate(topic, difficulty, num_questions)
+        self._record_usage(call, system_prompt, raw)
+        chunks = [raw[i:i + self.stream_chunk_size] for i in range(0, len(raw), self.stream_chunk_size)]
+
+        def generate():
+            # Spread the simulated generation time evenly over the chunks
+            for chunk in chunks:
+                time.sleep(latency / len(chunks))
+                call.first_byte()
+                yield chunk
+
+        return generate()
+
+PROVIDERS = {
+    OpenAIProvider.name: lambda config: OpenAIProvider(),
+    OfflineProvider.name: OfflineProvider,
+}
+
+_provider_lock = threading.Lock()
+
+def get_ai_provider():
+    """
+    Returns the provider selected by AI_PROVIDER for the current app,
+    creating it on first use. Raises ValueError for an unknown provider.
+    """
+    extensions = current_app.extensions
+    provider = extensions.get('ai_provider')
+    if provider is not None:
+        return provider
+
+    name = current_app.config.get('AI_PROVIDER', 'openai')
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown AI_PROVIDER {name!r}, expected one of: {', '.join(PROVIDERS)}")
+
+    with _provider_lock:
+        if 'ai_provider' not in extensions:
+            extensions['ai_provider'] = PROVIDERS[name](current_app.config)
+    return extensions['ai_provider']
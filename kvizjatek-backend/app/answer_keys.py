@@ -0,0 +1,196 @@
+import json
+import threading
+import zlib
+from flask import current_app
+from .caching import LRUCache
+from .versioning import quiz_version
+
+# Option index stored for a question without an answer among its options
+NO_OPTION = 255
+
+# Answer and option values that can be looked up by value
+_LOOKUP_TYPES = (str, int, float)
+
+def answer_layout(rows):
+    """
+    Checksum of the (question_id, options, correct_option_index) rows of a
+    quiz, in id order, that per-answer data was recorded against: it changes
+    when a question is added or removed, or its options or answer change.
+    """
+    encoded = json.dumps([list(row) for row in rows], ensure_ascii=False, separators=(',', ':'))
+    return zlib.crc32(encoded.encode('utf-8'))
+
+class AnswerKey:
+    """
+    Grading data of one quiz in question id order: per question id its
+    position, the correct option text and the index of each option text.
+    """
+
+    __slots__ = ('questions', 'layout')
+
+    def __init__(self, rows):
+        """rows: (question_id, options, correct_option_index), ordered by question id."""
+        self.questions = {}
+        for position, (question_id, options, correct_index) in enumerate(rows):
+            option_indexes = {}
+            for index, option in enumerate(options):
+                if isinstance(option, _LOOKUP_TYPES) and option not in option_indexes:
+                    option_indexes[option] = min(index, NO_OPTION - 1)
+            self.questions[question_id] = (position, options[correct_index], option_indexes)
+        self.layout = answer_layout(rows)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def grade(self, answers):
+        """
+        Grades a submit_result 'answers' list. Returns (score, correct_bits,
+        selected_options): bit i of correct_bits (least significant first) is
+        set if the i-th question in id order was answered correctly, and byte
+        i of selected_options is the chosen option's index, or NO_OPTION.
+        Answers to questions of other quizzes score nothing.
+        """
+        questions = self.questions
+        correct_bits = bytearray((len(questions) + 7) // 8)
+        selected_options = bytearray([NO_OPTION]) * len(questions)
+        score = 0
+        for answer in answers:
+            entry = questions.get(answer.get('question_id'))
+            if entry is None:
+                continue
+            position, expected, option_indexes = entry
+            selected = answer.get('selected_answer')
+            if selected == expected:
+                score += 1
+                correct_bits[position >> 3] |= 1 << (position & 7)
+            if isinstance(selected, _LOOKUP_TYPES):
+                selected_options[position] = option_indexes.get(selected, NO_OPTION)
+        return score, bytes(correct_bits), bytes(selected_options)
+
+class AnswerKeyCache:
+    """
+    Bounded in-process LRU of quiz answer keys for grading results without
+    loading Quiz/Question objects. A key is built by one column-projected
+    query and dropped on quiz update and delete.
+
+    Every key is stamped with the version of its quiz (app.versioning) and
+    only used while it is unchanged, so edits made by other worker
+    processes are seen as well, at the cost of one primary-key lookup per
+    grading, while writes to other quizzes leave it alone. Keys expire
+    after ANSWER_KEY_CACHE_TTL seconds in any case.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ANSWER_KEY_CACHE_ENABLED', True)
+        app.config.setdefault('ANSWER_KEY_CACHE_MAX_ENTRIES', 4096)
+        app.config.setdefault('ANSWER_KEY_CACHE_TTL', 300)
+        app.extensions['answer_keys'] = {
+            'memory': LRUCache(app.config['ANSWER_KEY_CACHE_MAX_ENTRIES'], app.config['ANSWER_KEY_CACHE_TTL']),
+            # Bumped by every invalidation; a key built across one is not stored
+            'generation': 0,
+            'lock': threading.Lock(),
+        }
+
+    def _state(self):
+        return current_app.extensions['answer_keys']
+
+    def _versions(self, quiz_ids):
+        """{quiz_id: (version, updated_at)} of the quizzes that exist, one query."""
+        from app.extensions import db
+        from app.models import Quiz
+
+        rows = db.session.execute(
+            db.select(Quiz.id, Quiz.version, Quiz.updated_at).where(Quiz.id.in_(quiz_ids))
+        )
+        return {quiz_id: (version, updated_at) for quiz_id, version, updated_at in rows}
+
+    def _build(self, quiz_id):
+        """Reads the answer key of a quiz; None if the quiz does not exist."""
+        from app.extensions import db
+        from app.models import Question, Quiz
+
+        rows = db.session.query(Question.id, Question.options, Question.correct_option_index) \
+            .filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+        if not rows and db.session.query(Quiz.id).filter(Quiz.id == quiz_id).first() is None:
+            return None
+        return AnswerKey(rows)
+
+    def _build_many(self, quiz_ids):
+        """Reads the answer keys of several quizzes with one query; missing quizzes are left out."""
+        from app.extensions import db
+        from app.models import Question, Quiz
+
+        rows = db.session.query(Question.quiz_id, Question.id, Question.options, Question.correct_option_index) \
+            .filter(Question.quiz_id.in_(quiz_ids)).order_by(Question.quiz_id, Question.id).all()
+        questions = {}
+        for quiz_id, *question in rows:
+            questions.setdefault(quiz_id, []).append(question)
+
+        without_questions = set(quiz_ids) - questions.keys()
+        if without_questions:
+            for (quiz_id,) in db.session.query(Quiz.id).filter(Quiz.id.in_(without_questions)):
+                questions[quiz_id] = []
+        return {quiz_id: AnswerKey(key) for quiz_id, key in questions.items()}
+
+    def get(self, quiz_id):
+        """The AnswerKey of a quiz (cached), or None if the quiz does not exist."""
+        if not current_app.config['ANSWER_KEY_CACHE_ENABLED']:
+            return self._build(quiz_id)
+
+        state = self._state()
+        generation = state['generation']
+        stamp = quiz_version(quiz_id)
+        if stamp is None:
+            return None
+        entry = state['memory'].get(quiz_id)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        key = self._build(quiz_id)
+        if key is not None:
+            with state['lock']:
+                if state['generation'] == generation:
+                    state['memory'].set(quiz_id, (stamp, key))
+        return key
+
+    def get_many(self, quiz_ids):
+        """
+        AnswerKeys of several quizzes as {quiz_id: AnswerKey}; quizzes that do
+        not exist are left out. The uncached ones are read with one query.
+        """
+        quiz_ids = set(quiz_ids)
+        if not current_app.config['ANSWER_KEY_CACHE_ENABLED']:
+            return self._build_many(quiz_ids)
+
+        state = self._state()
+        generation = state['generation']
+        stamps = self._versions(quiz_ids) if quiz_ids else {}
+        keys = {}
+        for quiz_id, stamp in stamps.items():
+            entry = state['memory'].get(quiz_id)
+            if entry is not None and entry[0] == stamp:
+                keys[quiz_id] = entry[1]
+
+        missing = stamps.keys() - keys.keys()
+        if missing:
+            built = self._build_many(missing)
+            with state['lock']:
+                if state['generation'] == generation:
+                    for quiz_id, key in built.items():
+                        state['memory'].set(quiz_id, (stamps[quiz_id], key))
+            keys.update(built)
+        return keys
+
+    def invalidate(self, quiz_id):
+        state = self._state()
+        with state['lock']:
+            state['generation'] += 1
+            state['memory'].delete(quiz_id)
+
+    def stats(self):
+        memory = self._state()['memory']
+        return {"entries": len(memory), "hits": memory.hits, "misses": memory.misses}
@@ -1,6 +1,11 @@
-from flask import request, jsonify, Blueprint
-from app.models import User, Topic
-from app.extensions import db, bcrypt
+from flask import request, jsonify, Blueprint, Response, current_app, stream_with_context, url_for
+from app.models import User, Topic, BulkGenerationRun, Question, QuestionAnalytics
+from app.extensions import db, bcrypt, jobs, question_pool, ai_cache, ai_metrics
+from app.bulk_generation import create_run, reset_failed_items, run_bulk_generation, run_progress
+from app.quiz_transfer import export_quizzes, import_quizzes
+from app.result_export import FORMATS as EXPORT_FORMATS, ExportFormatUnavailable, export_results
+from app.question_analytics import JOB_KEY as ANALYTICS_JOB_KEY, compute_question_analytics
+from app.pagination import parse_limit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from functools import wraps
 from app.permission import admin_required
@@ -72,4 +77,215 @@ def delete_user(user_id):
     
     db.session.delete(user)
     db.session.commit()
-    return jsonify({"message": "Felhasználó törölve"}), 200
\ No newline at end of file
+    return jsonify({"message": "Felhasználó törölve"}), 200
+
+@admin_bp.route('/question-pool', methods=['GET'])
+@admin_required
+def get_question_pool_metrics():
+    """(Admin) AI kérdéskészlet állapota: találati arány, mélység, feltöltési idők."""
+    return jsonify(question_pool.metrics()), 200
+
+@admin_bp.route('/question-pool/refill', methods=['POST'])
+@admin_required
+def refill_question_pool():
+    """(Admin) Feltöltés ütemezése minden alacsony (téma, nehézség) párra."""
+    scheduled = question_pool.warm_up()
+    return jsonify({"message": "Kérdéskészlet feltöltése elindítva", "scheduled": scheduled}), 202
+
+@admin_bp.route('/ai/cache', methods=['GET'])
+@admin_required
+def get_ai_cache_stats():
+    """(Admin) AI válasz-gyorsítótár találati statisztikái."""
+    return jsonify(ai_cache.stats()), 200
+
+@admin_bp.route('/ai/cache', methods=['DELETE'])
+@admin_required
+def clear_ai_cache():
+    """(Admin) AI válasz-gyorsítótár ürítése."""
+    ai_cache.clear()
+    return jsonify({"message": "AI gyorsítótár ürítve"}), 200
+
+@admin_bp.route('/ai/metrics', methods=['GET'])
+@admin_required
+def get_ai_metrics():
+    """(Admin) AI hívások mérései: késleltetés-hisztogramok, tokenhasználat, hibaosztályok."""
+    return jsonify(ai_metrics.snapshot()), 200
+
+@admin_bp.route('/ai/metrics', methods=['DELETE'])
+@admin_required
+def reset_ai_metrics():
+    """(Admin) AI hívás mérések nullázása (pl. prompt- vagy modellváltás előtt)."""
+    ai_metrics.reset()
+    return jsonify({"message": "AI mérések nullázva"}), 200
+
+@admin_bp.route('/bulk-generation', methods=['POST'])
+@admin_required
+def start_bulk_generation():
+    """(Admin) Tömeges AI kvízgenerálás indítása téma × nehézség × kérdésszám mátrixra."""
+    data = request.get_json() or {}
+    topic_ids = data.get('topic_ids') or [topic_id for (topic_id,) in db.session.query(Topic.id)]
+
+    try:
+        run = create_run(
+            int(get_jwt_identity()),
+            topic_ids,
+            data.get('difficulties'),
+            data.get('counts'),
+            data.get('concurrency'),
+            data.get('rate_per_minute')
+        )
+        db.session.commit()
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": str(ve)}), 400
+
+    jobs.submit(f"bulk:{run.id}", run_bulk_generation, run.id)
+    status_url = url_for('admin.get_bulk_generation', run_id=run.id)
+    return jsonify({
+        "message": "Tömeges generálás elindítva",
+        "run_id": run.id,
+        "status_url": status_url
+    }), 202, {"Location": status_url}
+
+@admin_bp.route('/bulk-generation', methods=['GET'])
+@admin_required
+def get_bulk_generations():
+    """(Admin) Tömeges generálási futások listázása (legújabb elöl)."""
+    runs = BulkGenerationRun.query.order_by(BulkGenerationRun.created_at.desc()).all()
+    output = []
+    for run in runs:
+        report = run_progress(run)
+        report.pop('failed_items')
+        output.append(report)
+    return jsonify(output), 200
+
+@admin_bp.route('/bulk-generation/<run_id>', methods=['GET'])
+@admin_required
+def get_bulk_generation(run_id):
+    """(Admin) Egy tömeges generálás állapota és a hibás elemek listája."""
+    run = db.session.get(BulkGenerationRun, run_id)
+    if not run:
+        return jsonify({"error": "Futás nem található"}), 404
+    return jsonify(run_progress(run)), 200
+
+@admin_bp.route('/bulk-generation/<run_id>/resume', methods=['POST'])
+@admin_required
+def resume_bulk_generation(run_id):
+    """(Admin) Megszakadt vagy részben hibás futás folytatása; a sikeres elemeket nem generálja újra."""
+    run = db.session.get(BulkGenerationRun, run_id)
+    if not run:
+        return jsonify({"error": "Futás nem található"}), 404
+    # A 'running' run may be executing in another worker process
+    if run.status in ('queued', 'running') or jobs.is_pending(f"bulk:{run.id}"):
+        return jsonify({"error": "A futás még folyamatban van"}), 409
+
+    retried = reset_failed_items(run.id)
+    run.status = 'queued'
+    db.session.commit()
+
+    jobs.submit(f"bulk:{run.id}", run_bulk_generation, run.id)
+    return jsonify({
+        "message": "Tömeges generálás folytatva",
+        "run_id": run.id,
+        "retried": retried,
+        "status_url": url_for('admin.get_bulk_generation', run_id=run.id)
+    }), 202
+
+@admin_bp.route('/quizzes/export', methods=['GET'])
+@admin_required
+def export_all_quizzes():
+    """(Admin) Összes kvíz exportálása kérdésekkel együtt, soronként egy JSON objektum (NDJSON), folyamatosan streamelve."""
+    return Response(stream_with_context(export_quizzes()), mimetype='application/x-ndjson', headers={
+        "Content-Disposition": "attachment; filename=quizzes.ndjson"
+    })
+
+@admin_bp.route('/quizzes/import', methods=['POST'])
+@admin_required
+def import_all_quizzes():
+    """(Admin) Kvízek importálása NDJSON törzsből; a hibás sorokat kihagyja és jelenti."""
+    # The body is consumed line by line, never read into memory as a whole
+    report = import_quizzes(request.stream, int(get_jwt_identity()))
+    return jsonify(report), 200
+
+@admin_bp.route('/results/export', methods=['GET'])
+@admin_required
+def export_all_results():
+    """
+    (Admin) Összes eredmény exportálása felhasználó- és kvízadatokkal, folyamatosan streamelve.
+    ?format=csv (alapértelmezett), parquet vagy arrow (az utóbbiakhoz pyarrow kell).
+    """
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export_results(fmt)
+    except ValueError:
+        return jsonify({"error": f"Ismeretlen formátum: '{fmt}' (lehetséges: {', '.join(EXPORT_FORMATS)})"}), 400
+    except ExportFormatUnavailable:
+        return jsonify({"error": f"A(z) '{fmt}' formátum nem elérhető ezen a szerveren (pyarrow szükséges)"}), 501
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename=results.{extension}"
+    })
+
+@admin_bp.route('/analytics/questions', methods=['GET'])
+@admin_required
+def get_question_analytics():
+    """
+    (Admin) Kérdésenkénti statisztika: helyes válasz arány, opciók eloszlása, próbálkozások száma.
+    A legutóbbi újraszámolás eredményét adja (nehezebb kérdések elöl), nem számol kérésenként.
+    Szűrők: ?quiz_id=, ?min_attempts=, ?limit=
+    """
+    args = request.args
+    filters = []
+    try:
+        for name, column in (('quiz_id', QuestionAnalytics.quiz_id), ('min_attempts', QuestionAnalytics.attempts)):
+            if args.get(name) is not None:
+                try:
+                    value = int(args[name])
+                except ValueError:
+                    raise ValueError(f"'{name}' must be an integer")
+                filters.append(column == value if name == 'quiz_id' else column >= value)
+        limit = parse_limit(args.get('limit'), current_app.config['QUESTION_ANALYTICS_DEFAULT_LIMIT'],
+                            current_app.config['QUESTION_ANALYTICS_MAX_LIMIT'])
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    correct_rate = (QuestionAnalytics.correct * 1.0 / QuestionAnalytics.attempts).label('correct_rate')
+    rows = db.session.query(QuestionAnalytics, correct_rate, Question.question_text, Question.options,
+                            Question.correct_option_index) \
+        .join(Question, Question.id == QuestionAnalytics.question_id) \
+        .filter(*filters) \
+        .order_by(correct_rate, QuestionAnalytics.attempts.desc(), QuestionAnalytics.question_id) \
+        .limit(limit).all()
+
+    computed_at = db.session.query(db.func.max(QuestionAnalytics.computed_at)).scalar()
+    return jsonify({
+        "computed_at": computed_at.isoformat() if computed_at else None,
+        "refreshing": jobs.is_pending(ANALYTICS_JOB_KEY),
+        "items": [{
+            "question_id": stats.question_id,
+            "quiz_id": stats.quiz_id,
+            "question_text": question_text,
+            "options": options,
+            "correct_option_index": correct_option_index,
+            "attempts": stats.attempts,
+            "answered": stats.answered,
+            "correct": stats.correct,
+            "correct_rate": round(rate, 4),
+            "option_counts": stats.option_counts
+        } for stats, rate, question_text, options, correct_option_index in rows]
+    }), 200
+
+@admin_bp.route('/analytics/questions/refresh', methods=['POST'])
+@admin_required
+def refresh_question_analytics():
+    """(Admin) A kérdésstatisztika újraszámolása a háttérben (az összes eredmény válaszadataiból)."""
+    if jobs.is_pending(ANALYTICS_JOB_KEY):
+        return jsonify({"error": "Az újraszámolás már folyamatban van"}), 409
+
+    jobs.submit(ANALYTICS_JOB_KEY, compute_question_analytics)
+    status_url = url_for('admin.get_question_analytics')
+    return jsonify({
+        "message": "Kérdésstatisztika újraszámolása elindítva",
+        "status_url": status_url
+    }), 202, {"Location": status_url}
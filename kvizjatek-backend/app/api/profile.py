@@ -1,7 +1,8 @@
-from flask import jsonify, Blueprint
-from app.models import User, Result, Quiz, Topic
+from flask import request, jsonify, Blueprint
+from app.models import User, Result, Quiz, Topic, QuickPlayGame
 from app.extensions import db
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.user_stats import get_user_stats
 
 profile_bp = Blueprint('profile', __name__)
 
@@ -9,15 +10,19 @@ profile_bp = Blueprint('profile', __name__)
 @profile_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_my_profile():
+    """Saját profil. ?include=stats esetén a user_stats összesítőkkel együtt (témánkénti bontásban)."""
     user_id = int(get_jwt_identity())
     user = User.query.get_or_404(user_id)
     
-    return jsonify({
+    profile = {
         "id": user.id,
         "username": user.username,
         "email": user.email,
         "is_admin": user.is_admin
-    }), 200
+    }
+    if 'stats' in request.args.get('include', '').split(','):
+        profile["stats"] = get_user_stats(user.id)
+    return jsonify(profile), 200
 
 @profile_bp.route('/', methods=['DELETE'])
 @jwt_required()
@@ -29,6 +34,8 @@ def delete_my_profile():
     try:
         
         Result.query.filter_by(user_id=user.id).delete()
+
+        QuickPlayGame.query.filter_by(user_id=user.id).delete()
         
         Quiz.query.filter_by(created_by_user_id=user.id).delete()
         
@@ -1,13 +1,57 @@
-from flask import request, jsonify, Blueprint
+import json
+from flask import request, jsonify, Blueprint, Response, current_app, g, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Quiz, Question, User, Topic
-from app.extensions import db
+from app.models import Quiz, Question, User, Topic, GenerationJob, QuickPlayGame, Result
+from app.extensions import db, answer_keys, jobs, question_pool, question_index, quick_play, quiz_cache, quiz_search
 from app.permission import admin_required
-from app.ai_generator import generate_quiz_questions # <-- New: Import the AI service
+from app.ai_generator import generate_quiz_questions, stream_quiz_questions # <-- New: Import the AI service
+from app.jobs import new_job_id, run_generation_job
+from app.quiz_service import apply_question_diff, drop_ai_duplicates, forget_cached_generation, insert_quiz, validate_question, validate_questions
+from app.pagination import decode_cursor, encode_cursor, parse_limit
+from app.user_stats import rebuild_user_stats
+from app.versioning import conditional, quiz_version
 
 # Create a Blueprint for quizzes
 quiz_bp = Blueprint('quiz', __name__, url_prefix='/quiz')
 
+def _validate_quiz_request(data, ai_generate):
+    """
+    Basic validation shared by create_quiz and create_quiz_stream.
+    Returns (topic_for_ai, num_questions, error_response);
+    error_response is None if the request is valid.
+    """
+    topic_id = data.get('topic_id')
+    custom_topic = data.get('custom_topic')
+
+    if not (topic_id or custom_topic):
+        return None, None, (jsonify({"error": "Either 'topic_id' or 'custom_topic' is required"}), 400)
+    if not data.get('difficulty'):
+        return None, None, (jsonify({"error": "Missing 'difficulty'"}), 400)
+
+    # Validate topic if ID is provided
+    topic = Topic.query.get(topic_id) if topic_id else None
+    if topic_id and not topic:
+        return None, None, (jsonify({"error": f"Topic with id {topic_id} not found"}), 404)
+
+    if not ai_generate:
+        return None, None, None
+
+    # Determine the topic name the AI will use
+    topic_for_ai = custom_topic or (topic.name if topic else None)
+    num_questions = data.get('num_questions', 5) # Default to 5 questions
+
+    if not topic_for_ai:
+        return None, None, (jsonify({"error": "Cannot generate questions without a topic name (custom or from ID)"}), 400)
+
+    if not isinstance(num_questions, int) or not (1 <= num_questions <= 15):
+        return None, None, (jsonify({"error": "num_questions must be an integer between 1 and 15"}), 400)
+
+    return topic_for_ai, num_questions, None
+
+def _sse(event, payload):
+    """Formats one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
 @quiz_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_quiz():
@@ -17,10 +61,18 @@ def create_quiz():
     This endpoint supports:
     1. Manual questions (if 'ai_generate' is missing or false, 'questions' list is required).
     2. AI generation (if 'ai_generate': true, 'num_questions' is used to call AI).
+       With 'async': true the generation runs in the background and a job id
+       is returned (202) that can be polled at /quiz/jobs/<job_id>.
+
+    Near-duplicates of questions already stored for the same topic are
+    dropped (and replaced) for AI quizzes; for manual quizzes they are
+    reported ('flag') or refused with 409 ('reject'), see DUPLICATE_QUESTION_POLICY.
     """
     data = request.get_json()
     current_user_id = int(get_jwt_identity())
     questions_data = [] # This list will hold questions, whether manual or AI-generated
+    duplicates = []
+    pooled = None # Questions taken from the pool, handed back if the quiz is not stored
     
     # --- Data Extraction ---
     if not data:
@@ -32,37 +84,64 @@ def create_quiz():
     ai_generate = data.get('ai_generate', False) # Check for AI flag
     
     # --- Basic Validation ---
-    if not (topic_id or custom_topic):
-        return jsonify({"error": "Either 'topic_id' or 'custom_topic' is required"}), 400
-    if not difficulty:
-        return jsonify({"error": "Missing 'difficulty'"}), 400
-
-    # Validate topic if ID is provided
-    if topic_id and not Topic.query.get(topic_id):
-        return jsonify({"error": f"Topic with id {topic_id} not found"}), 404
+    topic_for_ai, num_questions, error = _validate_quiz_request(data, ai_generate)
+    if error:
+        return error
         
     # --- AI Question Generation Branch (If requested) ---
     if ai_generate:
-        # Determine the topic name the AI will use
-        topic_for_ai = custom_topic or (Topic.query.get(topic_id).name if topic_id else None)
-        num_questions = data.get('num_questions', 5) # Default to 5 questions
+        use_cache = data.get('cache', True) is not False # "cache": false forces a fresh generation
 
-        if not topic_for_ai:
-             return jsonify({"error": "Cannot generate questions without a topic name (custom or from ID)"}), 400
+        # --- Pre-warmed pool: admin topics are served without waiting for the AI ---
+        if question_pool.enabled and topic_id and not custom_topic:
+            pooled = question_pool.take(topic_id, difficulty, num_questions)
+            questions_data = pooled or []
 
-        if not isinstance(num_questions, int) or not (1 <= num_questions <= 15):
-            return jsonify({"error": "num_questions must be an integer between 1 and 15"}), 400
+        # --- Asynchronous mode: hand the AI call to the job queue ---
+        if not questions_data and data.get('async', current_app.config.get('AI_GENERATION_ASYNC', False)):
+            try:
+                job = GenerationJob(
+                    id=new_job_id(),
+                    user_id=current_user_id,
+                    topic_id=topic_id,
+                    custom_topic=custom_topic,
+                    difficulty=difficulty,
+                    num_questions=num_questions,
+                    use_cache=use_cache
+                )
+                db.session.add(job)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                return jsonify({"error": "Failed to queue quiz generation", "details": str(e)}), 500
+
+            jobs.submit(job.id, run_generation_job, job.id)
+            status_url = url_for('quiz.get_generation_job', job_id=job.id)
+            return jsonify({
+                "message": "Quiz generation started",
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": status_url
+            }), 202, {"Location": status_url}
+
+        # CALL THE AI SERVICE (pool miss or no pool for this topic)
+        if not questions_data:
+            ai_response = generate_quiz_questions(topic_for_ai, difficulty, num_questions, use_cache=use_cache)
+
+            if isinstance(ai_response, dict) and 'error' in ai_response:
+                if 'retry_after' in ai_response:
+                    # Circuit breaker is open, the AI service is known to be down
+                    return jsonify(ai_response), 503, {"Retry-After": str(ai_response['retry_after'])}
+                # AI generation failed, return the error details (e.g., bad API key, invalid JSON from AI)
+                return jsonify(ai_response), 500
+
+            questions_data = ai_response # Use the AI-generated list of questions
+
+        # Drop questions the topic already has (pool or fresh AI), ask for replacements
+        questions_data = drop_ai_duplicates(topic_id, custom_topic, topic_for_ai, difficulty, questions_data)
 
-        # CALL THE AI SERVICE
-        ai_response = generate_quiz_questions(topic_for_ai, difficulty, num_questions)
-        
-        if isinstance(ai_response, dict) and 'error' in ai_response:
-            # AI generation failed, return the error details (e.g., bad API key, invalid JSON from AI)
-            return jsonify(ai_response), 500
-            
-        questions_data = ai_response # Use the AI-generated list of questions
-        
         if not questions_data:
+             question_pool.restore(topic_id, difficulty, pooled)
              return jsonify({"error": "AI generated an empty set of questions. Try a different prompt."}), 500
 
     # --- Manual Question Entry Branch (If AI not requested) ---
@@ -73,78 +152,357 @@ def create_quiz():
             # Error if user didn't ask for AI and didn't provide manual questions
             return jsonify({"error": "Missing 'questions' list or list is empty for manual creation"}), 400
 
+        if question_index.policy != 'off':
+            duplicates = question_index.find_duplicates(topic_id, custom_topic, questions_data)
+            if duplicates and question_index.policy == 'reject':
+                return jsonify({"error": "Quiz contains near-duplicate questions", "duplicates": duplicates}), 409
 
     # --- Database Transaction (Same for Manual and AI) ---
     try:
-        # Create Quiz instance
-        new_quiz = Quiz(
-            topic_id=topic_id,
-            custom_topic=custom_topic,
-            difficulty=difficulty,
-            created_by_user_id=current_user_id
-        )
-        
-        # Create Question instances from questions_data
-        for q_data in questions_data:
-            if not all(k in q_data for k in ('question_text', 'options', 'correct_option_index')):
-                raise ValueError("Each question must have 'question_text', 'options', and 'correct_option_index'")
-            
-            # Simple validation to ensure data matches model structure
-            if not isinstance(q_data['options'], list) or len(q_data['options']) < 2:
-                raise ValueError("Question 'options' must be a list with at least 2 items")
-            
-            if not (0 <= q_data['correct_option_index'] < len(q_data['options'])):
-                raise ValueError("Invalid 'correct_option_index'")
-
-            new_question = Question(
-                question_text=q_data['question_text'],
-                options=q_data['options'], # Stored as JSON
-                correct_option_index=q_data['correct_option_index']
-            )
-            # Add question to the quiz's question list
-            new_quiz.questions.append(new_question)
-
-        # Add to session and commit transaction
-        db.session.add(new_quiz)
+        # Validate all questions in one pass, insert them with a single statement
+        new_quiz = insert_quiz(topic_id, custom_topic, difficulty, current_user_id, questions_data)
         db.session.commit()
-        
-        return jsonify({"message": "Quiz created successfully", "quiz_id": new_quiz.id, "questions_count": len(questions_data)}), 201
+        question_index.sync(force=True)
+        quick_play.sync(force=True)
+        if ai_generate and not pooled:
+            forget_cached_generation(topic_for_ai, difficulty, num_questions)
+
+        response = {"message": "Quiz created successfully", "quiz_id": new_quiz.id, "questions_count": len(questions_data)}
+        if duplicates:
+            response["duplicates"] = duplicates
+        return jsonify(response), 201
 
     except ValueError as ve:
         db.session.rollback()
+        question_pool.restore(topic_id, difficulty, pooled)
         return jsonify({"error": f"Invalid question data: {ve}"}), 400
     except Exception as e:
         db.session.rollback()
+        question_pool.restore(topic_id, difficulty, pooled)
         return jsonify({"error": "Failed to create quiz", "details": str(e)}), 500
     
+@quiz_bp.route('/stream', methods=['POST'])
+@jwt_required()
+def create_quiz_stream():
+    """
+    Create an AI generated quiz, streaming the questions as Server-Sent Events. (Logged-in users)
+    Takes the same body as the AI branch of create_quiz ('ai_generate' is implied).
+
+    Events:
+    - 'question': a validated question (without the correct answer) as soon as the model finished it
+    - 'skipped':  an AI question that failed validation or is a near-duplicate
+    - 'done':     the quiz was saved; carries quiz_id and the question ids in order
+    - 'error':    generation or saving failed, nothing was saved
+    """
+    data = request.get_json()
+    current_user_id = int(get_jwt_identity())
+
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    topic_for_ai, num_questions, error = _validate_quiz_request(data, True)
+    if error:
+        return error
+
+    topic_id = data.get('topic_id')
+    custom_topic = data.get('custom_topic')
+    difficulty = data.get('difficulty')
+    use_cache = data.get('cache', True) is not False
+
+    pooled = None
+    if question_pool.enabled and topic_id and not custom_topic:
+        pooled = question_pool.take(topic_id, difficulty, num_questions)
+
+    def generate():
+        # Pooled questions go back to the pool unless the quiz was saved (errors, client disconnects)
+        saved = False
+        try:
+            questions_data = []
+            checker = question_index.checker(topic_id, custom_topic) if question_index.policy != 'off' else None
+            source = pooled or stream_quiz_questions(topic_for_ai, difficulty, num_questions, use_cache=use_cache)
+
+            for q_data in source:
+                if 'error' in q_data:
+                    yield _sse('error', q_data)
+                    return
+                try:
+                    validate_question(q_data)
+                except ValueError as ve:
+                    yield _sse('skipped', {"error": f"Invalid question data: {ve}"})
+                    continue
+
+                if checker and checker.check(q_data) is not None:
+                    yield _sse('skipped', {"error": "Near-duplicate of an existing question"})
+                    continue
+
+                questions_data.append(q_data)
+                yield _sse('question', {
+                    "index": len(questions_data) - 1,
+                    "question_text": q_data['question_text'],
+                    "options": q_data['options']
+                })
+
+            if not questions_data:
+                yield _sse('error', {"error": "AI generated an empty set of questions. Try a different prompt."})
+                return
+
+            try:
+                # Same single-statement insert as create_quiz
+                new_quiz = insert_quiz(topic_id, custom_topic, difficulty, current_user_id, questions_data)
+                quiz_id = new_quiz.id
+                question_ids = db.session.scalars(
+                    db.select(Question.id).where(Question.quiz_id == quiz_id).order_by(Question.id)
+                ).all()
+                db.session.commit()
+                saved = True
+            except Exception as e:
+                db.session.rollback()
+                yield _sse('error', {"error": "Failed to create quiz", "details": str(e)})
+                return
+            question_index.sync(force=True)
+            quick_play.sync(force=True)
+            if not pooled:
+                forget_cached_generation(topic_for_ai, difficulty, num_questions)
+
+            yield _sse('done', {
+                "message": "Quiz created successfully",
+                "quiz_id": quiz_id,
+                "questions_count": len(questions_data),
+                "question_ids": question_ids
+            })
+        finally:
+            if pooled and not saved:
+                question_pool.restore(topic_id, difficulty, pooled)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        # Disable proxy buffering (nginx) so events reach the client immediately
+        "X-Accel-Buffering": "no"
+    })
+
+@quiz_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_generation_job(job_id):
+    """
+    Get the status of an asynchronous AI quiz generation. (Owner or Admin)
+    Once the status is 'succeeded', 'quiz_id' points at the created quiz.
+    """
+    current_user_id = int(get_jwt_identity())
+    job = db.session.get(GenerationJob, job_id)
+
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job.user_id != current_user_id and not User.query.get(current_user_id).is_admin:
+        return jsonify({"error": "You do not have permission to view this job"}), 403
+
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "quiz_id": job.quiz_id,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }), 200
+
+@quiz_bp.route('/quick-play', methods=['POST'])
+@jwt_required()
+def create_quick_play():
+    """
+    Start a quick play game: random questions of a topic and difficulty,
+    drawn from every quiz of the catalogue. (Logged-in users)
+    Takes 'topic_id', 'difficulty' and optionally 'num_questions' (default 10).
+
+    Only the ids of the drawn questions are stored (a QuickPlayGame of the
+    player); the answers are submitted to POST /result with its
+    'quick_play_id' and graded against the catalogue questions themselves.
+    """
+    data = request.get_json()
+    current_user_id = int(get_jwt_identity())
+
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    topic_id = data.get('topic_id')
+    difficulty = data.get('difficulty')
+    num_questions = data.get('num_questions', 10)
+    max_questions = current_app.config['QUICK_PLAY_MAX_QUESTIONS']
+
+    if not topic_id or not difficulty:
+        return jsonify({"error": "Missing 'topic_id' or 'difficulty'"}), 400
+    if not isinstance(num_questions, int) or not (1 <= num_questions <= max_questions):
+        return jsonify({"error": f"'num_questions' must be an integer between 1 and {max_questions}"}), 400
+    if not db.session.get(Topic, topic_id):
+        return jsonify({"error": f"Topic with id {topic_id} not found"}), 404
+
+    rows = quick_play.sample(topic_id, difficulty, num_questions)
+    if rows is None:
+        return jsonify({
+            "error": "Not enough questions for this topic and difficulty",
+            "available": quick_play.count(topic_id, difficulty)
+        }), 409
+
+    try:
+        game = QuickPlayGame(
+            user_id=current_user_id, topic_id=topic_id, difficulty=difficulty,
+            question_ids=sorted(question_id for question_id, *_ in rows)
+        )
+        db.session.add(game)
+        db.session.commit()
+
+        return jsonify({
+            "message": "Quick play started",
+            "quick_play_id": game.id,
+            "questions": [
+                {"id": question_id, "question_text": text, "options": options}
+                for question_id, text, options, _ in rows
+            ]
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to start quick play", "details": str(e)}), 500
+
 @quiz_bp.route('/', methods=['GET'])
+@conditional('quizzes', 'topics')
 def get_all_quizzes():
     """
-    Get a list of all quizzes. (Public)
+    Get a list of quizzes. (Public)
     This route does NOT return the questions, just quiz metadata.
+
+    Optional filters: ?topic_id=, ?difficulty= (case-insensitive), ?created_by_user_id=
+    With ?limit= and/or ?cursor= the list is keyset paginated, newest first:
+    {"items": [...], "next_cursor": "..."}; pass next_cursor back as ?cursor=
+    for the next page. Without either, the plain list of every matching quiz
+    is returned (compatibility mode).
+    Supports conditional requests (ETag / If-None-Match -> 304).
     """
+    args = request.args
+    # Quick play quizzes are private copies, not part of the catalogue
+    filters = [Quiz.is_quick_play.is_(False)]
     try:
-        quizzes = Quiz.query.all()
-        result = []
-        for quiz in quizzes:
-            topic_name = quiz.custom_topic or (quiz.topic.name if quiz.topic else None)
-            result.append({
-                "id": quiz.id,
-                "topic_name": topic_name,
-                "difficulty": quiz.difficulty,
-                "created_by_user_id": quiz.created_by_user_id,
-                "created_at": quiz.created_at.isoformat()
-            })
-        return jsonify(result), 200
+        for name, column in (('topic_id', Quiz.topic_id), ('created_by_user_id', Quiz.created_by_user_id)):
+            if args.get(name) is not None:
+                try:
+                    filters.append(column == int(args[name]))
+                except ValueError:
+                    raise ValueError(f"'{name}' must be an integer")
+        if args.get('difficulty'):
+            filters.append(db.func.lower(Quiz.difficulty) == args['difficulty'].strip().lower())
+
+        paginated = 'limit' in args or 'cursor' in args
+        if paginated:
+            limit = parse_limit(args.get('limit'), current_app.config['QUIZ_LIST_DEFAULT_LIMIT'],
+                                current_app.config['QUIZ_LIST_MAX_LIMIT'])
+            if args.get('cursor'):
+                cursor_at, cursor_id = decode_cursor(args['cursor'])
+                filters.append(db.tuple_(Quiz.created_at, Quiz.id) < (cursor_at, cursor_id))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    try:
+        # One joined query that only selects the serialized columns (no per-row topic load)
+        query = db.session.query(
+            Quiz.id,
+            db.func.coalesce(db.func.nullif(Quiz.custom_topic, ''), Topic.name).label('topic_name'),
+            Quiz.difficulty,
+            Quiz.created_by_user_id,
+            Quiz.created_at
+        ).outerjoin(Topic, Topic.id == Quiz.topic_id).filter(*filters)
+
+        if paginated:
+            rows = query.order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit + 1).all()
+        else:
+            rows = query.order_by(Quiz.id).all()
+
+        result = [{
+            "id": row.id,
+            "topic_name": row.topic_name,
+            "difficulty": row.difficulty,
+            "created_by_user_id": row.created_by_user_id,
+            "created_at": row.created_at.isoformat()
+        } for row in (rows[:limit] if paginated else rows)]
+
+        if not paginated:
+            return jsonify(result), 200
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return jsonify({"items": result, "next_cursor": next_cursor}), 200
     except Exception as e:
         return jsonify({"error": "Failed to retrieve quizzes", "details": str(e)}), 500
     
+@quiz_bp.route('/search', methods=['GET'])
+@conditional('quizzes', 'questions', 'topics')
+def search_quizzes():
+    """
+    Full-text search over question texts, answer options and topic names. (Public)
+    ?q= free text (every word must match, accents are ignored, "tört*" matches as a prefix),
+    ?limit= and ?offset= page through the results, best match first:
+    {"items": [...], "next_offset": 20, "truncated": false}; items have the shape
+    of the quiz list plus their "score" (higher is better). "truncated" means
+    more documents matched than SEARCH_MAX_HITS and only the best of them were used.
+    """
+    args = request.args
+    try:
+        limit = parse_limit(args.get('limit'), current_app.config['SEARCH_DEFAULT_LIMIT'],
+                            current_app.config['SEARCH_MAX_LIMIT'])
+        try:
+            offset = int(args.get('offset', 0))
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise ValueError("'offset' must be a non-negative integer")
+        if not args.get('q'):
+            raise ValueError("Missing 'q'")
+        if not quiz_search.available:
+            return jsonify({"error": "Search is not available on this database"}), 501
+        hits, truncated = quiz_search.search(args['q'], limit + 1, offset)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    try:
+        page = hits[:limit]
+        rows = {
+            row.id: row for row in db.session.query(
+                Quiz.id,
+                db.func.coalesce(db.func.nullif(Quiz.custom_topic, ''), Topic.name).label('topic_name'),
+                Quiz.difficulty,
+                Quiz.created_by_user_id,
+                Quiz.created_at
+            ).outerjoin(Topic, Topic.id == Quiz.topic_id).filter(Quiz.id.in_([quiz_id for quiz_id, _ in page]))
+        }
+        result = [{
+            "id": quiz_id,
+            "topic_name": rows[quiz_id].topic_name,
+            "difficulty": rows[quiz_id].difficulty,
+            "created_by_user_id": rows[quiz_id].created_by_user_id,
+            "created_at": rows[quiz_id].created_at.isoformat(),
+            "score": score
+        } for quiz_id, score in page if quiz_id in rows]
+
+        next_offset = offset + limit if len(hits) > limit else None
+        return jsonify({"items": result, "next_offset": next_offset, "truncated": truncated}), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to search quizzes", "details": str(e)}), 500
+
 @quiz_bp.route('/<int:quiz_id>', methods=['GET'])
+@conditional(resource=quiz_version)
 def get_quiz_details(quiz_id):
     """
     Get full details for a single quiz, including its questions. (Public)
+    Supports conditional requests (ETag / If-None-Match -> 304).
+    Payloads are cached pre-encoded (see app.quiz_cache), validated against
+    the quiz version @conditional looked up.
     """
     try:
+        cached = quiz_cache.enabled and g.resource_version is not None
+        if cached:
+            body, token = quiz_cache.get(quiz_id, g.resource_version)
+            if body is not None:
+                return Response(body, mimetype='application/json'), 200
+
         quiz = Quiz.query.get(quiz_id)
         if not quiz:
             return jsonify({"error": "Quiz not found"}), 404
@@ -167,7 +525,9 @@ def get_quiz_details(quiz_id):
                 "options": q.options
                 # We do NOT return correct_option_index to the client here
             })
-            
+
+        if cached:
+            return Response(quiz_cache.set(quiz_id, token, quiz_data), mimetype='application/json'), 200
         return jsonify(quiz_data), 200
     except Exception as e:
         return jsonify({"error": "Failed to retrieve quiz details", "details": str(e)}), 500
@@ -191,8 +551,19 @@ def delete_quiz(quiz_id):
         
     try:
         # Deletion will cascade to Questions and Results as per your model definition
+        question_ids = [q.id for q in quiz.questions]
+        topic_id, difficulty = quiz.topic_id, quiz.difficulty
+        player_ids = db.session.scalars(db.select(Result.user_id).where(Result.quiz_id == quiz_id).distinct()).all()
         db.session.delete(quiz)
+        if player_ids:
+            # The removed results leave the players' stats (which cannot be decremented: best_percentage)
+            db.session.flush()
+            rebuild_user_stats(player_ids)
         db.session.commit()
+        question_index.remove(question_ids)
+        quick_play.remove(topic_id, difficulty, question_ids)
+        quiz_cache.invalidate(quiz_id)
+        answer_keys.invalidate(quiz_id)
         return jsonify({"message": "Quiz deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -222,6 +593,8 @@ def update_quiz(quiz_id):
         return jsonify({"error": "No data provided"}), 400
 
     try:
+        old_topic_id, old_difficulty = quiz.topic_id, quiz.difficulty
+
         # --- Update Quiz Metadata ---
         quiz.topic_id = data.get('topic_id', quiz.topic_id)
         quiz.custom_topic = data.get('custom_topic', quiz.custom_topic)
@@ -232,32 +605,139 @@ def update_quiz(quiz_id):
 
         # --- Replace Questions ---
         questions_data = data.get('questions')
+        old_question_ids = [q.id for q in quiz.questions]
+        duplicates = []
         if questions_data is not None: # Allow updating metadata without changing questions
-            
+            if not isinstance(questions_data, list):
+                raise ValueError("'questions' must be a list")
+            rows = validate_questions(questions_data)
+
+            if question_index.policy != 'off':
+                # The quiz's own current questions are replaced, so they do not count
+                duplicates = question_index.find_duplicates(
+                    quiz.topic_id, quiz.custom_topic, rows, ignore_ids=old_question_ids
+                )
+                if duplicates and question_index.policy == 'reject':
+                    db.session.rollback()
+                    return jsonify({"error": "Quiz contains near-duplicate questions", "duplicates": duplicates}), 409
+
             # 1. Delete all existing questions for this quiz
             # The 'delete-orphan' cascade on the relationship handles this
             quiz.questions.clear() 
             db.session.flush() # Apply the clear operation
 
             # 2. Add new questions
-            for q_data in questions_data:
-                if not all(k in q_data for k in ('question_text', 'options', 'correct_option_index')):
-                    raise ValueError("Each new question must have 'question_text', 'options', and 'correct_option_index'")
-                
-                new_question = Question(
-                    quiz_id=quiz.id, # Explicitly set quiz_id
-                    question_text=q_data['question_text'],
-                    options=q_data['options'],
-                    correct_option_index=q_data['correct_option_index']
-                )
-                db.session.add(new_question) # Add new question to session
+            db.session.add_all([Question(quiz_id=quiz.id, **row) for row in rows])
         
         db.session.commit()
-        return jsonify({"message": "Quiz updated successfully", "quiz_id": quiz.id}), 200
+        question_index.reindex_quiz(quiz.id, old_question_ids)
+        quick_play.reindex_quiz(quiz.id, old_topic_id, old_difficulty, old_question_ids)
+        quiz_cache.invalidate(quiz.id)
+        answer_keys.invalidate(quiz.id)
+
+        response = {"message": "Quiz updated successfully", "quiz_id": quiz.id}
+        if duplicates:
+            response["duplicates"] = duplicates
+        return jsonify(response), 200
+
+    except ValueError as ve:
+        db.session.rollback()
+        return jsonify({"error": f"Invalid data: {ve}"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to update quiz", "details": str(e)}), 500
+
+@quiz_bp.route('/<int:quiz_id>', methods=['PATCH'])
+@jwt_required()
+def patch_quiz(quiz_id):
+    """
+    Partially update a quiz. (Owner or Admin)
+    Takes optional metadata ('topic_id', 'custom_topic', 'difficulty') and a
+    per-question diff: 'add' (new questions), 'update' (question_id plus the
+    changed fields) and 'remove' (question ids). Only the affected rows are
+    written, in one transaction; untouched questions keep their ids.
+    """
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    quiz = Quiz.query.get(quiz_id)
+
+    if not quiz:
+        return jsonify({"error": "Quiz not found"}), 404
+
+    # Check permission: must be admin or the user who created the quiz
+    if not user.is_admin and quiz.created_by_user_id != current_user_id:
+        return jsonify({"error": "You do not have permission to edit this quiz"}), 403
+
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    try:
+        old_topic_id, old_difficulty = quiz.topic_id, quiz.difficulty
+        old_question_ids = [q.id for q in quiz.questions]
+
+        # --- Update Quiz Metadata ---
+        if 'topic_id' in data and data['topic_id'] is not None and not db.session.get(Topic, data['topic_id']):
+            return jsonify({"error": f"Topic with id {data['topic_id']} not found"}), 404
+        quiz.topic_id = data.get('topic_id', quiz.topic_id)
+        quiz.custom_topic = data.get('custom_topic', quiz.custom_topic)
+        quiz.difficulty = data.get('difficulty', quiz.difficulty)
+
+        if not (quiz.topic_id or quiz.custom_topic):
+            raise ValueError("Quiz must have either 'topic_id' or 'custom_topic'")
+        if not quiz.difficulty:
+            raise ValueError("Missing 'difficulty'")
+
+        # --- Apply the question diff ---
+        added, updated, removed_ids = apply_question_diff(quiz, data)
+
+        duplicates = []
+        if question_index.policy != 'off' and (added or updated):
+            # Compared with the quiz's remaining questions and every other quiz of the topic
+            changed = [
+                {"question_text": q.question_text, "options": q.options}
+                for q in updated + added
+            ]
+            duplicates = question_index.find_duplicates(
+                quiz.topic_id, quiz.custom_topic, changed,
+                ignore_ids=[q.id for q in updated] + removed_ids
+            )
+
+            def describe(position, prefix=''):
+                # Positions in `changed` back to the terms of the request
+                if position < len(updated):
+                    return {f"{prefix}question_id": updated[position].id}
+                return {f"{prefix}add_index": position - len(updated)}
+
+            for report in duplicates:
+                report.update(describe(report.pop("index")))
+                if "duplicate_of_index" in report:
+                    report.update(describe(report.pop("duplicate_of_index"), "duplicate_of_"))
+
+            if duplicates and question_index.policy == 'reject':
+                db.session.rollback()
+                return jsonify({"error": "Quiz contains near-duplicate questions", "duplicates": duplicates}), 409
+
+        db.session.commit()
+        question_index.reindex_quiz(quiz.id, [q.id for q in updated] + removed_ids)
+        quick_play.reindex_quiz(quiz.id, old_topic_id, old_difficulty, old_question_ids)
+        quiz_cache.invalidate(quiz.id)
+        answer_keys.invalidate(quiz.id)
+
+        response = {
+            "message": "Quiz updated successfully",
+            "quiz_id": quiz.id,
+            "added_question_ids": [q.id for q in added],
+            "updated_question_ids": [q.id for q in updated],
+            "removed_question_ids": removed_ids
+        }
+        if duplicates:
+            response["duplicates"] = duplicates
+        return jsonify(response), 200
 
     except ValueError as ve:
         db.session.rollback()
         return jsonify({"error": f"Invalid data: {ve}"}), 400
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": "Failed to update quiz", "details": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to update quiz", "details": str(e)}), 500
@@ -1,20 +1,42 @@
-from flask import request, jsonify, Blueprint
+import json
+from flask import request, jsonify, Blueprint, Response, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Result, User, Quiz
-from app.extensions import db
+from sqlalchemy.exc import IntegrityError
+from app.models import Result, User
+from app.extensions import db, answer_keys
+from app.pagination import decode_cursor, encode_cursor, parse_datetime, parse_limit
 from app.permission import admin_required
+from app.quick_play import game_answer_keys
+from app.result_store import save_results, store_results, stored_results, valid_client_id
+from app.result_writer import ResultQueueFull, ResultWritePending
 
 # Create a Blueprint for results
 result_bp = Blueprint('result', __name__, url_prefix='/result')
 
+def _write_pending():
+    """Write-behind timeout: the result may still be saved, the client should retry with its client_id."""
+    return jsonify({
+        "message": "A mentés még folyamatban van; küldd újra ugyanazzal a 'client_id'-vel az eredményért",
+        "pending": True
+    }), 202, {"Retry-After": "1"}
+
+def _already_saved(stored):
+    """Response to a submission whose client_id already has a result."""
+    result_id, _, _ = stored
+    return jsonify({"message": "Eredmény már mentve", "result_id": result_id, "duplicate": True}), 200
+
 @result_bp.route('/', methods=['POST'])
 @jwt_required()
 def submit_result():
     """
     Beküldi egy kitöltött kvíz válaszait, kiértékeli,
     és elmenti az eredményt. (Bejelentkezett felhasználó)
+    Az opcionális, kliens által generált 'client_id' miatt az újraküldés
+    nem ment el új eredményt, hanem a már mentettet adja vissza.
+    Gyorsjáték eredményénél 'quiz_id' helyett a 'quick_play_id' kell.
     Várt JSON:
     {
+        "client_id": "a1",
         "quiz_id": 1,
         "answers": [
             { "question_id": 10, "selected_answer": "Válasz A" },
@@ -29,59 +51,195 @@ def submit_result():
         return jsonify({"error": "Nincsenek adatok"}), 400
         
     quiz_id = data.get('quiz_id')
+    quick_play_id = data.get('quick_play_id')
     answers = data.get('answers') # A frontend által küldött válaszok listája
 
-    if not quiz_id or not isinstance(answers, list):
+    if not (quiz_id or quick_play_id) or not isinstance(answers, list):
         return jsonify({"error": "Hiányzó 'quiz_id' vagy 'answers' lista"}), 400
+    if quiz_id and quick_play_id:
+        return jsonify({"error": "A 'quiz_id' és a 'quick_play_id' közül csak az egyik adható meg"}), 400
+    if quick_play_id and (not isinstance(quick_play_id, int) or isinstance(quick_play_id, bool)):
+        return jsonify({"error": "Érvénytelen 'quick_play_id'"}), 400
 
-    quiz = Quiz.query.get(quiz_id)
-    if not quiz:
-        return jsonify({"error": "Kvíz nem található"}), 404
+    client_id = data.get('client_id')
+    if not valid_client_id(client_id):
+        return jsonify({"error": "Érvénytelen 'client_id'"}), 400
 
     try:
-        score = 0
+        if client_id is not None:
+            stored = stored_results(current_user_id, {client_id}).get(client_id)
+            if stored is not None:
+                return _already_saved(stored)
+
+        if quick_play_id:
+            # A gyorsjáték a katalógus kérdései alapján értékelődik
+            answer_key = game_answer_keys(current_user_id, [quick_play_id]).get(quick_play_id)
+            if answer_key is None:
+                return jsonify({"error": "Gyorsjáték nem található"}), 404
+        else:
+            # A kvíz megoldókulcsa (kérdés id -> helyes válasz szövege), gyorsítótárból
+            answer_key = answer_keys.get(quiz_id)
+            if answer_key is None:
+                return jsonify({"error": "Kvíz nem található"}), 404
+
         total_questions = len(answers)
         
-        # A kvízhez tartozó összes helyes válasz lekérése
-        correct_questions = {q.id: q for q in quiz.questions}
-        
-        if total_questions != len(correct_questions):
+        if total_questions != len(answer_key):
              return jsonify({"error": "A válaszok száma nem egyezik a kérdések számával"}), 400
 
         # --- Kiértékelés a szerveren ---
-        for answer in answers:
-            question_id = answer.get('question_id')
-            selected_answer = answer.get('selected_answer')
-            
-            question = correct_questions.get(question_id)
-            
-            if not question:
-                continue # Hiba, a kérdés nem ehhez a kvízhez tartozik
-
-            # A helyes válasz kikeresése az index alapján
-            correct_answer_text = question.options[question.correct_option_index]
-            
-            if selected_answer == correct_answer_text:
-                score += 1
+        # Más kvízhez tartozó kérdésre adott válasz nem ér pontot;
+        # kérdésenként eltároljuk a helyességet és a választott opciót is
+        score, correct_bits, selected_options = answer_key.grade(answers)
         # --- Kiértékelés vége ---
 
-        # Új eredmény mentése az adatbázisba
-        new_result = Result(
-            user_id=current_user_id,
-            quiz_id=quiz_id,
-            score=score,
-            total_questions=total_questions
-        )
-        
-        db.session.add(new_result)
-        db.session.commit()
+        # Új eredmény mentése az adatbázisba (write-behind módban csoportos commit)
+        result_id, = store_results([{
+            "user_id": current_user_id,
+            "quiz_id": quiz_id or None,
+            "quick_play_game_id": quick_play_id or None,
+            "score": score,
+            "total_questions": total_questions,
+            "correct_bits": correct_bits,
+            "selected_options": selected_options,
+            "answer_layout": answer_key.layout,
+            "client_id": client_id
+        }])
         
-        return jsonify({"message": "Eredmény sikeresen mentve", "result_id": new_result.id}), 201
+        return jsonify({"message": "Eredmény sikeresen mentve", "result_id": result_id}), 201
 
+    except ResultQueueFull:
+        return jsonify({"error": "Túl sok egyidejű beküldés, próbáld újra"}), 503, {"Retry-After": "1"}
+    except ResultWritePending:
+        return _write_pending()
+    except IntegrityError as e:
+        # Egy párhuzamos újraküldés ugyanezzel a client_id-vel előbb mentett
+        db.session.rollback()
+        stored = stored_results(current_user_id, {client_id}).get(client_id) if client_id is not None else None
+        if stored is None:
+            return jsonify({"error": "Eredmény mentése sikertelen", "details": str(e)}), 500
+        return _already_saved(stored)
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Eredmény mentése sikertelen", "details": str(e)}), 500
-    
+
+@result_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def submit_results_batch():
+    """
+    Több kitöltött kvíz egyszerre beküldése (pl. offline sorba állított
+    próbálkozások). A bejelentkezett felhasználó nevében egy tranzakcióban
+    menti az összes érvényes eredményt, tételenkénti státusszal.
+    A kliens által generált 'client_id' (opcionális) miatt az újraküldött
+    tételek nem mentődnek el kétszer.
+    Várt JSON:
+    {
+        "results": [
+            { "client_id": "a1", "quiz_id": 1, "answers": [ { "question_id": 10, "selected_answer": "Válasz A" } ] },
+            { "client_id": "a2", "quick_play_id": 7, "answers": [ ... ] }
+        ]
+    }
+    """
+    data = request.get_json(silent=True)
+    current_user_id = int(get_jwt_identity())
+
+    submissions = data.get('results') if isinstance(data, dict) else None
+    if not isinstance(submissions, list) or not submissions:
+        return jsonify({"error": "Hiányzó 'results' lista"}), 400
+
+    max_items = current_app.config['RESULT_BATCH_MAX_ITEMS']
+    if len(submissions) > max_items:
+        return jsonify({"error": f"Legfeljebb {max_items} eredmény küldhető egyszerre"}), 400
+
+    try:
+        statuses = save_results(current_user_id, submissions)
+    except ResultQueueFull:
+        return jsonify({"error": "Túl sok egyidejű beküldés, próbáld újra"}), 503, {"Retry-After": "1"}
+    except ResultWritePending:
+        return _write_pending()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Eredmények mentése sikertelen", "details": str(e)}), 500
+
+    return jsonify({
+        "saved": sum(1 for status in statuses if status["status"] == 201),
+        "items": statuses
+    }), 200
+
+def _history_filters(args):
+    """Optional ?quiz_id=, ?from= (inclusive) and ?to= (exclusive) filters. Raises ValueError."""
+    filters = []
+    if args.get('quiz_id') is not None:
+        try:
+            filters.append(Result.quiz_id == int(args['quiz_id']))
+        except ValueError:
+            raise ValueError("'quiz_id' must be an integer")
+    if args.get('from'):
+        filters.append(Result.completed_at >= parse_datetime(args['from'], 'from'))
+    if args.get('to'):
+        filters.append(Result.completed_at < parse_datetime(args['to'], 'to'))
+    return filters
+
+def _stream_json_array(rows, serialize):
+    """Yields a JSON array of the rows, one chunk per fetched partition."""
+    yield '['
+    first = True
+    for partition in rows.partitions():
+        chunk = ','.join(json.dumps(serialize(row)) for row in partition)
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']'
+
+def _result_history(filters, include_user_id, error_message):
+    """
+    Shared body of the result history routes.
+    With ?limit= and/or ?cursor= the history is keyset paginated over
+    (completed_at, id), newest first: {"items": [...], "next_cursor": "..."}.
+    Without either, every matching result is streamed as a plain JSON array
+    (compatibility mode) from a server-side cursor, in id order.
+    """
+    args = request.args
+    try:
+        filters = filters + _history_filters(args)
+        paginated = 'limit' in args or 'cursor' in args
+        if paginated:
+            limit = parse_limit(args.get('limit'), current_app.config['RESULT_LIST_DEFAULT_LIMIT'],
+                                current_app.config['RESULT_LIST_MAX_LIMIT'])
+            if args.get('cursor'):
+                cursor_at, cursor_id = decode_cursor(args['cursor'])
+                filters.append(db.tuple_(Result.completed_at, Result.id) < (cursor_at, cursor_id))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    columns = [Result.id, Result.quiz_id, Result.quick_play_game_id.label('quick_play_id'),
+               Result.score, Result.total_questions, Result.completed_at]
+    if include_user_id:
+        columns.insert(1, Result.user_id)
+
+    def serialize(row):
+        item = row._asdict()
+        item["completed_at"] = row.completed_at.isoformat()
+        return item
+
+    try:
+        query = db.select(*columns).where(*filters)
+        if paginated:
+            rows = db.session.execute(
+                query.order_by(Result.completed_at.desc(), Result.id.desc()).limit(limit + 1)
+            ).all()
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1]
+                next_cursor = encode_cursor(last.completed_at, last.id)
+            return jsonify({"items": [serialize(row) for row in rows[:limit]], "next_cursor": next_cursor}), 200
+
+        rows = db.session.execute(
+            query.order_by(Result.id).execution_options(yield_per=current_app.config['RESULT_STREAM_BATCH_SIZE'])
+        )
+        return Response(stream_with_context(_stream_json_array(rows, serialize)), mimetype='application/json'), 200
+    except Exception as e:
+        return jsonify({"error": error_message, "details": str(e)}), 500
+
 @result_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_results():
@@ -89,32 +247,16 @@ def get_results():
     Get results.
     - Admins get all results.
     - Regular users get only their own results.
+
+    Optional filters: ?quiz_id=, ?from= / ?to= (ISO 8601, from inclusive, to exclusive)
+    Paginated with ?limit= / ?cursor=, streamed as a plain list otherwise (see _result_history).
     """
     current_user_id = int(get_jwt_identity())
     user = User.query.get(current_user_id)
 
-    try:
-        if user.is_admin:
-            # Admin: Get all results
-            results = Result.query.all()
-        else:
-            # Regular user: Get only their own results
-            results = Result.query.filter_by(user_id=current_user_id).all()
-        
-        result_list = []
-        for res in results:
-            result_list.append({
-                "id": res.id,
-                "user_id": res.user_id,
-                "quiz_id": res.quiz_id,
-                "score": res.score,
-                "total_questions": res.total_questions,
-                "completed_at": res.completed_at.isoformat()
-            })
-            
-        return jsonify(result_list), 200
-    except Exception as e:
-        return jsonify({"error": "Failed to retrieve results", "details": str(e)}), 500
+    # Regular user: Get only their own results
+    filters = [] if user.is_admin else [Result.user_id == current_user_id]
+    return _result_history(filters, True, "Failed to retrieve results")
     
 @result_bp.route('/<int:result_id>', methods=['GET'])
 @jwt_required()
@@ -140,6 +282,7 @@ def get_result_by_id(result_id):
         "id": result.id,
         "user_id": result.user_id,
         "quiz_id": result.quiz_id,
+        "quick_play_id": result.quick_play_game_id,
         "score": result.score,
         "total_questions": result.total_questions,
         "completed_at": result.completed_at.isoformat()
@@ -150,21 +293,9 @@ def get_result_by_id(result_id):
 def get_results_for_user(user_id):
     """
     Get all results for a specific user. (Admin only)
+    Same filters and pagination as GET /result/.
     """
     if not User.query.get(user_id):
         return jsonify({"error": "User not found"}), 404
-        
-    try:
-        results = Result.query.filter_by(user_id=user_id).all()
-        result_list = []
-        for res in results:
-            result_list.append({
-                "id": res.id,
-                "quiz_id": res.quiz_id,
-                "score": res.score,
-                "total_questions": res.total_questions,
-                "completed_at": res.completed_at.isoformat()
-            })
-        return jsonify(result_list), 200
-    except Exception as e:
-        return jsonify({"error": "Failed to retrieve user's results", "details": str(e)}), 500
\ No newline at end of file
+
+    return _result_history([Result.user_id == user_id], False, "Failed to retrieve user's results")
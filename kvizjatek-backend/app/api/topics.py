@@ -1,7 +1,8 @@
 from flask import request, jsonify, Blueprint
-from app.models import Topic
-from app.extensions import db
+from app.models import Topic, PooledQuestion, BulkGenerationItem, QuickPlayGame
+from app.extensions import db, quiz_cache
 from app.permission import admin_required
+from app.versioning import conditional
 
 # Create a Blueprint for topics
 # All topic management (Create, Update, Delete) is restricted to admins.
@@ -31,9 +32,11 @@ def create_topic():
         return jsonify({"error": "Failed to create topic", "details": str(e)}), 500
     
 @topics_bp.route('/', methods=['GET'])
+@conditional('topics')
 def get_all_topics():
     """
     Get a list of all available topics. (Public)
+    Supports conditional requests (ETag / If-None-Match -> 304).
     """
     try:
         topics = Topic.query.all()
@@ -73,6 +76,8 @@ def update_topic(topic_id):
     try:
         topic.name = data['name']
         db.session.commit()
+        # Quiz payloads embed the topic name
+        quiz_cache.clear()
         return jsonify({"id": topic.id, "name": topic.name}), 200
     except Exception as e:
         db.session.rollback()
@@ -97,8 +102,14 @@ def delete_topic(topic_id):
                  "error": "Cannot delete topic, it is being used by one or more quizzes."
              }), 409
 
+        # Drop any pre-generated pool questions and bulk generation cells for this topic
+        PooledQuestion.query.filter_by(topic_id=topic.id).delete()
+        BulkGenerationItem.query.filter_by(topic_id=topic.id).delete()
+        # Quick play games keep their results, without a topic
+        QuickPlayGame.query.filter_by(topic_id=topic.id).update({QuickPlayGame.topic_id: None})
         db.session.delete(topic)
         db.session.commit()
+        quiz_cache.clear()
         return jsonify({"message": "Topic deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
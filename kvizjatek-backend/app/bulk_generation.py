@@ -0,0 +1,290 @@
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
+
+class RateLimiter:
+    """
+    Blocking limiter for `rate_per_minute` starts per minute, shared by threads.
+    Starts are spaced evenly (no bursts); 0 means unlimited.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.next_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+def plan_items(topic_ids, difficulties, counts):
+    """The topic x difficulty x count matrix as (topic_id, difficulty, num_questions) tuples."""
+    return [
+        (topic_id, difficulty, num_questions)
+        for topic_id in topic_ids
+        for difficulty in difficulties
+        for num_questions in counts
+    ]
+
+def create_run(created_by_user_id, topic_ids, difficulties, counts, concurrency=None, rate_per_minute=None):
+    """
+    Creates a queued BulkGenerationRun with one pending item per matrix cell.
+    The caller commits. Raises ValueError for an invalid matrix.
+    """
+    from app.extensions import db
+    from app.jobs import new_job_id
+    from app.models import BulkGenerationItem, BulkGenerationRun, Topic
+
+    config = current_app.config
+    concurrency = concurrency or config['BULK_GENERATION_CONCURRENCY']
+    rate_per_minute = config['BULK_GENERATION_RATE_PER_MINUTE'] if rate_per_minute is None else rate_per_minute
+
+    if not all(isinstance(values, list) and values for values in (topic_ids, difficulties, counts)):
+        raise ValueError("'topic_ids', 'difficulties' and 'counts' must be non-empty lists")
+    if not all(isinstance(t, int) and not isinstance(t, bool) for t in topic_ids):
+        raise ValueError("'topic_ids' must be a list of integers")
+    if not all(isinstance(d, str) and d.strip() for d in difficulties):
+        raise ValueError("'difficulties' must be a list of non-empty strings")
+    if not all(isinstance(c, int) and not isinstance(c, bool) and 1 <= c <= 15 for c in counts):
+        raise ValueError("'counts' must be integers between 1 and 15")
+    if not isinstance(concurrency, int) or not (1 <= concurrency <= config['BULK_GENERATION_MAX_CONCURRENCY']):
+        raise ValueError(f"'concurrency' must be an integer between 1 and {config['BULK_GENERATION_MAX_CONCURRENCY']}")
+    if not isinstance(rate_per_minute, int) or rate_per_minute < 0:
+        raise ValueError("'rate_per_minute' must be a non-negative integer")
+
+    found = {topic_id for (topic_id,) in db.session.query(Topic.id).filter(Topic.id.in_(topic_ids))}
+    missing = [topic_id for topic_id in topic_ids if topic_id not in found]
+    if missing:
+        raise ValueError(f"Topics not found: {missing}")
+
+    cells = plan_items(list(dict.fromkeys(topic_ids)), list(dict.fromkeys(difficulties)), list(dict.fromkeys(counts)))
+    if len(cells) > config['BULK_GENERATION_MAX_ITEMS']:
+        raise ValueError(f"The matrix has {len(cells)} cells, the limit is {config['BULK_GENERATION_MAX_ITEMS']}")
+
+    run = BulkGenerationRun(
+        id=new_job_id(),
+        created_by_user_id=created_by_user_id,
+        concurrency=concurrency,
+        rate_per_minute=rate_per_minute
+    )
+    db.session.add(run)
+    db.session.flush()
+    # One multi-row INSERT instead of an ORM round trip per item
+    db.session.execute(db.insert(BulkGenerationItem), [
+        {"run_id": run.id, "topic_id": topic_id, "difficulty": difficulty, "num_questions": num_questions,
+         "status": "pending", "attempts": 0}
+        for topic_id, difficulty, num_questions in cells
+    ])
+    return run
+
+def reset_failed_items(run_id):
+    """Puts the failed items of a run back to pending so a resume retries them. The caller commits."""
+    from app.extensions import db
+    from app.models import BulkGenerationItem
+
+    return db.session.execute(
+        db.update(BulkGenerationItem)
+        .where(BulkGenerationItem.run_id == run_id, BulkGenerationItem.status == 'failed')
+        .values(status='pending', error=None, finished_at=None)
+    ).rowcount
+
+def run_progress(run):
+    """Progress report of a run: item counts per status plus the failed items."""
+    from app.extensions import db
+    from app.models import BulkGenerationItem
+
+    counts = dict(
+        db.session.query(BulkGenerationItem.status, db.func.count())
+        .filter(BulkGenerationItem.run_id == run.id)
+        .group_by(BulkGenerationItem.status)
+    )
+    failed = db.session.query(
+        BulkGenerationItem.id, BulkGenerationItem.topic_id, BulkGenerationItem.difficulty,
+        BulkGenerationItem.num_questions, BulkGenerationItem.attempts, BulkGenerationItem.error
+    ).filter(BulkGenerationItem.run_id == run.id, BulkGenerationItem.status == 'failed').all()
+
+    total = sum(counts.values())
+    done = counts.get('succeeded', 0) + counts.get('failed', 0)
+    return {
+        "run_id": run.id,
+        "status": run.status,
+        "concurrency": run.concurrency,
+        "rate_per_minute": run.rate_per_minute,
+        "total": total,
+        "pending": counts.get('pending', 0),
+        "succeeded": counts.get('succeeded', 0),
+        "failed": counts.get('failed', 0),
+        "progress": done / total if total else 1.0,
+        "created_at": run.created_at.isoformat(),
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+        "failed_items": [
+            {"item_id": item_id, "topic_id": topic_id, "difficulty": difficulty,
+             "num_questions": num_questions, "attempts": attempts, "error": error}
+            for item_id, topic_id, difficulty, num_questions, attempts, error in failed
+        ]
+    }
+
+def _generate_item(app, limiter, item):
+    """
+    Worker side: one AI generation for a (item_id, topic_id, topic_name, difficulty, num_questions) tuple.
+    Returns (item_id, questions, error).
+    """
+    from app import ai_generator
+    from app.quiz_service import drop_ai_duplicates
+
+    item_id, topic_id, topic_name, difficulty, num_questions = item
+    limiter.acquire()
+    with app.app_context():
+        try:
+            # Bulk seeding wants fresh quizzes, not replays of cached generations
+            ai_response = ai_generator.generate_quiz_questions(topic_name, difficulty, num_questions, use_cache=False)
+            if isinstance(ai_response, dict) and 'error' in ai_response:
+                return item_id, None, f"{ai_response['error']}: {ai_response.get('details', '')}"
+            questions = drop_ai_duplicates(topic_id, None, topic_name, difficulty, ai_response)
+        except Exception as e:
+            return item_id, None, str(e)
+        if not questions:
+            return item_id, None, "AI generated an empty set of questions. Try a different prompt."
+        return item_id, questions, None
+
+def _write_batch(run, results):
+    """
+    Persists a batch of finished generations in one transaction: the new
+    quizzes plus the status of their items. A quiz that cannot be built only
+    fails its own item; if the transaction itself fails, the items are
+    written one by one so only the offending one is marked failed.
+    """
+    from app.extensions import db, question_index
+    from app.models import BulkGenerationItem
+    from app.quiz_service import build_quiz
+
+    now = datetime.datetime.utcnow()
+    items = {
+        item.id: item for item in
+        BulkGenerationItem.query.filter(BulkGenerationItem.id.in_([item_id for item_id, _, _ in results]))
+    }
+
+    created = []
+    try:
+        for item_id, questions, error in results:
+            item = items[item_id]
+            item.attempts += 1
+            item.finished_at = now
+            if error is None:
+                try:
+                    quiz = build_quiz(item.topic_id, None, item.difficulty, run.created_by_user_id, questions)
+                except ValueError as ve:
+                    error = f"Invalid question data: {ve}"
+                except Exception as e:
+                    error = f"Could not build the quiz: {e}"
+                else:
+                    db.session.add(quiz)
+                    created.append((item, quiz))
+            item.status = 'failed' if error else 'succeeded'
+            item.error = error
+
+        db.session.flush()
+        for item, quiz in created:
+            item.quiz_id = quiz.id
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        if len(results) > 1:
+            for result in results:
+                _write_batch(run, [result])
+            return
+        db.session.execute(
+            db.update(BulkGenerationItem).where(BulkGenerationItem.id == results[0][0]).values(
+                status='failed', error=f"Could not store the quiz: {e}", finished_at=now,
+                attempts=BulkGenerationItem.attempts + 1
+            )
+        )
+        db.session.commit()
+    question_index.sync(force=True)
+
+def run_bulk_generation(run_id):
+    """
+    Runs (or resumes) a bulk generation: every pending item of the run is
+    generated on a pool of `run.concurrency` threads, starting at most
+    `run.rate_per_minute` generations per minute. Finished generations are
+    written in transactions of BULK_GENERATION_COMMIT_SIZE items, so a crash
+    loses at most one batch and a resume only redoes items that did not
+    succeed. The run always ends in a terminal status, 'failed' if it was
+    aborted by an unexpected error (its unfinished items stay pending).
+    """
+    from app.extensions import db
+    from app.models import BulkGenerationItem, BulkGenerationRun, Topic
+
+    app = current_app._get_current_object()
+    run = db.session.get(BulkGenerationRun, run_id)
+    if not run:
+        return None
+
+    run.status = 'running'
+    run.started_at = run.started_at or datetime.datetime.utcnow()
+    run.finished_at = None
+    db.session.commit()
+
+    completed = False
+    try:
+        pending = db.session.query(
+            BulkGenerationItem.id, BulkGenerationItem.topic_id, Topic.name,
+            BulkGenerationItem.difficulty, BulkGenerationItem.num_questions
+        ).join(Topic, Topic.id == BulkGenerationItem.topic_id).filter(
+            BulkGenerationItem.run_id == run_id, BulkGenerationItem.status == 'pending'
+        ).order_by(BulkGenerationItem.id).all()
+
+        limiter = RateLimiter(run.rate_per_minute)
+        commit_size = app.config['BULK_GENERATION_COMMIT_SIZE']
+        batch = []
+
+        with ThreadPoolExecutor(max_workers=run.concurrency, thread_name_prefix='kvizjatek-bulk') as executor:
+            futures = [executor.submit(_generate_item, app, limiter, tuple(item)) for item in pending]
+            try:
+                for future in as_completed(futures):
+                    batch.append(future.result())
+                    if len(batch) >= commit_size:
+                        _write_batch(run, batch)
+                        batch = []
+            except BaseException:
+                # Aborted run: do not start (and pay for) the generations still queued
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        if batch:
+            _write_batch(run, batch)
+        completed = True
+    finally:
+        if not completed:
+            db.session.rollback()
+        _finish_run(run, completed)
+    return run
+
+def _finish_run(run, completed):
+    """Sets the terminal status of a run from its item counts ('failed' if it did not complete)."""
+    from app.extensions import db
+    from app.models import BulkGenerationItem
+
+    counts = dict(
+        db.session.query(BulkGenerationItem.status, db.func.count())
+        .filter(BulkGenerationItem.run_id == run.id)
+        .group_by(BulkGenerationItem.status)
+    )
+    if not completed:
+        run.status = 'failed'
+    elif not counts.get('failed'):
+        run.status = 'succeeded'
+    elif counts.get('succeeded'):
+        run.status = 'partial'
+    else:
+        run.status = 'failed'
+    run.finished_at = datetime.datetime.utcnow()
+    db.session.commit()
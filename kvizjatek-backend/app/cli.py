@@ -0,0 +1,162 @@
+import click
+from flask.cli import with_appcontext
+
+def _split(value, cast=str):
+    return [cast(part.strip()) for part in value.split(',') if part.strip()] if value else []
+
+def _admin_owner(username):
+    """The admin named `username` (or the first admin) who will own created quizzes."""
+    from app.models import User
+
+    query = User.query.filter_by(username=username) if username else User.query.filter_by(is_admin=True)
+    owner = query.order_by(User.id).first()
+    if not owner or not owner.is_admin:
+        raise click.ClickException("An admin user is required to own the created quizzes")
+    return owner
+
+@click.command('bulk-generate')
+@click.option('--topics', help="Comma separated topic ids (default: every topic).")
+@click.option('--difficulties', default='Easy,Medium,Hard', show_default=True, help="Comma separated difficulties.")
+@click.option('--counts', default='5', show_default=True, help="Comma separated question counts per quiz.")
+@click.option('--concurrency', type=int, help="Parallel AI generations (default: BULK_GENERATION_CONCURRENCY).")
+@click.option('--rate', 'rate_per_minute', type=int, help="Max generations started per minute, 0 = unlimited.")
+@click.option('--user', 'username', help="Admin who will own the quizzes (default: the first admin).")
+@click.option('--resume', 'resume_run_id', help="Retry the failed and unfinished items of an earlier run.")
+@with_appcontext
+def bulk_generate_command(topics, difficulties, counts, concurrency, rate_per_minute, username, resume_run_id):
+    """Generates AI quizzes for a topic x difficulty x count matrix in the foreground."""
+    from app.bulk_generation import create_run, reset_failed_items, run_bulk_generation, run_progress
+    from app.extensions import db
+    from app.models import BulkGenerationRun, Topic
+
+    if resume_run_id:
+        run = db.session.get(BulkGenerationRun, resume_run_id)
+        if not run:
+            raise click.ClickException(f"Run {resume_run_id} not found")
+        reset_failed_items(run.id)
+        db.session.commit()
+    else:
+        owner = _admin_owner(username)
+        try:
+            topic_ids = _split(topics, int) or [topic_id for (topic_id,) in db.session.query(Topic.id)]
+            run = create_run(owner.id, topic_ids, _split(difficulties), _split(counts, int), concurrency, rate_per_minute)
+            db.session.commit()
+        except ValueError as ve:
+            db.session.rollback()
+            raise click.ClickException(str(ve))
+
+    click.echo(f"Run {run.id}: generating...")
+    run_bulk_generation(run.id)
+
+    report = run_progress(db.session.get(BulkGenerationRun, run.id))
+    click.echo(f"Run {report['run_id']} {report['status']}: "
+               f"{report['succeeded']} succeeded, {report['failed']} failed of {report['total']}")
+    for item in report['failed_items']:
+        click.echo(f"  item {item['item_id']} (topic {item['topic_id']}, {item['difficulty']}, "
+                   f"{item['num_questions']}): {item['error']}")
+    if report['failed']:
+        click.echo(f"Resume with: flask bulk-generate --resume {report['run_id']}")
+
+@click.command('export-quizzes')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--batch-size', type=int, help="Quizzes per query (default: QUIZ_TRANSFER_BATCH_SIZE).")
+@with_appcontext
+def export_quizzes_command(output, batch_size):
+    """Writes every quiz with its questions to OUTPUT (default: stdout) as NDJSON."""
+    from app.quiz_transfer import export_quizzes
+
+    for line in export_quizzes(batch_size):
+        output.write(line)
+
+@click.command('import-quizzes')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', type=int, help="Quizzes per transaction (default: QUIZ_TRANSFER_BATCH_SIZE).")
+@click.option('--user', 'username', help="Admin who will own the quizzes (default: the first admin).")
+@with_appcontext
+def import_quizzes_command(source, batch_size, username):
+    """Imports quizzes from an NDJSON file (the export-quizzes format, '-' for stdin)."""
+    from app.quiz_transfer import import_quizzes
+
+    report = import_quizzes(source, _admin_owner(username).id, batch_size)
+    click.echo(f"{report['imported']} quizzes imported, {report['failed']} lines failed")
+    for error in report['errors']:
+        click.echo(f"  line {error['line']}: {error['error']}")
+    for duplicate in report['duplicates']:
+        click.echo(f"  line {duplicate['line']}: {len(duplicate['duplicates'])} near-duplicate questions")
+
+@click.command('export-results')
+@click.argument('output', type=click.File('wb'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet', 'arrow']), default='csv', show_default=True,
+              help="parquet and arrow need pyarrow installed.")
+@click.option('--batch-size', type=int, help="Rows fetched per round trip (default: RESULT_EXPORT_BATCH_SIZE).")
+@with_appcontext
+def export_results_command(output, fmt, batch_size):
+    """Writes every result with its user and quiz metadata to OUTPUT (default: stdout)."""
+    from app.result_export import ExportFormatUnavailable, export_results
+
+    try:
+        chunks = export_results(fmt, batch_size)
+    except ExportFormatUnavailable as e:
+        raise click.ClickException(str(e))
+    for chunk in chunks:
+        output.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+@click.command('prune-quick-play')
+@click.option('--older-than', 'older_than_hours', type=int,
+              help="Age in hours of the unplayed games to delete (default: QUICK_PLAY_UNPLAYED_TTL_HOURS).")
+@with_appcontext
+def prune_quick_play_command(older_than_hours):
+    """Deletes the quick play games that were started but never played (no result)."""
+    from flask import current_app
+    from app.extensions import db
+    from app.quick_play import prune_unplayed
+
+    if older_than_hours is None:
+        older_than_hours = current_app.config['QUICK_PLAY_UNPLAYED_TTL_HOURS']
+    deleted = prune_unplayed(older_than_hours)
+    db.session.commit()
+    click.echo(f"{deleted} unplayed quick play games deleted")
+
+@click.command('rebuild-user-stats')
+@click.option('--user', 'user_id', type=int, help="Only rebuild the stats of this user id.")
+@with_appcontext
+def rebuild_user_stats_command(user_id):
+    """Recomputes the user_stats rollups from the results table."""
+    from app.extensions import db
+    from app.user_stats import rebuild_user_stats
+
+    written = rebuild_user_stats([user_id] if user_id is not None else None)
+    db.session.commit()
+    click.echo(f"{written} user_stats rows rebuilt")
+
+@click.command('compute-question-analytics')
+@click.option('--batch-size', type=int, help="Results fetched per round trip (default: QUESTION_ANALYTICS_BATCH_SIZE).")
+@with_appcontext
+def compute_question_analytics_command(batch_size):
+    """Recomputes the per-question answer statistics served by /api/admin/analytics/questions."""
+    from app.question_analytics import compute_question_analytics
+
+    report = compute_question_analytics(batch_size)
+    click.echo(f"{report['questions']} questions from {report['results']} results "
+               f"({report['skipped']} results without matching answer data skipped)")
+
+@click.command('recover-jobs')
+@with_appcontext
+def recover_jobs_command():
+    """Fails the generation jobs and bulk runs left queued/running by a stopped server."""
+    from app.extensions import db
+    from app.jobs import recover_orphaned_jobs
+
+    report = recover_orphaned_jobs()
+    db.session.commit()
+    click.echo(f"{report['jobs']} generation jobs and {report['runs']} bulk runs marked failed")
+
+def register_commands(app):
+    app.cli.add_command(bulk_generate_command)
+    app.cli.add_command(export_quizzes_command)
+    app.cli.add_command(import_quizzes_command)
+    app.cli.add_command(export_results_command)
+    app.cli.add_command(prune_quick_play_command)
+    app.cli.add_command(rebuild_user_stats_command)
+    app.cli.add_command(compute_question_analytics_command)
+    app.cli.add_command(recover_jobs_command)
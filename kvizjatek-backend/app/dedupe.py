@@ -0,0 +1,269 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from flask import current_app
+from .ai_cache import normalize_text
+
+_WORD = re.compile(r'\w+')
+
+def question_shingles(question_text, options):
+    """
+    Shingle set of a question: the words and word pairs of its text,
+    plus every normalized option as a whole.
+    """
+    words = _WORD.findall(normalize_text(question_text))
+    shingles = set(words)
+    shingles.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    shingles.update(f"opt:{normalize_text(option)}" for option in options or ())
+    return shingles
+
+def scope_key(topic_id, custom_topic):
+    """Questions are only compared within the same topic."""
+    if custom_topic:
+        return f"custom:{normalize_text(custom_topic)}"
+    return f"topic:{topic_id}"
+
+class MinHasher:
+    """
+    MinHash signatures with `num_perm` hash functions.
+
+    Each shingle is hashed once (64-bit blake2b); the hash functions are that
+    hash XOR-ed with per-position random masks, which keeps a signature well
+    under a millisecond in pure Python.
+    """
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+    def signature(self, shingles):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+            for s in shingles
+        ] or [0]
+        return tuple(map(min, ([h ^ mask for h in hashes] for mask in self.masks)))
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: the share of equal signature positions."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+class DuplicateChecker:
+    """
+    Checks the questions of one quiz one by one against the index and
+    against the questions of the same quiz checked before them.
+    """
+
+    def __init__(self, index, scope, ignore_ids=()):
+        self.index = index
+        self.scope = scope
+        self.ignore_ids = set(ignore_ids)
+        self.batch = []
+
+    def check(self, q_data, position=None):
+        """
+        Returns (duplicate_of, similarity) for a near-duplicate, else None.
+        duplicate_of is a question id, or ('batch', position) for an earlier
+        question of the same quiz. Unique questions are remembered for later
+        checks under `position` (default: their order of arrival).
+        """
+        signature = self.index.signature(q_data.get('question_text', ''), q_data.get('options'))
+        threshold = current_app.config['DUPLICATE_QUESTION_THRESHOLD']
+
+        for other_position, other in self.batch:
+            similarity = estimate_similarity(signature, other)
+            if similarity >= threshold:
+                return ('batch', other_position), similarity
+
+        match = self.index.lookup(self.scope, signature, self.ignore_ids)
+        if match:
+            return match
+
+        self.batch.append((len(self.batch) if position is None else position, signature))
+        return None
+
+class QuestionIndex:
+    """
+    In-process MinHash/LSH index of every stored question, per topic.
+
+    Signatures are split into DUPLICATE_QUESTION_BANDS bands; two questions
+    become candidates when any band matches, and candidates are confirmed by
+    the estimated similarity (DUPLICATE_QUESTION_THRESHOLD). A lookup is a
+    few dictionary probes.
+
+    The index is built from the database when the app starts
+    (DUPLICATE_INDEX_PRELOAD; otherwise, or if the tables do not exist yet,
+    on first use) and then catches up incrementally (questions with an id
+    above the last one seen), so inserts made by other worker processes
+    show up within DUPLICATE_INDEX_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('DUPLICATE_QUESTION_POLICY', 'flag')
+        app.config.setdefault('DUPLICATE_QUESTION_THRESHOLD', 0.7)
+        app.config.setdefault('DUPLICATE_QUESTION_NUM_PERM', 64)
+        app.config.setdefault('DUPLICATE_QUESTION_BANDS', 16)
+        app.config.setdefault('DUPLICATE_INDEX_SYNC_INTERVAL', 5)
+        app.config.setdefault('DUPLICATE_INDEX_PRELOAD', True)
+        app.extensions['question_index'] = {
+            'lock': threading.RLock(),
+            'hasher': MinHasher(app.config['DUPLICATE_QUESTION_NUM_PERM']),
+            # (scope, band number, band values) -> {question ids}
+            'buckets': {},
+            # question id -> (scope, signature)
+            'entries': {},
+            'watermark': 0,
+            'synced_at': None,
+        }
+        if app.config['DUPLICATE_INDEX_PRELOAD']:
+            self.preload(app)
+
+    def preload(self, app):
+        """Builds the index from the database at startup, so the first duplicate check does not pay for it."""
+        from sqlalchemy.exc import SQLAlchemyError
+        from app.extensions import db
+
+        with app.app_context():
+            try:
+                self.sync(force=True)
+            except SQLAlchemyError:
+                # No schema yet (e.g. before `flask db upgrade`): the first lookup loads the index
+                db.session.rollback()
+                app.extensions['question_index']['synced_at'] = None
+
+    def _state(self):
+        return current_app.extensions['question_index']
+
+    @property
+    def policy(self):
+        return current_app.config['DUPLICATE_QUESTION_POLICY']
+
+    def signature(self, question_text, options):
+        return self._state()['hasher'].signature(question_shingles(question_text, options))
+
+    def _bands(self, signature):
+        bands = current_app.config['DUPLICATE_QUESTION_BANDS']
+        rows = len(signature) // bands
+        return [(i, signature[i * rows:(i + 1) * rows]) for i in range(bands)]
+
+    def _add(self, question_id, scope, signature):
+        state = self._state()
+        state['entries'][question_id] = (scope, signature)
+        for band, values in self._bands(signature):
+            state['buckets'].setdefault((scope, band, values), set()).add(question_id)
+
+    def remove(self, question_ids):
+        state = self._state()
+        with state['lock']:
+            for question_id in question_ids:
+                entry = state['entries'].pop(question_id, None)
+                if entry is None:
+                    continue
+                scope, signature = entry
+                for band, values in self._bands(signature):
+                    bucket = state['buckets'].get((scope, band, values))
+                    if bucket is not None:
+                        bucket.discard(question_id)
+                        if not bucket:
+                            del state['buckets'][(scope, band, values)]
+
+    def _load(self, *criteria):
+        """Indexes the questions matching the criteria with one column-projected query (quick play copies excluded)."""
+        from app.extensions import db
+        from app.models import Question, Quiz
+
+        # Questions pending in the caller's session (e.g. a PATCH being checked) must not be
+        # flushed by this query: they would be indexed and matched against themselves
+        with db.session.no_autoflush:
+            rows = db.session.query(
+                Question.id, Question.question_text, Question.options, Quiz.topic_id, Quiz.custom_topic
+            ).join(Quiz, Quiz.id == Question.quiz_id).filter(Quiz.is_quick_play.is_(False), *criteria).all()
+
+        state = self._state()
+        with state['lock']:
+            for question_id, text, options, topic_id, custom_topic in rows:
+                self._add(question_id, scope_key(topic_id, custom_topic), self.signature(text, options))
+                state['watermark'] = max(state['watermark'], question_id)
+        return len(rows)
+
+    def sync(self, force=False):
+        """Indexes every question stored since the last sync."""
+        from app.models import Question
+
+        state = self._state()
+        now = time.monotonic()
+        interval = current_app.config['DUPLICATE_INDEX_SYNC_INTERVAL']
+        if not force and state['synced_at'] is not None and now - state['synced_at'] < interval:
+            return 0
+        state['synced_at'] = now
+        return self._load(Question.id > state['watermark'])
+
+    def reindex_quiz(self, quiz_id, old_question_ids=()):
+        """Re-reads a quiz after an update (new questions, or a new topic)."""
+        from app.models import Question
+
+        self.remove(old_question_ids)
+        self._load(Question.quiz_id == quiz_id)
+
+    def lookup(self, scope, signature, ignore_ids=()):
+        """Returns (question_id, similarity) of the most similar stored question above the threshold, or None."""
+        from app.extensions import db
+        from app.models import Question
+
+        self.sync()
+        state = self._state()
+        threshold = current_app.config['DUPLICATE_QUESTION_THRESHOLD']
+
+        with state['lock']:
+            candidates = set()
+            for band, values in self._bands(signature):
+                candidates |= state['buckets'].get((scope, band, values), set())
+            candidates -= set(ignore_ids)
+
+            matches = sorted(
+                ((estimate_similarity(signature, state['entries'][qid][1]), qid) for qid in candidates),
+                reverse=True
+            )
+        matches = [(similarity, qid) for similarity, qid in matches if similarity >= threshold]
+        if not matches:
+            return None
+
+        # Another worker may have deleted the matched questions meanwhile
+        with db.session.no_autoflush:
+            existing = {qid for (qid,) in db.session.query(Question.id).filter(Question.id.in_([qid for _, qid in matches]))}
+        self.remove([qid for _, qid in matches if qid not in existing])
+        for similarity, qid in matches:
+            if qid in existing:
+                return qid, similarity
+        return None
+
+    def checker(self, topic_id, custom_topic, ignore_ids=()):
+        return DuplicateChecker(self, scope_key(topic_id, custom_topic), ignore_ids)
+
+    def find_duplicates(self, topic_id, custom_topic, questions_data, ignore_ids=()):
+        """
+        Reports the near-duplicates in a list of question dicts:
+        [{"index": 2, "duplicate_of_question_id": 17, "similarity": 0.91}, ...]
+        (duplicate_of_index instead of the id for a repeat within the list).
+        """
+        checker = self.checker(topic_id, custom_topic, ignore_ids)
+        duplicates = []
+        for i, q_data in enumerate(questions_data):
+            if not isinstance(q_data, dict):
+                continue
+            match = checker.check(q_data, i)
+            if match is None:
+                continue
+            duplicate_of, similarity = match
+            report = {"index": i, "similarity": round(similarity, 3)}
+            if isinstance(duplicate_of, tuple):
+                report["duplicate_of_index"] = duplicate_of[1]
+            else:
+                report["duplicate_of_question_id"] = duplicate_of
+            duplicates.append(report)
+        return duplicates
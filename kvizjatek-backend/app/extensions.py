@@ -4,6 +4,18 @@ from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_marshmallow import Marshmallow
 from flask_bcrypt import Bcrypt
+from .ai_cache import AICache
+from .answer_keys import AnswerKeyCache
+from .result_writer import ResultWriter
+from .ai_client import AIClientManager
+from .ai_metrics import AIMetrics
+from .dedupe import QuestionIndex
+from .jobs import JobQueue
+from .question_pool import QuestionPool
+from .quick_play import QuickPlayIndex
+from .quiz_cache import QuizDetailCache
+from .search import QuizSearch
+from .versioning import TableVersions
 
 db = SQLAlchemy()
 
@@ -13,4 +25,27 @@ migrate = Migrate()
 
 bcrypt = Bcrypt()
 
-ma = Marshmallow()
\ No newline at end of file
+ma = Marshmallow()
+
+jobs = JobQueue()
+
+question_pool = QuestionPool()
+
+ai_cache = AICache()
+
+ai_client = AIClientManager()
+
+question_index = QuestionIndex()
+
+ai_metrics = AIMetrics()
+
+table_versions = TableVersions()
+
+quiz_cache = QuizDetailCache()
+
+quiz_search = QuizSearch()
+
+quick_play = QuickPlayIndex()
+
+answer_keys = AnswerKeyCache()
+result_writer = ResultWriter()
@@ -0,0 +1,156 @@
+import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app
+
+RESTART_ERROR = "Interrupted by a server restart"
+
+class JobQueue:
+    """
+    Small in-process background worker pool.
+
+    Long running work (e.g. AI quiz generation) is handed to a thread pool so
+    request workers can answer immediately. Job state that clients poll lives
+    in the database, so any worker process can report it.
+
+    A job only runs in the process that accepted it, so jobs still queued or
+    running when the app starts were lost with a previous process; they are
+    marked failed at startup (JOB_RECOVERY_ON_STARTUP).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('AI_JOB_WORKERS', 4)
+        executor = ThreadPoolExecutor(
+            max_workers=app.config['AI_JOB_WORKERS'],
+            thread_name_prefix='kvizjatek-job'
+        )
+        app.extensions['job_queue'] = {'executor': executor, 'futures': {}}
+        app.config.setdefault('JOB_RECOVERY_ON_STARTUP', True)
+        # CLI commands (cron jobs, `flask db upgrade`, ...) may run next to a live server
+        if app.config['JOB_RECOVERY_ON_STARTUP'] and click.get_current_context(silent=True) is None:
+            self.recover(app)
+
+    def recover(self, app):
+        """Fails the jobs orphaned by a previous process at startup."""
+        from sqlalchemy.exc import SQLAlchemyError
+        from app.extensions import db
+
+        with app.app_context():
+            try:
+                recover_orphaned_jobs()
+                db.session.commit()
+            except SQLAlchemyError:
+                # No schema yet (e.g. before `flask db upgrade`)
+                db.session.rollback()
+
+    def _state(self, app=None):
+        return (app or current_app).extensions['job_queue']
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the pool inside an app context.
+        The returned future is also remembered under `key` until it finishes.
+        """
+        app = current_app._get_current_object()
+        state = self._state(app)
+
+        def run():
+            with app.app_context():
+                return fn(*args, **kwargs)
+
+        future = state['executor'].submit(run)
+        state['futures'][key] = future
+        future.add_done_callback(lambda _: state['futures'].pop(key, None))
+        return future
+
+    def is_pending(self, key):
+        """True if a job submitted under `key` has not finished yet."""
+        return key in self._state()['futures']
+
+    def wait(self, key, timeout=None):
+        """Blocks until the job submitted under `key` (if still running) finishes."""
+        future = self._state()['futures'].get(key)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def shutdown(self, app=None, wait=True):
+        self._state(app)['executor'].shutdown(wait=wait)
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+def recover_orphaned_jobs():
+    """
+    Marks the generation jobs and bulk runs left 'queued' or 'running' as
+    failed, so clients polling them get an answer and bulk runs can be
+    resumed (their pending items are kept). The caller commits.
+    Returns the number of jobs and runs failed.
+    """
+    from app.extensions import db
+    from app.models import BulkGenerationRun, GenerationJob
+
+    now = datetime.datetime.utcnow()
+    failed_jobs = db.session.execute(
+        db.update(GenerationJob)
+        .where(GenerationJob.status.in_(('queued', 'running')))
+        .values(status='failed', error=RESTART_ERROR, finished_at=now)
+    ).rowcount
+    failed_runs = db.session.execute(
+        db.update(BulkGenerationRun)
+        .where(BulkGenerationRun.status.in_(('queued', 'running')))
+        .values(status='failed', finished_at=now)
+    ).rowcount
+    return {'jobs': failed_jobs, 'runs': failed_runs}
+
+def run_generation_job(job_id):
+    """
+    Worker side of an asynchronous AI quiz generation.
+    Calls the AI service and persists the Quiz/Question rows,
+    recording the outcome on the GenerationJob row.
+    """
+    from app import ai_generator
+    from app.extensions import db, question_index
+    from app.models import GenerationJob, Topic
+    from app.quiz_service import build_quiz, drop_ai_duplicates, forget_cached_generation
+
+    job = db.session.get(GenerationJob, job_id)
+    if not job:
+        return
+
+    job.status = 'running'
+    db.session.commit()
+
+    try:
+        topic_for_ai = job.custom_topic or db.session.get(Topic, job.topic_id).name
+        ai_response = ai_generator.generate_quiz_questions(
+            topic_for_ai, job.difficulty, job.num_questions, use_cache=job.use_cache
+        )
+
+        if isinstance(ai_response, dict) and 'error' in ai_response:
+            raise RuntimeError(f"{ai_response['error']}: {ai_response.get('details', '')}")
+        ai_response = drop_ai_duplicates(job.topic_id, job.custom_topic, topic_for_ai, job.difficulty, ai_response)
+        if not ai_response:
+            raise RuntimeError("AI generated an empty set of questions. Try a different prompt.")
+
+        new_quiz = build_quiz(job.topic_id, job.custom_topic, job.difficulty, job.user_id, ai_response)
+        db.session.add(new_quiz)
+        db.session.flush()
+
+        job.quiz_id = new_quiz.id
+        job.status = 'succeeded'
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(GenerationJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = datetime.datetime.utcnow()
+    db.session.commit()
+    if job.quiz_id:
+        question_index.sync(force=True)
+        forget_cached_generation(topic_for_ai, job.difficulty, job.num_questions)
@@ -13,6 +13,7 @@ class User(db.Model):
     
     quizzes = db.relationship('Quiz', back_populates='created_by_user', lazy=True)
     results = db.relationship('Result', back_populates='user', lazy=True)
+    stats = db.relationship('UserStats', back_populates='user', lazy=True, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -30,6 +31,11 @@ class Topic(db.Model):
 
 class Quiz(db.Model):
     __tablename__ = 'quizzes'
+    __table_args__ = (
+        # Keyset pagination of the quiz list (newest first)
+        db.Index('ix_quizzes_created_at_id', 'created_at', 'id'),
+        db.Index('ix_quizzes_topic_id', 'topic_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -41,6 +47,15 @@ class Quiz(db.Model):
     created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    # Private copy of randomly drawn catalogue questions made by earlier quick play
+    # versions (now QuickPlayGame), not part of the catalogue
+    is_quick_play = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    # Bumped (with updated_at) by every write to the quiz, its questions or its
+    # topic's name (app.versioning); drives the quiz's ETag and its cached copies
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.datetime.utcnow)
     
     created_by_user = db.relationship('User', back_populates='quizzes')
     topic = db.relationship('Topic', back_populates='quizzes')
@@ -57,7 +72,8 @@ class Question(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    # Indexed: answer keys, analytics and the quiz detail load questions per quiz
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False, index=True)
     
     question_text = db.Column(db.Text, nullable=False)
     
@@ -72,19 +88,221 @@ class Question(db.Model):
 
 class Result(db.Model):
     __tablename__ = 'results'
+    __table_args__ = (
+        # Keyset pagination of result histories (newest first), overall, per user and per quiz
+        db.Index('ix_results_completed_at_id', 'completed_at', 'id'),
+        db.Index('ix_results_user_completed_at_id', 'user_id', 'completed_at', 'id'),
+        db.Index('ix_results_quiz_completed_at_id', 'quiz_id', 'completed_at', 'id'),
+        db.Index('ix_results_quick_play_game_id', 'quick_play_game_id'),
+        # A retried submission carrying the same client_id is not stored twice
+        db.UniqueConstraint('user_id', 'client_id', name='uq_results_user_client_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    # Either the quiz or the quick play game the answers were graded against
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=True)
+    quick_play_game_id = db.Column(db.Integer, db.ForeignKey('quick_play_games.id'), nullable=True)
     
     score = db.Column(db.Integer, nullable=False) 
     total_questions = db.Column(db.Integer, nullable=False)
     
     completed_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
 
+    # Per-answer data, positions follow the quiz's (or game's) question ids in ascending order
+    # (app.answer_keys.AnswerKey.grade); answer_layout identifies those questions
+    # with their options and correct answers
+    correct_bits = db.Column(db.LargeBinary, nullable=True)
+    selected_options = db.Column(db.LargeBinary, nullable=True)
+    answer_layout = db.Column(db.Integer, nullable=True)
+
+    # Optional id generated by the client for the submission (see app.result_store)
+    client_id = db.Column(db.String(64), nullable=True)
+
     user = db.relationship('User', back_populates='results')
     quiz = db.relationship('Quiz', back_populates='results')
+    quick_play_game = db.relationship('QuickPlayGame', back_populates='results')
+
+    def __repr__(self):
+        return f'<Result {self.id} (User: {self.user_id}, Score: {self.score}/{self.total_questions})>'
+
+class QuickPlayGame(db.Model):
+    """
+    A started quick play game (app.quick_play): the catalogue questions drawn
+    for the player. Its results are graded against those questions directly,
+    nothing is copied.
+    """
+    __tablename__ = 'quick_play_games'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Cleared when the topic is deleted
+    topic_id = db.Column(db.Integer, db.ForeignKey('topics.id'), nullable=True)
+    difficulty = db.Column(db.String(50), nullable=False)
+
+    # Ids of the drawn catalogue questions, ascending (the AnswerKey order)
+    question_ids = db.Column(db.JSON, nullable=False)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    results = db.relationship('Result', back_populates='quick_play_game', lazy=True)
+
+    def __repr__(self):
+        return f'<QuickPlayGame {self.id} (User: {self.user_id}, {len(self.question_ids)} questions)>'
+
+class UserStats(db.Model):
+    """
+    Incrementally maintained rollup of a user's results (app.user_stats):
+    topic_id 0 holds the totals over every quiz, other rows the totals per
+    catalogue topic. Rebuildable from results with `flask rebuild-user-stats`.
+    """
+    __tablename__ = 'user_stats'
+
+    OVERALL = 0
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    # Topic.id, or OVERALL (no foreign key so the overall row fits the same key)
+    topic_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    total_questions = db.Column(db.Integer, nullable=False, default=0)
+    best_percentage = db.Column(db.Float, nullable=False, default=0)
+    # Sum of the per-attempt percentages; average = percentage_sum / attempts
+    percentage_sum = db.Column(db.Float, nullable=False, default=0)
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User', back_populates='stats')
+
+    def __repr__(self):
+        return f'<UserStats {self.user_id}/{self.topic_id}>'
+
+class QuestionAnalytics(db.Model):
+    """Per-question answer statistics, recomputed by app.question_analytics (not per request)."""
+    __tablename__ = 'question_analytics'
+
+    question_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    quiz_id = db.Column(db.Integer, nullable=False, index=True)
+
+    # Results recorded against the current question set of the quiz
+    attempts = db.Column(db.Integer, nullable=False)
+    # Attempts that picked one of the options
+    answered = db.Column(db.Integer, nullable=False)
+    correct = db.Column(db.Integer, nullable=False)
+    # Times each option (by index) was picked
+    option_counts = db.Column(db.JSON, nullable=False)
+
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+class GenerationJob(db.Model):
+    __tablename__ = 'generation_jobs'
+
+    # Public, unguessable job id (uuid4 hex)
+    id = db.Column(db.String(32), primary_key=True)
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    topic_id = db.Column(db.Integer, db.ForeignKey('topics.id'), nullable=True)
+    custom_topic = db.Column(db.String(150), nullable=True)
+    difficulty = db.Column(db.String(50), nullable=False)
+    num_questions = db.Column(db.Integer, nullable=False)
+    use_cache = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+
+    # queued -> running -> succeeded | failed
+    status = db.Column(db.String(20), nullable=False, default='queued')
+
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='SET NULL'), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<GenerationJob {self.id} ({self.status})>'
+
+class PooledQuestion(db.Model):
+    __tablename__ = 'question_pool'
+    __table_args__ = (
+        db.Index('ix_question_pool_topic_difficulty', 'topic_id', 'difficulty'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    topic_id = db.Column(db.Integer, db.ForeignKey('topics.id', ondelete='CASCADE'), nullable=False)
+    # Normalized (stripped, lower-case) difficulty
+    difficulty = db.Column(db.String(50), nullable=False)
+
+    question_text = db.Column(db.Text, nullable=False)
+    options = db.Column(db.JSON, nullable=False)
+    correct_option_index = db.Column(db.Integer, nullable=False)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PooledQuestion {self.id} (Topic: {self.topic_id}, {self.difficulty})>'
+
+class BulkGenerationRun(db.Model):
+    __tablename__ = 'bulk_generation_runs'
+
+    # Public run id (uuid4 hex), also used to resume the run
+    id = db.Column(db.String(32), primary_key=True)
+
+    created_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    concurrency = db.Column(db.Integer, nullable=False)
+    # Upper limit of AI generations started per minute (0 = unlimited)
+    rate_per_minute = db.Column(db.Integer, nullable=False, default=0)
+
+    # queued -> running -> succeeded | partial | failed
+    status = db.Column(db.String(20), nullable=False, default='queued')
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    items = db.relationship('BulkGenerationItem', back_populates='run', lazy=True, cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f'<BulkGenerationRun {self.id} ({self.status})>'
+
+class BulkGenerationItem(db.Model):
+    __tablename__ = 'bulk_generation_items'
+    __table_args__ = (
+        db.Index('ix_bulk_generation_items_run_status', 'run_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    run_id = db.Column(db.String(32), db.ForeignKey('bulk_generation_runs.id', ondelete='CASCADE'), nullable=False)
+
+    # One cell of the topic x difficulty x count matrix
+    topic_id = db.Column(db.Integer, db.ForeignKey('topics.id', ondelete='CASCADE'), nullable=False)
+    difficulty = db.Column(db.String(50), nullable=False)
+    num_questions = db.Column(db.Integer, nullable=False)
+
+    # pending -> succeeded | failed (failed items go back to pending on resume)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='SET NULL'), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    run = db.relationship('BulkGenerationRun', back_populates='items')
+
+    def __repr__(self):
+        return f'<BulkGenerationItem {self.id} (Run: {self.run_id}, {self.status})>'
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    # Change counter of one table, bumped in the same transaction as every
+    # write to it (see app.versioning); drives the ETags of the public reads
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
 
     def __repr__(self):
-        return f'<Result {self.id} (User: {self.user_id}, Score: {self.score}/{self.total_questions})>'
\ No newline at end of file
+        return f'<TableVersion {self.table_name} v{self.version}>'
@@ -0,0 +1,47 @@
+import base64
+import datetime
+import json
+
+class InvalidCursor(ValueError):
+    """Raised for a malformed or tampered pagination cursor."""
+
+def encode_cursor(created_at, row_id):
+    """Opaque keyset cursor for the (created_at, id) position of the last returned row."""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Returns the (created_at, id) position encoded by encode_cursor. Raises InvalidCursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        if not isinstance(row_id, int):
+            raise TypeError("cursor id must be an integer")
+        return datetime.datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid 'cursor'") from e
+
+def parse_limit(value, default, maximum):
+    """Parses a page size query argument. Raises ValueError outside 1..maximum."""
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f"'limit' must be an integer between 1 and {maximum}")
+    if not (1 <= limit <= maximum):
+        raise ValueError(f"'limit' must be an integer between 1 and {maximum}")
+    return limit
+
+def parse_datetime(value, name):
+    """
+    Parses an ISO 8601 date or datetime query argument into a naive UTC
+    datetime (the form timestamps are stored in). Raises ValueError.
+    """
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO 8601 date or datetime")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
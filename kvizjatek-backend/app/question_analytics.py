@@ -0,0 +1,130 @@
+import datetime
+import itertools
+from flask import current_app
+from app.answer_keys import NO_OPTION, answer_layout
+
+JOB_KEY = 'question-analytics'
+
+# _BIT_TABLES[k] maps a byte to 1 if its bit k is set, else 0 (for bytes.translate)
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+def _quiz_analytics(question_rows, results, computed_at):
+    """
+    Statistics rows for the questions (id, quiz_id, options) of one
+    quiz (or quick play game) from its results' (correct_bits, selected_options) pairs. Works column-wise on the
+    concatenated blobs: a strided slice holds one question's byte of every
+    result, counted with bytes.count (translate for single bits), so the
+    per-result work happens in C.
+    """
+    size = len(question_rows)
+    bits_size = (size + 7) // 8
+    correct_blob = b''.join(bits for bits, _ in results)
+    selected_blob = b''.join(selected for _, selected in results)
+
+    rows = []
+    for position, (question_id, quiz_id, options) in enumerate(question_rows):
+        selected = selected_blob[position::size]
+        correct = correct_blob[position >> 3::bits_size].translate(_BIT_TABLES[position & 7])
+        rows.append({
+            "question_id": question_id,
+            "quiz_id": quiz_id,
+            "attempts": len(results),
+            "answered": len(results) - selected.count(NO_OPTION),
+            "correct": correct.count(1),
+            "option_counts": [selected.count(index) for index in range(min(len(options), NO_OPTION))],
+            "computed_at": computed_at
+        })
+    return rows
+
+def _merge(totals, rows):
+    """Adds per-question rows of _quiz_analytics into totals (question_id -> row)."""
+    for row in rows:
+        total = totals.get(row["question_id"])
+        if total is None:
+            totals[row["question_id"]] = row
+            continue
+        for name in ("attempts", "answered", "correct"):
+            total[name] += row[name]
+        total["option_counts"] = [a + b for a, b in zip(total["option_counts"], row["option_counts"])]
+
+def _matching(results, layout):
+    """(correct_bits, selected_options) of the results recorded against `layout`, and the number skipped."""
+    matching, skipped = [], 0
+    for result_layout, correct_bits, selected_options in results:
+        if result_layout == layout and selected_options is not None:
+            matching.append((correct_bits, selected_options))
+        else:
+            skipped += 1
+    return matching, skipped
+
+def compute_question_analytics(batch_size=None):
+    """
+    Recomputes the question_analytics table from the per-answer data of
+    every result. Quiz results are streamed ordered by quiz, quick play
+    results ordered by game and counted for the catalogue questions the game
+    drew; only those recorded against the current questions, options and
+    answers (same answer_layout) count, older ones (or ones from before
+    per-answer capture) are skipped.
+    Returns {"questions", "results", "skipped"}.
+    """
+    from app.extensions import db
+    from app.models import Question, QuestionAnalytics, QuickPlayGame, Result
+
+    batch_size = batch_size or current_app.config['QUESTION_ANALYTICS_BATCH_SIZE']
+    computed_at = datetime.datetime.utcnow()
+    stream = db.session.execute(
+        db.select(Result.quiz_id, Result.answer_layout, Result.correct_bits, Result.selected_options)
+        .where(Result.quiz_id.isnot(None))
+        .order_by(Result.quiz_id).execution_options(yield_per=batch_size)
+    )
+
+    totals, counted, skipped = {}, 0, 0
+    for quiz_id, quiz_results in itertools.groupby(stream, key=lambda row: row.quiz_id):
+        question_rows = db.session.execute(
+            db.select(Question.id, Question.quiz_id, Question.options, Question.correct_option_index)
+            .where(Question.quiz_id == quiz_id).order_by(Question.id)
+        ).all()
+        # The same rows AnswerKey computes the layout of the stored results from
+        layout = answer_layout((question_id, options, correct_index)
+                               for question_id, _, options, correct_index in question_rows)
+
+        results, mismatched = _matching((row[1:] for row in quiz_results), layout)
+        skipped += mismatched
+        if question_rows and results:
+            _merge(totals, _quiz_analytics([row[:3] for row in question_rows], results, computed_at))
+            counted += len(results)
+
+    # Quick play results: the drawn questions of each partition are read with one query
+    games = db.session.execute(
+        db.select(Result.quick_play_game_id, QuickPlayGame.question_ids,
+                  Result.answer_layout, Result.correct_bits, Result.selected_options)
+        .join(QuickPlayGame, QuickPlayGame.id == Result.quick_play_game_id)
+        .order_by(Result.quick_play_game_id).execution_options(yield_per=batch_size)
+    )
+    for partition in games.partitions():
+        wanted = {question_id for row in partition for question_id in row.question_ids}
+        questions = {
+            row.id: row for row in db.session.execute(
+                db.select(Question.id, Question.quiz_id, Question.options, Question.correct_option_index)
+                .where(Question.id.in_(wanted))
+            )
+        }
+        for _, game_results in itertools.groupby(partition, key=lambda row: row.quick_play_game_id):
+            game_results = list(game_results)
+            # The drawn questions that still exist, in id order, as game_answer_keys grades them
+            question_rows = [questions[qid] for qid in sorted(game_results[0].question_ids) if qid in questions]
+            layout = answer_layout((question_id, options, correct_index)
+                                   for question_id, _, options, correct_index in question_rows)
+
+            results, mismatched = _matching((row[2:] for row in game_results), layout)
+            skipped += mismatched
+            if question_rows and results:
+                _merge(totals, _quiz_analytics([row[:3] for row in question_rows], results, computed_at))
+                counted += len(results)
+
+    analytics = list(totals.values())
+    db.session.execute(db.delete(QuestionAnalytics))
+    if analytics:
+        db.session.execute(db.insert(QuestionAnalytics), analytics)
+    db.session.commit()
+    return {"questions": len(analytics), "results": counted, "skipped": skipped}
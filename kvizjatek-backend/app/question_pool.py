@@ -0,0 +1,256 @@
+import threading
+import time
+from collections import deque
+from flask import current_app
+
+def normalize_difficulty(difficulty):
+    return ' '.join(str(difficulty).split()).lower()
+
+class QuestionPool:
+    """
+    Pre-warmed stock of validated AI questions per (Topic.id, difficulty).
+
+    The stock itself lives in the `question_pool` table, so every worker
+    process shares it. Whenever a pair drops below QUESTION_POOL_LOW_WATER
+    a refill is scheduled on the job queue, which calls the AI generator
+    until the pair holds QUESTION_POOL_TARGET questions again. Only the
+    QUESTION_POOL_DIFFICULTIES are pooled; other difficulties always go to
+    the AI directly, so a client cannot start paid refills for arbitrary
+    difficulty strings.
+
+    Hit/miss counters and refill latencies are kept per process.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUESTION_POOL_ENABLED', False)
+        app.config.setdefault('QUESTION_POOL_TARGET', 30)
+        app.config.setdefault('QUESTION_POOL_LOW_WATER', 10)
+        app.config.setdefault('QUESTION_POOL_BATCH_SIZE', 10)
+        app.config.setdefault('QUESTION_POOL_DIFFICULTIES', ['Easy', 'Medium', 'Hard'])
+        app.extensions['question_pool'] = {
+            'lock': threading.Lock(),
+            'hits': 0,
+            'misses': 0,
+            'refills': 0,
+            'refill_failures': 0,
+            'questions_added': 0,
+            # Seconds per generate_quiz_questions call made by the refiller
+            'refill_latencies': deque(maxlen=200),
+        }
+
+    def _state(self):
+        return current_app.extensions['question_pool']
+
+    @property
+    def enabled(self):
+        return current_app.config['QUESTION_POOL_ENABLED']
+
+    def _count(self, key, amount=1):
+        state = self._state()
+        with state['lock']:
+            state[key] += amount
+
+    def serves(self, difficulty):
+        """True if questions of this difficulty are kept in the pool."""
+        pooled = current_app.config['QUESTION_POOL_DIFFICULTIES']
+        return normalize_difficulty(difficulty) in {normalize_difficulty(d) for d in pooled}
+
+    def depth(self, topic_id, difficulty):
+        from app.models import PooledQuestion
+        return PooledQuestion.query.filter_by(
+            topic_id=topic_id, difficulty=normalize_difficulty(difficulty)
+        ).count()
+
+    def take(self, topic_id, difficulty, num_questions):
+        """
+        Removes `num_questions` questions for the pair from the pool and
+        returns them as question dicts, or None if the pool cannot serve the
+        whole request. A refill is scheduled if the pair runs low.
+
+        The rows are gone once this returns: a caller that fails to store
+        the quiz must hand the questions back with restore().
+        """
+        from app.extensions import db
+        from app.models import PooledQuestion
+
+        if not self.serves(difficulty):
+            return None
+
+        difficulty_key = normalize_difficulty(difficulty)
+        rows = PooledQuestion.query.filter_by(topic_id=topic_id, difficulty=difficulty_key) \
+            .order_by(PooledQuestion.id) \
+            .limit(num_questions) \
+            .all()
+
+        questions = None
+        if len(rows) == num_questions:
+            # Claim the rows; another worker may have taken some of them meanwhile
+            deleted = PooledQuestion.query.filter(PooledQuestion.id.in_([r.id for r in rows])) \
+                .delete(synchronize_session=False)
+            if deleted == num_questions:
+                questions = [{
+                    "question_text": r.question_text,
+                    "options": r.options,
+                    "correct_option_index": r.correct_option_index
+                } for r in rows]
+                db.session.commit()
+            else:
+                db.session.rollback()
+
+        self._count('hits' if questions else 'misses')
+        self.maybe_refill(topic_id, difficulty_key)
+        return questions
+
+    def restore(self, topic_id, difficulty, questions):
+        """Puts questions returned by take() back into the pool (the quiz could not be stored)."""
+        from app.extensions import db
+        from app.models import PooledQuestion
+
+        if not questions:
+            return
+        try:
+            db.session.add_all([PooledQuestion(
+                topic_id=topic_id,
+                difficulty=normalize_difficulty(difficulty),
+                question_text=q['question_text'],
+                options=q['options'],
+                correct_option_index=q['correct_option_index']
+            ) for q in questions])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Could not return %d questions to the pool", len(questions))
+
+    def maybe_refill(self, topic_id, difficulty):
+        """Schedules a background refill if the pair is below the low-water mark."""
+        if self.serves(difficulty) and self.depth(topic_id, difficulty) < current_app.config['QUESTION_POOL_LOW_WATER']:
+            self.schedule_refill(topic_id, difficulty)
+
+    def schedule_refill(self, topic_id, difficulty):
+        from app.extensions import jobs
+
+        if not self.serves(difficulty):
+            return None
+        key = f"pool:{topic_id}:{normalize_difficulty(difficulty)}"
+        if jobs.is_pending(key):
+            return None
+        return jobs.submit(key, self.refill, topic_id, difficulty)
+
+    def refill(self, topic_id, difficulty):
+        """
+        Tops the pair up to QUESTION_POOL_TARGET. Runs on the job queue.
+        Invalid AI questions and near-duplicates of stored or already pooled
+        questions of the topic are skipped; a failed AI call ends the refill.
+        The response cache is bypassed, the pool needs fresh questions.
+        """
+        from app import ai_generator
+        from app.extensions import db, question_index
+        from app.models import PooledQuestion, Topic
+        from app.quiz_service import validate_question
+
+        topic = db.session.get(Topic, topic_id)
+        if not topic:
+            return 0
+
+        difficulty_key = normalize_difficulty(difficulty)
+        target = current_app.config['QUESTION_POOL_TARGET']
+        batch_size = current_app.config['QUESTION_POOL_BATCH_SIZE']
+        added = 0
+
+        checker = None
+        if question_index.policy != 'off':
+            checker = question_index.checker(topic_id, None)
+            # Questions already in the pool (any difficulty) count as taken too
+            for row in PooledQuestion.query.filter_by(topic_id=topic_id).all():
+                checker.check({"question_text": row.question_text, "options": row.options})
+
+        missing = target - self.depth(topic_id, difficulty_key)
+        while missing > 0:
+            started = time.perf_counter()
+            ai_response = ai_generator.generate_quiz_questions(
+                topic.name, difficulty, min(missing, batch_size), use_cache=False
+            )
+            elapsed = time.perf_counter() - started
+
+            state = self._state()
+            with state['lock']:
+                state['refills'] += 1
+                state['refill_latencies'].append(elapsed)
+
+            if isinstance(ai_response, dict) or not ai_response:
+                self._count('refill_failures')
+                break
+
+            valid = []
+            for q_data in ai_response:
+                try:
+                    validate_question(q_data)
+                except ValueError:
+                    continue
+                if checker and checker.check(q_data) is not None:
+                    continue
+                valid.append(PooledQuestion(
+                    topic_id=topic_id,
+                    difficulty=difficulty_key,
+                    question_text=q_data['question_text'],
+                    options=q_data['options'],
+                    correct_option_index=q_data['correct_option_index']
+                ))
+
+            if not valid:
+                self._count('refill_failures')
+                break
+
+            db.session.add_all(valid)
+            db.session.commit()
+            added += len(valid)
+            missing -= len(valid)
+
+        self._count('questions_added', added)
+        return added
+
+    def warm_up(self):
+        """Schedules a refill for every Topic x QUESTION_POOL_DIFFICULTIES pair that is low."""
+        from app.models import Topic
+
+        scheduled = 0
+        for topic in Topic.query.all():
+            for difficulty in current_app.config['QUESTION_POOL_DIFFICULTIES']:
+                if self.depth(topic.id, difficulty) < current_app.config['QUESTION_POOL_LOW_WATER']:
+                    if self.schedule_refill(topic.id, difficulty):
+                        scheduled += 1
+        return scheduled
+
+    def metrics(self):
+        from app.extensions import db
+        from app.models import PooledQuestion
+
+        depths = db.session.query(
+            PooledQuestion.topic_id,
+            PooledQuestion.difficulty,
+            db.func.count(PooledQuestion.id)
+        ).group_by(PooledQuestion.topic_id, PooledQuestion.difficulty).all()
+
+        state = self._state()
+        with state['lock']:
+            lookups = state['hits'] + state['misses']
+            latencies = sorted(state['refill_latencies'])
+            return {
+                "enabled": current_app.config['QUESTION_POOL_ENABLED'],
+                "hits": state['hits'],
+                "misses": state['misses'],
+                "hit_rate": state['hits'] / lookups if lookups else None,
+                "refills": state['refills'],
+                "refill_failures": state['refill_failures'],
+                "questions_added": state['questions_added'],
+                "refill_latency_avg": sum(latencies) / len(latencies) if latencies else None,
+                "refill_latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+                "depth": [
+                    {"topic_id": topic_id, "difficulty": difficulty, "count": count}
+                    for topic_id, difficulty, count in depths
+                ],
+            }
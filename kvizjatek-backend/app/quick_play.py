@@ -0,0 +1,194 @@
+import datetime
+import random
+import threading
+import time
+from array import array
+from flask import current_app
+from .question_pool import normalize_difficulty
+
+class QuickPlayIndex:
+    """
+    In-process id index for quick play: the ids of every catalogue question
+    (quick play copies excluded) bucketed per (Topic.id, difficulty) in
+    compact array('i') buckets, about 4 bytes per question.
+
+    New questions are picked up incrementally (a watermark on the question
+    id, at most every QUICK_PLAY_SYNC_INTERVAL seconds or forced after a
+    write); deletes and updates in this process adjust the buckets directly.
+    Changes made by other worker processes are caught when the sampled rows
+    are loaded: rows that are gone or no longer belong to the bucket are
+    dropped from it and replaced.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUICK_PLAY_MAX_QUESTIONS', 50)
+        app.config.setdefault('QUICK_PLAY_SYNC_INTERVAL', 5)
+        app.config.setdefault('QUICK_PLAY_UNPLAYED_TTL_HOURS', 24)
+        app.extensions['quick_play'] = {
+            'lock': threading.Lock(),
+            # (topic_id, normalized difficulty) -> array('i') of question ids
+            'buckets': {},
+            'watermark': 0,
+            'synced_at': None,
+        }
+
+    def _state(self):
+        return current_app.extensions['quick_play']
+
+    def _load(self, *criteria):
+        """Adds the catalogue questions matching the criteria with one id-only query."""
+        from app.extensions import db
+        from app.models import Question, Quiz
+
+        rows = db.session.query(Question.id, Quiz.topic_id, Quiz.difficulty) \
+            .join(Quiz, Quiz.id == Question.quiz_id) \
+            .filter(Quiz.topic_id.isnot(None), Quiz.is_quick_play.is_(False), *criteria) \
+            .order_by(Question.id).all()
+
+        state = self._state()
+        with state['lock']:
+            for question_id, topic_id, difficulty in rows:
+                key = (topic_id, normalize_difficulty(difficulty))
+                bucket = state['buckets'].get(key)
+                if bucket is None:
+                    bucket = state['buckets'][key] = array('i')
+                bucket.append(question_id)
+            if rows:
+                state['watermark'] = max(state['watermark'], rows[-1][0])
+        return len(rows)
+
+    def sync(self, force=False):
+        """Indexes every question stored since the last sync."""
+        from app.models import Question
+
+        state = self._state()
+        now = time.monotonic()
+        if not force and state['synced_at'] is not None and now - state['synced_at'] < current_app.config['QUICK_PLAY_SYNC_INTERVAL']:
+            return 0
+        state['synced_at'] = now
+        return self._load(Question.id > state['watermark'])
+
+    def remove(self, topic_id, difficulty, question_ids):
+        """Drops question ids from the bucket of (topic_id, difficulty)."""
+        if topic_id is None or not question_ids:
+            return
+        state = self._state()
+        key = (topic_id, normalize_difficulty(difficulty))
+        removed = set(question_ids)
+        with state['lock']:
+            bucket = state['buckets'].get(key)
+            if bucket is not None:
+                state['buckets'][key] = array('i', (qid for qid in bucket if qid not in removed))
+
+    def reindex_quiz(self, quiz_id, old_topic_id, old_difficulty, old_question_ids):
+        """Moves a quiz's questions after an update (new questions, topic or difficulty)."""
+        from app.models import Question
+
+        self.remove(old_topic_id, old_difficulty, old_question_ids)
+        self._load(Question.quiz_id == quiz_id, Question.id <= self._state()['watermark'])
+        self.sync(force=True)
+
+    def count(self, topic_id, difficulty):
+        self.sync()
+        bucket = self._state()['buckets'].get((topic_id, normalize_difficulty(difficulty)))
+        return len(bucket) if bucket is not None else 0
+
+    def sample(self, topic_id, difficulty, num_questions):
+        """
+        Returns `num_questions` distinct random questions of the pair as
+        (id, question_text, options, correct_option_index) rows, in random
+        order, or None if the pair does not have that many. Sampling is
+        O(num_questions) and only the chosen rows are loaded.
+        """
+        from app.extensions import db
+        from app.models import Question, Quiz
+
+        self.sync()
+        state = self._state()
+        key = (topic_id, normalize_difficulty(difficulty))
+        chosen = {}
+
+        # Every incomplete round drops at least one stale id, so this ends
+        while True:
+            with state['lock']:
+                bucket = state['buckets'].get(key, ())
+                candidates = [qid for qid in bucket if qid not in chosen] if chosen else bucket
+                missing = num_questions - len(chosen)
+                if len(candidates) < missing:
+                    return None
+                picked = [candidates[i] for i in random.sample(range(len(candidates)), missing)]
+
+            rows = db.session.query(
+                Question.id, Question.question_text, Question.options, Question.correct_option_index,
+                Quiz.topic_id, Quiz.difficulty, Quiz.is_quick_play
+            ).join(Quiz, Quiz.id == Question.quiz_id).filter(Question.id.in_(picked)).all()
+
+            for row in rows:
+                if row.topic_id == topic_id and normalize_difficulty(row.difficulty) == key[1] and not row.is_quick_play:
+                    chosen[row.id] = (row.id, row.question_text, row.options, row.correct_option_index)
+            # Deleted or moved by another worker since it was indexed
+            self.remove(topic_id, difficulty, [qid for qid in picked if qid not in chosen])
+
+            if len(chosen) == num_questions:
+                return [chosen[qid] for qid in random.sample(list(chosen), num_questions)]
+
+def game_answer_keys(user_id, game_ids):
+    """
+    AnswerKeys of quick play games of a user as {game_id: AnswerKey}, built
+    from the drawn catalogue questions that still exist (in id order, like
+    a quiz's). Games of other users or that do not exist are left out.
+    Two queries; not cached, the source questions belong to many quizzes.
+    """
+    from app.answer_keys import AnswerKey
+    from app.extensions import db
+    from app.models import Question, QuickPlayGame
+
+    games = db.session.execute(
+        db.select(QuickPlayGame.id, QuickPlayGame.question_ids)
+        .where(QuickPlayGame.id.in_(game_ids), QuickPlayGame.user_id == user_id)
+    ).all()
+    wanted = {question_id for _, question_ids in games for question_id in question_ids}
+    questions = {
+        question_id: (question_id, options, correct_option_index)
+        for question_id, options, correct_option_index in db.session.execute(
+            db.select(Question.id, Question.options, Question.correct_option_index).where(Question.id.in_(wanted))
+        )
+    } if wanted else {}
+    return {
+        game_id: AnswerKey([questions[qid] for qid in sorted(question_ids) if qid in questions])
+        for game_id, question_ids in games
+    }
+
+def prune_unplayed(older_than_hours):
+    """
+    Deletes the quick play games started more than `older_than_hours` ago
+    that never got a result, and the unplayed quiz copies older versions
+    made for quick play (with their questions). Played ones are kept,
+    their results refer to them. Returns the number of games and copies
+    deleted; the caller commits.
+    """
+    from app.extensions import db
+    from app.models import Question, QuickPlayGame, Quiz, Result
+
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=older_than_hours)
+    games = db.session.execute(
+        db.delete(QuickPlayGame).where(
+            QuickPlayGame.created_at < cutoff,
+            ~db.exists().where(Result.quick_play_game_id == QuickPlayGame.id)
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+
+    unplayed = db.select(Quiz.id).where(
+        Quiz.is_quick_play.is_(True), Quiz.created_at < cutoff,
+        ~db.exists().where(Result.quiz_id == Quiz.id)
+    )
+    db.session.execute(
+        db.delete(Question).where(Question.quiz_id.in_(unplayed)).execution_options(synchronize_session=False)
+    )
+    return games + db.session.execute(
+        db.delete(Quiz).where(Quiz.id.in_(unplayed)).execution_options(synchronize_session=False)
+    ).rowcount
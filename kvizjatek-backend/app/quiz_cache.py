@@ -0,0 +1,76 @@
+import threading
+from flask import current_app
+from .caching import LRUCache
+
+class QuizDetailCache:
+    """
+    Bounded in-process LRU of GET /quiz/<id> payloads, stored as the
+    already-encoded JSON bytes so a hit skips both the queries and the
+    serialization.
+
+    Every entry is stamped with the version of its quiz (app.versioning) it
+    was built from and only served while it is unchanged, the same version
+    the ETag of the response is derived from, so writes made by other
+    worker processes are seen too, while writes to other quizzes leave it
+    alone. Writes in this process also invalidate entries directly (update,
+    delete, topic changes), and entries expire after QUIZ_DETAIL_CACHE_TTL
+    seconds in any case.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUIZ_DETAIL_CACHE_ENABLED', True)
+        app.config.setdefault('QUIZ_DETAIL_CACHE_MAX_ENTRIES', 1024)
+        app.config.setdefault('QUIZ_DETAIL_CACHE_TTL', 300)
+        app.extensions['quiz_detail_cache'] = {
+            'memory': LRUCache(app.config['QUIZ_DETAIL_CACHE_MAX_ENTRIES'], app.config['QUIZ_DETAIL_CACHE_TTL']),
+            # Bumped by every invalidation; a payload built across one is not stored
+            'generation': 0,
+            'lock': threading.Lock(),
+        }
+
+    def _state(self):
+        return current_app.extensions['quiz_detail_cache']
+
+    @property
+    def enabled(self):
+        return current_app.config['QUIZ_DETAIL_CACHE_ENABLED']
+
+    def get(self, quiz_id, version):
+        """
+        Returns (body, token) for the quiz at `version`, its current
+        (version, updated_at) from app.versioning.quiz_version. body is the
+        cached JSON bytes or None on a miss; pass the token to set() when
+        storing the freshly built payload.
+        """
+        state = self._state()
+        token = (state['generation'], version)
+        entry = state['memory'].get(quiz_id)
+        if entry is not None and entry[0] == version:
+            return entry[1], token
+        return None, token
+
+    def set(self, quiz_id, token, payload):
+        """Encodes the payload and stores it unless it was invalidated meanwhile. Returns the bytes."""
+        body = current_app.json.response(payload).get_data()
+        generation, stamp = token
+        state = self._state()
+        with state['lock']:
+            if state['generation'] == generation:
+                state['memory'].set(quiz_id, (stamp, body))
+        return body
+
+    def invalidate(self, quiz_id):
+        state = self._state()
+        with state['lock']:
+            state['generation'] += 1
+            state['memory'].delete(quiz_id)
+
+    def clear(self):
+        state = self._state()
+        with state['lock']:
+            state['generation'] += 1
+            state['memory'].clear()
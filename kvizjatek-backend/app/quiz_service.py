@@ -0,0 +1,198 @@
+from app.models import Quiz, Question
+from app.extensions import ai_cache, db, question_index
+
+REQUIRED_QUESTION_KEYS = ('question_text', 'options', 'correct_option_index')
+# Compiled once: a subset test against the dict's key view runs in C
+_REQUIRED_KEY_SET = frozenset(REQUIRED_QUESTION_KEYS)
+
+def validate_question(q_data):
+    """
+    Validates a single question dict (manual or AI-generated).
+    Raises ValueError with a user-facing message if it is invalid.
+    """
+    if not isinstance(q_data, dict) or not _REQUIRED_KEY_SET <= q_data.keys():
+        raise ValueError("Each question must have 'question_text', 'options', and 'correct_option_index'")
+
+    # Simple validation to ensure data matches model structure
+    if not isinstance(q_data['options'], list) or len(q_data['options']) < 2:
+        raise ValueError("Question 'options' must be a list with at least 2 items")
+
+    # bool is an int subclass, and strings ("1") would only fail the range check with a TypeError
+    correct_option_index = q_data['correct_option_index']
+    if not isinstance(correct_option_index, int) or isinstance(correct_option_index, bool) \
+            or not (0 <= correct_option_index < len(q_data['options'])):
+        raise ValueError("Invalid 'correct_option_index'")
+
+def validate_questions(questions_data):
+    """
+    Validates a whole questions payload with validate_question and returns
+    it as rows for Question inserts.
+    """
+    rows = []
+    append = rows.append
+    for q_data in questions_data:
+        validate_question(q_data)
+        append({
+            "question_text": q_data['question_text'],
+            "options": q_data['options'],
+            "correct_option_index": q_data['correct_option_index']
+        })
+    return rows
+
+def insert_questions(quizzes):
+    """
+    Fast path for new quizzes: takes (Quiz, rows) pairs with rows from
+    validate_questions, flushes the quizzes for their ids and inserts every
+    question with one executemany INSERT instead of one ORM object each.
+    The caller commits. The quizzes' `questions` collections load lazily.
+    """
+    db.session.add_all([quiz for quiz, _ in quizzes])
+    db.session.flush()
+    params = [
+        {**row, "quiz_id": quiz.id}
+        for quiz, rows in quizzes
+        for row in rows
+    ]
+    if params:
+        db.session.execute(db.insert(Question), params)
+
+def insert_quiz(topic_id, custom_topic, difficulty, created_by_user_id, questions_data):
+    """
+    Validates and inserts a quiz with its questions through insert_questions.
+    The caller commits. Raises ValueError (before writing anything) if any
+    of the questions is invalid.
+    """
+    rows = validate_questions(questions_data)
+    quiz = Quiz(
+        topic_id=topic_id,
+        custom_topic=custom_topic,
+        difficulty=difficulty,
+        created_by_user_id=created_by_user_id
+    )
+    insert_questions([(quiz, rows)])
+    return quiz
+
+def build_quiz(topic_id, custom_topic, difficulty, created_by_user_id, questions_data):
+    """
+    Builds a (not yet persisted) Quiz with its Question children.
+    The caller is responsible for adding it to the session and committing.
+    Raises ValueError if any of the questions is invalid.
+    """
+    new_quiz = Quiz(
+        topic_id=topic_id,
+        custom_topic=custom_topic,
+        difficulty=difficulty,
+        created_by_user_id=created_by_user_id
+    )
+
+    for q_data in questions_data:
+        validate_question(q_data)
+        new_quiz.questions.append(Question(
+            question_text=q_data['question_text'],
+            options=q_data['options'], # Stored as JSON
+            correct_option_index=q_data['correct_option_index']
+        ))
+
+    return new_quiz
+
+def drop_ai_duplicates(topic_id, custom_topic, topic_for_ai, difficulty, questions_data):
+    """
+    Removes AI questions that are near-duplicates of stored questions of the
+    same topic (or of each other) and asks the AI once for replacements.
+    Returns the remaining questions; may be shorter than the input.
+    """
+    from app import ai_generator
+
+    if question_index.policy == 'off':
+        return questions_data
+
+    checker = question_index.checker(topic_id, custom_topic)
+    kept, dropped = [], []
+    for q_data in questions_data:
+        if isinstance(q_data, dict) and checker.check(q_data) is not None:
+            dropped.append(q_data)
+        else:
+            kept.append(q_data)
+
+    if not dropped:
+        return kept
+
+    exclude = [q.get('question_text', '') for q in kept + dropped if isinstance(q, dict)]
+    replacements = ai_generator.generate_replacement_questions(topic_for_ai, difficulty, len(dropped), exclude)
+    if isinstance(replacements, list):
+        for q_data in replacements[:len(dropped)]:
+            if isinstance(q_data, dict) and checker.check(q_data) is None:
+                kept.append(q_data)
+
+    return kept
+
+def forget_cached_generation(topic_for_ai, difficulty, num_questions):
+    """
+    Evicts the AI cache entry a just stored quiz may have been served from.
+    With duplicate detection on, a replay would be dropped question by question
+    as near-duplicates of the stored quiz and replaced with live AI calls.
+    """
+    if question_index.policy != 'off' and ai_cache.enabled:
+        ai_cache.delete(topic_for_ai, difficulty, num_questions)
+
+def _is_question_id(value):
+    # bool is an int subclass (True == 1), and lists or dicts cannot be looked up at all
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def apply_question_diff(quiz, diff):
+    """
+    Applies a per-question diff to a loaded quiz, touching only the named rows:
+    {"add": [question, ...], "update": [{"question_id": 3, <changed fields>}, ...], "remove": [question_id, ...]}
+    Updated questions are validated after merging the changes into the stored values.
+    Returns (added Question objects, updated Question objects, removed ids);
+    raises ValueError (nothing is flushed yet) if the diff is invalid.
+    """
+    add = diff.get('add') or []
+    update = diff.get('update') or []
+    remove = diff.get('remove') or []
+    if not all(isinstance(part, list) for part in (add, update, remove)):
+        raise ValueError("'add', 'update' and 'remove' must be lists")
+
+    questions = {q.id: q for q in quiz.questions}
+
+    remove_ids = set()
+    for question_id in remove:
+        if not _is_question_id(question_id) or question_id not in questions:
+            raise ValueError(f"Question {question_id} does not belong to this quiz")
+        remove_ids.add(question_id)
+
+    changes = []
+    for change in update:
+        if not isinstance(change, dict) or not _is_question_id(change.get('question_id')) \
+                or change['question_id'] not in questions:
+            raise ValueError("Each update needs the 'question_id' of a question of this quiz")
+        question = questions[change['question_id']]
+        if question.id in remove_ids:
+            raise ValueError(f"Question {question.id} is both updated and removed")
+        merged = {key: change.get(key, getattr(question, key)) for key in REQUIRED_QUESTION_KEYS}
+        validate_question(merged)
+        changes.append((question, merged))
+
+    for q_data in add:
+        validate_question(q_data)
+
+    if len(questions) - len(remove_ids) + len(add) == 0:
+        raise ValueError("A quiz must keep at least one question")
+
+    for question, merged in changes:
+        # Unchanged values are not written (the ORM only updates modified columns)
+        for key, value in merged.items():
+            if getattr(question, key) != value:
+                setattr(question, key, value)
+
+    for question_id in remove_ids:
+        quiz.questions.remove(questions[question_id])
+
+    added = [
+        Question(question_text=q_data['question_text'], options=q_data['options'],
+                 correct_option_index=q_data['correct_option_index'])
+        for q_data in add
+    ]
+    quiz.questions.extend(added)
+
+    return added, [question for question, _ in changes], sorted(remove_ids)
@@ -0,0 +1,223 @@
+import json
+from flask import current_app
+
+def export_quizzes(batch_size=None):
+    """
+    Generator of NDJSON lines, one quiz with its questions per line:
+    {"id", "topic", "custom_topic", "difficulty", "created_at", "questions": [...]}
+
+    Quizzes are read in keyset batches by id with one column-projected
+    query for the questions of each batch, so memory stays flat whatever
+    the number of quizzes. Topics are exported by name, ids differ between
+    environments. Quick play copies are not exported.
+    """
+    from app.extensions import db
+    from app.models import Question, Quiz, Topic
+
+    batch_size = batch_size or current_app.config['QUIZ_TRANSFER_BATCH_SIZE']
+    last_id = 0
+    while True:
+        quizzes = db.session.query(
+            Quiz.id, Topic.name, Quiz.custom_topic, Quiz.difficulty, Quiz.created_at
+        ).outerjoin(Topic, Topic.id == Quiz.topic_id) \
+            .filter(Quiz.id > last_id, Quiz.is_quick_play.is_(False)).order_by(Quiz.id).limit(batch_size).all()
+        if not quizzes:
+            return
+
+        questions = {}
+        for quiz_id, text, options, correct in db.session.query(
+            Question.quiz_id, Question.question_text, Question.options, Question.correct_option_index
+        ).filter(Question.quiz_id.in_([quiz.id for quiz in quizzes])).order_by(Question.quiz_id, Question.id):
+            questions.setdefault(quiz_id, []).append(
+                {"question_text": text, "options": options, "correct_option_index": correct}
+            )
+
+        for quiz_id, topic_name, custom_topic, difficulty, created_at in quizzes:
+            yield json.dumps({
+                "id": quiz_id,
+                "topic": topic_name,
+                "custom_topic": custom_topic,
+                "difficulty": difficulty,
+                "created_at": created_at.isoformat(),
+                "questions": questions.get(quiz_id, [])
+            }, ensure_ascii=False) + "\n"
+
+        last_id = quizzes[-1].id
+        # Nothing from this batch is needed any more
+        db.session.expunge_all()
+
+def _find_topic(name):
+    from app.extensions import db
+    from app.models import Topic
+
+    # Do not flush the pending quizzes of the batch just for the lookup
+    with db.session.no_autoflush:
+        return Topic.query.filter_by(name=name).first()
+
+def _resolve_topic(name, topics):
+    """
+    Topic id for an exported topic name, creating the topic if this database lacks it.
+    Raises ValueError if the topic can neither be created nor found.
+    """
+    from sqlalchemy.exc import IntegrityError
+    from app.extensions import db
+    from app.models import Topic
+
+    if name not in topics:
+        topic = _find_topic(name)
+        if not topic:
+            try:
+                # In a savepoint: losing the race with a concurrent create only undoes this insert
+                with db.session.begin_nested():
+                    topic = Topic(name=name)
+                    db.session.add(topic)
+            except IntegrityError:
+                topic = _find_topic(name)
+                if not topic:
+                    raise ValueError(f"Could not create topic '{name}'")
+        topics[name] = topic.id
+    return topics[name]
+
+def _parse_record(line):
+    """
+    Decodes and validates one NDJSON record with the create_quiz rules.
+    Returns (record, question rows); raises ValueError with a user-facing message.
+    """
+    from app.quiz_service import validate_questions
+
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+
+    if not isinstance(record, dict):
+        raise ValueError("Each line must be a JSON object")
+    for key in ('topic', 'custom_topic', 'difficulty'):
+        if record.get(key) is not None and not isinstance(record[key], str):
+            raise ValueError(f"'{key}' must be a string")
+    if not (record.get('topic') or record.get('custom_topic')):
+        raise ValueError("Either 'topic' or 'custom_topic' is required")
+    if not record.get('difficulty'):
+        raise ValueError("Missing 'difficulty'")
+    questions = record.get('questions')
+    if not questions or not isinstance(questions, list):
+        raise ValueError("Missing 'questions' list or list is empty")
+    try:
+        rows = validate_questions(questions)
+    except ValueError as ve:
+        raise ValueError(f"Invalid question data: {ve}")
+    return record, rows
+
+def import_quizzes(lines, created_by_user_id, batch_size=None):
+    """
+    Imports NDJSON quiz records (the export format) from an iterable of lines.
+
+    Every record is validated with the create_quiz rules; invalid lines are
+    reported and skipped, the rest is inserted in transactions of
+    `batch_size` quizzes (one executemany INSERT per table and transaction).
+    If a transaction fails, all of its lines are reported. Only the current
+    batch is held in memory.
+
+    Unless DUPLICATE_QUESTION_POLICY is 'off', the questions are checked for
+    near-duplicates against the stored questions and the earlier lines of
+    the import, like create_quiz: 'reject' fails the line, 'flag' imports it
+    and reports the duplicates.
+    Returns {"imported", "failed", "errors": [{"line", "error"}, ...],
+    "duplicates": [{"line", "duplicates": [...]}, ...]} (both lists capped
+    at QUIZ_IMPORT_MAX_REPORTED_ERRORS).
+    """
+    from app.extensions import db, question_index
+    from app.models import Quiz
+    from app.quiz_service import insert_questions
+
+    batch_size = batch_size or current_app.config['QUIZ_TRANSFER_BATCH_SIZE']
+    max_errors = current_app.config['QUIZ_IMPORT_MAX_REPORTED_ERRORS']
+    report = {"imported": 0, "failed": 0, "errors": [], "duplicates": []}
+    topics = {}
+    batch_lines = []
+    batch_quizzes = []
+    # Duplicate checkers per topic scope; they remember the questions of the
+    # batch's earlier lines until the index sees them after the commit
+    checkers = {}
+
+    def find_duplicates(line_number, topic_id, custom_topic, rows):
+        key = (topic_id, custom_topic)
+        if key not in checkers:
+            checkers[key] = question_index.checker(topic_id, custom_topic)
+        checker = checkers[key]
+        remembered = len(checker.batch)
+        duplicates = []
+        for i, q_data in enumerate(rows):
+            match = checker.check(q_data, (line_number, i))
+            if match is None:
+                continue
+            duplicate_of, similarity = match
+            duplicate = {"index": i, "similarity": round(similarity, 3)}
+            if isinstance(duplicate_of, tuple):
+                duplicate["duplicate_of_line"], duplicate["duplicate_of_index"] = duplicate_of[1]
+            else:
+                duplicate["duplicate_of_question_id"] = duplicate_of
+            duplicates.append(duplicate)
+        if duplicates and question_index.policy == 'reject':
+            # The line is not imported, later lines must not match its questions
+            del checker.batch[remembered:]
+        return duplicates
+
+    def fail(line_number, message):
+        report["failed"] += 1
+        if len(report["errors"]) < max_errors:
+            report["errors"].append({"line": line_number, "error": message})
+
+    def commit_batch():
+        try:
+            insert_questions(batch_quizzes)
+            db.session.commit()
+            report["imported"] += len(batch_lines)
+        except Exception as e:
+            db.session.rollback()
+            # Topics created in the failed transaction are gone as well
+            topics.clear()
+            for line_number in batch_lines:
+                fail(line_number, f"Failed to import quiz: {e}")
+        db.session.expunge_all()
+        batch_lines.clear()
+        batch_quizzes.clear()
+        # The committed questions are matched through the index from now on
+        checkers.clear()
+        question_index.sync(force=True)
+
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+
+        try:
+            record, rows = _parse_record(line)
+            custom_topic = record.get('custom_topic')
+            topic_id = None if custom_topic else _resolve_topic(record['topic'], topics)
+        except ValueError as ve:
+            fail(line_number, str(ve))
+            continue
+
+        if question_index.policy != 'off':
+            duplicates = find_duplicates(line_number, topic_id, custom_topic, rows)
+            if duplicates and question_index.policy == 'reject':
+                fail(line_number, "Quiz contains near-duplicate questions")
+                continue
+            if duplicates and len(report["duplicates"]) < max_errors:
+                report["duplicates"].append({"line": line_number, "duplicates": duplicates})
+        batch_quizzes.append((Quiz(
+            topic_id=topic_id,
+            custom_topic=custom_topic,
+            difficulty=record['difficulty'],
+            created_by_user_id=created_by_user_id
+        ), rows))
+        batch_lines.append(line_number)
+
+        if len(batch_lines) >= batch_size:
+            commit_batch()
+
+    if batch_lines:
+        commit_batch()
+    return report
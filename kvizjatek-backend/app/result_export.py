@@ -0,0 +1,133 @@
+import csv
+import io
+from flask import current_app
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+COLUMNS = ('result_id', 'user_id', 'username', 'quiz_id', 'quick_play_id', 'topic', 'custom_topic', 'difficulty',
+           'score', 'total_questions', 'percentage', 'completed_at')
+
+class ExportFormatUnavailable(Exception):
+    """The requested export format needs an optional library that is not installed."""
+
+def _result_partitions(batch_size):
+    """
+    Every result joined with its user and quiz (or quick play game)
+    metadata, as lists of COLUMNS tuples of at most batch_size rows, in id
+    order. The rows come from one server-side cursor, so only one partition
+    is held at a time.
+    """
+    from app.extensions import db
+    from app.models import QuickPlayGame, Quiz, Result, Topic, User
+
+    percentage = db.case(
+        (Result.total_questions > 0, db.func.round(Result.score * 100.0 / Result.total_questions, 2)), else_=0.0
+    )
+    rows = db.session.execute(
+        db.select(Result.id, Result.user_id, User.username, Result.quiz_id, Result.quick_play_game_id, Topic.name,
+                  Quiz.custom_topic, db.func.coalesce(Quiz.difficulty, QuickPlayGame.difficulty),
+                  Result.score, Result.total_questions, percentage, Result.completed_at)
+        .outerjoin(User, User.id == Result.user_id)
+        .outerjoin(Quiz, Quiz.id == Result.quiz_id)
+        .outerjoin(QuickPlayGame, QuickPlayGame.id == Result.quick_play_game_id)
+        .outerjoin(Topic, Topic.id == db.func.coalesce(Quiz.topic_id, QuickPlayGame.topic_id))
+        .order_by(Result.id).execution_options(yield_per=batch_size)
+    )
+    return rows.partitions()
+
+def _csv_chunks(partitions):
+    """Yields the CSV text: the header, then one chunk per partition."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue()
+
+    for partition in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            row[:-1] + (row[-1].isoformat() if row[-1] else None,) for row in partition
+        )
+        yield buffer.getvalue()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting what pyarrow writes, until drained."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _columnar_chunks(pa, fmt, partitions):
+    """
+    Yields a Parquet file (one row group per partition) or an Arrow IPC
+    stream (one record batch per partition) as the batches are written.
+    """
+    schema = pa.schema([
+        ('result_id', pa.int64()), ('user_id', pa.int64()), ('username', pa.string()),
+        ('quiz_id', pa.int64()), ('quick_play_id', pa.int64()), ('topic', pa.string()), ('custom_topic', pa.string()),
+        ('difficulty', pa.string()), ('score', pa.int32()), ('total_questions', pa.int32()),
+        ('percentage', pa.float64()), ('completed_at', pa.timestamp('us')),
+    ])
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    with writer:
+        for partition in partitions:
+            columns = zip(*partition)
+            writer.write_batch(pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            yield sink.drain()
+    # The footer (Parquet) or end-of-stream marker (Arrow) is written on close
+    yield sink.drain()
+
+def export_results(fmt='csv', batch_size=None):
+    """
+    Generator of the full results export in the given format (see FORMATS):
+    CSV text chunks, or bytes for Parquet/Arrow. Rows are fetched in
+    batch_size chunks (default RESULT_EXPORT_BATCH_SIZE), so memory stays
+    flat whatever the number of results.
+
+    Raises ValueError for an unknown format and ExportFormatUnavailable when
+    Parquet/Arrow is asked for without pyarrow installed, both before any
+    output is produced.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of: {', '.join(FORMATS)})")
+
+    batch_size = batch_size or current_app.config['RESULT_EXPORT_BATCH_SIZE']
+    if fmt == 'csv':
+        return _csv_chunks(_result_partitions(batch_size))
+
+    # Optional dependency, only needed for the columnar formats
+    try:
+        import pyarrow
+    except ImportError:
+        raise ExportFormatUnavailable(f"The '{fmt}' export format requires pyarrow (pip install pyarrow)")
+    return _columnar_chunks(pyarrow, fmt, _result_partitions(batch_size))
@@ -0,0 +1,171 @@
+import datetime
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db, answer_keys, result_writer
+from app.models import Result
+from app.quick_play import game_answer_keys
+from app.user_stats import record_results
+
+def insert_results(rows):
+    """
+    Inserts Result rows (column dicts) in the current transaction and returns
+    their ids. Rows without 'completed_at' get it set, so record_results sees
+    the stored timestamp.
+    """
+    now = datetime.datetime.utcnow()
+    for row in rows:
+        row.setdefault('completed_at', now)
+    results = [Result(**row) for row in rows]
+    db.session.add_all(results)
+    # Ids are read before the commit expires the objects
+    db.session.flush()
+    return [result.id for result in results]
+
+def store_results(rows):
+    """
+    Inserts Result rows (column dicts) together with the matching user_stats
+    updates and returns their ids, in order. With RESULT_WRITE_BEHIND the rows
+    are group-committed by the writer thread (may raise ResultQueueFull);
+    otherwise they are committed here.
+    """
+    if result_writer.enabled:
+        return result_writer.write(rows)
+
+    ids = insert_results(rows)
+    record_results(rows)
+    db.session.commit()
+    return ids
+
+# Longest accepted client-generated submission id (Result.client_id)
+CLIENT_ID_MAX_LENGTH = 64
+
+def valid_client_id(client_id):
+    """True for an absent client_id or a non-empty string of at most CLIENT_ID_MAX_LENGTH."""
+    return client_id is None or (isinstance(client_id, str) and 0 < len(client_id) <= CLIENT_ID_MAX_LENGTH)
+
+def stored_results(user_id, client_ids):
+    """
+    The results of a user already stored under any of the given client ids,
+    as {client_id: (result_id, score, total_questions)}.
+    """
+    if not client_ids:
+        return {}
+    rows = db.session.execute(
+        db.select(Result.client_id, Result.id, Result.score, Result.total_questions)
+        .where(Result.user_id == user_id, Result.client_id.in_(client_ids))
+    )
+    return {client_id: tuple(stored) for client_id, *stored in rows}
+
+def _parse_submission(submission):
+    """
+    (column, target_id, answers, client_id) of one batch item, or a Hungarian
+    error message; column is 'quiz_id', or 'quick_play_game_id' for a quick play.
+    """
+    if not isinstance(submission, dict):
+        return "Nincsenek adatok"
+    quiz_id = submission.get('quiz_id')
+    quick_play_id = submission.get('quick_play_id')
+    answers = submission.get('answers')
+    if not (quiz_id or quick_play_id) or not isinstance(answers, list):
+        return "Hiányzó 'quiz_id' vagy 'answers' lista"
+    if quiz_id and quick_play_id:
+        return "A 'quiz_id' és a 'quick_play_id' közül csak az egyik adható meg"
+    column, target_id = ('quiz_id', quiz_id) if quiz_id else ('quick_play_game_id', quick_play_id)
+    if not isinstance(target_id, int) or isinstance(target_id, bool):
+        return "Érvénytelen 'quiz_id'" if quiz_id else "Érvénytelen 'quick_play_id'"
+    if not all(isinstance(answer, dict) for answer in answers):
+        return "Érvénytelen válasz formátum"
+    client_id = submission.get('client_id')
+    if not valid_client_id(client_id):
+        return "Érvénytelen 'client_id'"
+    return column, target_id, answers, client_id
+
+def save_results(user_id, submissions, retry=True):
+    """
+    Scores and stores several {quiz_id | quick_play_id, answers[, client_id]}
+    submissions of one user. The answer keys of every quiz and quick play
+    game involved are fetched at once and all Result rows are inserted in one
+    transaction; invalid items are skipped.
+
+    An item whose client_id the user already has a result under is not
+    stored again, so a retried batch is safe: it is reported as that result.
+
+    Returns one status per submission, in order, with the status code the
+    single POST /api/result would have answered:
+    {"status": 201, "result_id", "score", "total_questions"},
+    {"status": 200, ..., "duplicate": true} for an item stored before, or
+    {"status": 400/404, "error"}. Storage errors propagate (nothing saved).
+    """
+    statuses = [None] * len(submissions)
+    parsed = []
+    client_ids = set()
+    for index, submission in enumerate(submissions):
+        item = _parse_submission(submission)
+        if isinstance(item, str):
+            statuses[index] = {"status": 400, "error": item}
+        elif item[3] is not None and item[3] in client_ids:
+            statuses[index] = {"status": 400, "error": "Ismétlődő 'client_id' a kérésben"}
+        else:
+            parsed.append((index, *item))
+            client_ids.add(item[3])
+
+    stored = stored_results(user_id, client_ids - {None})
+    wanted = {'quiz_id': set(), 'quick_play_game_id': set()}
+    for _, column, target_id, _, client_id in parsed:
+        if client_id not in stored:
+            wanted[column].add(target_id)
+    keys = {
+        'quiz_id': answer_keys.get_many(wanted['quiz_id']),
+        'quick_play_game_id': game_answer_keys(user_id, wanted['quick_play_game_id']) if wanted['quick_play_game_id'] else {},
+    }
+
+    pending = []
+    for index, column, target_id, answers, client_id in parsed:
+        if client_id in stored:
+            result_id, score, total_questions = stored[client_id]
+            statuses[index] = {
+                "status": 200,
+                "result_id": result_id,
+                "score": score,
+                "total_questions": total_questions,
+                "duplicate": True
+            }
+            continue
+
+        answer_key = keys[column].get(target_id)
+        if answer_key is None:
+            statuses[index] = {"status": 404, "error": "Kvíz nem található" if column == 'quiz_id' else "Gyorsjáték nem található"}
+        elif len(answers) != len(answer_key):
+            statuses[index] = {"status": 400, "error": "A válaszok száma nem egyezik a kérdések számával"}
+        else:
+            score, correct_bits, selected_options = answer_key.grade(answers)
+            pending.append((index, {
+                "user_id": user_id,
+                "quiz_id": None,
+                "quick_play_game_id": None,
+                column: target_id,
+                "score": score,
+                "total_questions": len(answers),
+                "correct_bits": correct_bits,
+                "selected_options": selected_options,
+                "answer_layout": answer_key.layout,
+                "client_id": client_id
+            }))
+
+    try:
+        ids = store_results([row for _, row in pending]) if pending else []
+    except IntegrityError:
+        # A concurrent retry stored some of these client ids first; this
+        # round finds them stored
+        db.session.rollback()
+        if not retry:
+            raise
+        return save_results(user_id, submissions, retry=False)
+
+    for (index, row), result_id in zip(pending, ids):
+        statuses[index] = {
+            "status": 201,
+            "result_id": result_id,
+            "score": row["score"],
+            "total_questions": row["total_questions"]
+        }
+    return statuses
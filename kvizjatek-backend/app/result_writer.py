@@ -0,0 +1,168 @@
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from flask import current_app
+
+_STOP = object()
+
+class ResultQueueFull(Exception):
+    """The write-behind queue is at RESULT_WRITE_BEHIND_MAX_QUEUE; the caller should retry later."""
+
+class ResultWritePending(Exception):
+    """
+    The rows were queued but not committed within RESULT_WRITE_BEHIND_TIMEOUT.
+    They may still be stored (or fail) later; the outcome is unknown.
+    """
+
+class ResultWriter:
+    """
+    Optional write-behind path for Result rows (RESULT_WRITE_BEHIND).
+
+    Request workers put scored rows on a bounded in-process queue and wait
+    for their acknowledgement; one writer thread per process inserts what
+    has queued up in group commits of up to RESULT_WRITE_BEHIND_BATCH_SIZE
+    rows. A batch takes what queued while the previous commit ran, or waits
+    up to RESULT_WRITE_BEHIND_FLUSH_INTERVAL seconds to fill. A burst of
+    submissions then costs one commit (one fsync and one take of SQLite's
+    writer lock) per batch instead of per request, and callers still only
+    answer after their rows are durable.
+
+    The thread starts with the first write; rows still queued at interpreter
+    exit are committed before the process ends.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESULT_WRITE_BEHIND', False)
+        app.config.setdefault('RESULT_WRITE_BEHIND_MAX_QUEUE', 10000)
+        app.config.setdefault('RESULT_WRITE_BEHIND_BATCH_SIZE', 500)
+        app.config.setdefault('RESULT_WRITE_BEHIND_FLUSH_INTERVAL', 0)
+        app.config.setdefault('RESULT_WRITE_BEHIND_TIMEOUT', 30)
+        app.extensions['result_writer'] = {
+            'queue': queue.Queue(maxsize=app.config['RESULT_WRITE_BEHIND_MAX_QUEUE']),
+            'lock': threading.Lock(),
+            'thread': None,
+            'closed': False,
+            'batches': 0,
+            'rows': 0,
+        }
+
+    def _state(self, app=None):
+        return (app or current_app).extensions['result_writer']
+
+    @property
+    def enabled(self):
+        return current_app.config['RESULT_WRITE_BEHIND']
+
+    def write(self, rows):
+        """
+        Queues Result rows (column dicts) for the writer thread and blocks
+        until they are committed. Returns their ids, in order. Raises
+        ResultQueueFull when the queue is full, ResultWritePending when they
+        are not committed within RESULT_WRITE_BEHIND_TIMEOUT, and whatever
+        the insert raised if these rows could not be stored.
+        """
+        app = current_app._get_current_object()
+        state = self._state(app)
+        future = Future()
+
+        # Under the lock so nothing is queued behind the stop marker of shutdown()
+        with state['lock']:
+            if state['closed']:
+                raise RuntimeError("The result writer has been shut down")
+            if state['thread'] is None:
+                state['thread'] = threading.Thread(
+                    target=self._run, args=(app,), name='kvizjatek-result-writer', daemon=True
+                )
+                state['thread'].start()
+                atexit.register(self.shutdown, app)
+            try:
+                state['queue'].put_nowait((rows, future))
+            except queue.Full:
+                raise ResultQueueFull()
+        try:
+            return future.result(timeout=app.config['RESULT_WRITE_BEHIND_TIMEOUT'])
+        except FutureTimeoutError:
+            # Still queued or being committed, so the rows may yet be stored
+            raise ResultWritePending()
+
+    def _run(self, app):
+        state = self._state(app)
+        pending = state['queue']
+        batch_size = app.config['RESULT_WRITE_BEHIND_BATCH_SIZE']
+        interval = app.config['RESULT_WRITE_BEHIND_FLUSH_INTERVAL']
+
+        with app.app_context():
+            stopping = False
+            while not stopping:
+                item = pending.get()
+                if item is _STOP:
+                    break
+                batch, size = [item], len(item[0])
+                deadline = time.monotonic() + interval
+                while size < batch_size:
+                    try:
+                        item = pending.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    size += len(item[0])
+                self._commit(batch)
+                state['batches'] += 1
+                state['rows'] += size
+
+    def _commit(self, batch):
+        """
+        Commits a batch (results and user_stats updates) at once; if that
+        fails, item by item so only the offending callers get the error.
+        """
+        from app.extensions import db
+        from app.result_store import insert_results
+        from app.user_stats import record_results
+
+        try:
+            ids = [insert_results(rows) for rows, _ in batch]
+            record_results([row for rows, _ in batch for row in rows])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for rows, future in batch:
+                try:
+                    item_ids = insert_results(rows)
+                    record_results(rows)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    future.set_exception(e)
+                else:
+                    future.set_result(item_ids)
+        else:
+            for (_, future), item_ids in zip(batch, ids):
+                future.set_result(item_ids)
+        finally:
+            db.session.close()
+
+    def shutdown(self, app=None, timeout=None):
+        """Stops accepting rows and waits until everything queued is committed."""
+        state = self._state(app)
+        with state['lock']:
+            if state['closed']:
+                return
+            state['closed'] = True
+            thread = state['thread']
+            if thread is not None:
+                state['queue'].put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self, app=None):
+        state = self._state(app)
+        return {"queued": state['queue'].qsize(), "batches": state['batches'], "rows": state['rows']}
@@ -0,0 +1,175 @@
+import json
+import re
+import unicodedata
+from flask import current_app
+from sqlalchemy import DDL, event, text
+
+# FTS5 table over question texts and options, custom quiz topics and topic names
+FTS_TABLE = 'quiz_search'
+
+# Documents are keyed by rowid = source id * 4 + kind, so triggers update and
+# delete them by primary key instead of scanning the index
+KIND_QUESTION, KIND_QUIZ, KIND_TOPIC = 0, 1, 2
+
+_QUESTION_BODY = "{row}.question_text || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each({row}.options)), '')"
+
+SEARCH_DDL = (
+    # remove_diacritics: "kviz" finds "kvíz"; the prefix index serves short
+    # prefix terms ("tö*") without merging the doclists of every completion
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+
+    # Quick play copies (app.quick_play) are not part of the catalogue
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_questions_ai AFTER INSERT ON questions
+        WHEN NOT coalesce((SELECT is_quick_play FROM quizzes WHERE id = new.quiz_id), 0) BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id * 4 + {KIND_QUESTION}, {_QUESTION_BODY.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_questions_au AFTER UPDATE OF question_text, options ON questions BEGIN
+        UPDATE {FTS_TABLE} SET body = {_QUESTION_BODY.format(row='new')} WHERE rowid = new.id * 4 + {KIND_QUESTION};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_questions_ad AFTER DELETE ON questions BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_QUESTION};
+    END""",
+
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_quizzes_ai AFTER INSERT ON quizzes
+        WHEN coalesce(new.custom_topic, '') != '' BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id * 4 + {KIND_QUIZ}, new.custom_topic);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_quizzes_au AFTER UPDATE OF custom_topic ON quizzes BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_QUIZ};
+        INSERT INTO {FTS_TABLE}(rowid, body)
+            SELECT new.id * 4 + {KIND_QUIZ}, new.custom_topic WHERE coalesce(new.custom_topic, '') != '';
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_quizzes_ad AFTER DELETE ON quizzes BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_QUIZ};
+    END""",
+
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_topics_ai AFTER INSERT ON topics BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id * 4 + {KIND_TOPIC}, new.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_topics_au AFTER UPDATE OF name ON topics BEGIN
+        UPDATE {FTS_TABLE} SET body = new.name WHERE rowid = new.id * 4 + {KIND_TOPIC};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_topics_ad AFTER DELETE ON topics BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_TOPIC};
+    END""",
+)
+
+# The :max_hits best matching documents by BM25 relevance. FTS5 computes
+# bm25() as the "rank" column (lower is better), and ORDER BY rank LIMIT
+# keeps only the best rows while scanning. One row more is read to tell
+# whether weaker matches were cut off.
+_HITS_SQL = text(f"""
+    SELECT rowid, -rank AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match
+    ORDER BY rank LIMIT :max_hits + 1
+""")
+
+# Scored documents mapped to quizzes, best first: a question hit counts for its
+# quiz, a topic hit for the quizzes shown under that topic (quick play copies
+# are left out; their questions are not indexed either)
+_RANK_SQL = text(f"""
+    WITH hits AS MATERIALIZED (
+        SELECT json_extract(value, '$[0]') AS doc, json_extract(value, '$[1]') AS score
+        FROM json_each(:hits)
+    ), matches AS (
+        SELECT q.quiz_id AS quiz_id, h.score AS score
+            FROM hits h JOIN questions q ON q.id = h.doc / 4 JOIN quizzes z ON z.id = q.quiz_id
+            WHERE h.doc % 4 = {KIND_QUESTION} AND NOT z.is_quick_play
+        UNION ALL
+        SELECT h.doc / 4, h.score FROM hits h WHERE h.doc % 4 = {KIND_QUIZ}
+        UNION ALL
+        SELECT z.id, h.score
+            FROM hits h JOIN quizzes z ON z.topic_id = h.doc / 4
+            WHERE h.doc % 4 = {KIND_TOPIC} AND coalesce(z.custom_topic, '') = '' AND NOT z.is_quick_play
+    )
+    SELECT quiz_id, MAX(score) AS score FROM matches
+    GROUP BY quiz_id ORDER BY score DESC, quiz_id
+    LIMIT :limit OFFSET :offset
+""")
+
+# Letters and digits, like the unicode61 tokenizer (\w would also match '_'),
+# optionally followed by the prefix marker
+_TERM = re.compile(r'([^\W_]+)(\*?)')
+_COMBINING = re.compile(r'[\u0300-\u036f]')
+
+def normalize(text):
+    """Case and accent folding like the unicode61 tokenizer with remove_diacritics."""
+    return _COMBINING.sub('', unicodedata.normalize('NFKD', text.casefold()))
+
+def match_expression(query, max_terms=16):
+    """
+    Turns free user input into (FTS5 expression, terms): every word becomes
+    a quoted term, all of them required; a word ending in '*' matches as a
+    prefix. Everything else in the input is ignored, so it cannot inject
+    FTS5 syntax. terms is a list of (word, is_prefix). Returns (None, [])
+    without words.
+    """
+    terms = [(word, bool(star)) for word, star in _TERM.findall(normalize(query or ''))][:max_terms]
+    if not terms:
+        return None, []
+    return ' '.join(f'"{word}"*' if is_prefix else f'"{word}"' for word, is_prefix in terms), terms
+
+_listening = False
+
+class QuizSearch:
+    """
+    Ranked full-text search over the quiz catalogue (SQLite FTS5).
+
+    The index is maintained by triggers in the database (see SEARCH_DDL),
+    so every writer, ORM, bulk statement or raw SQL, keeps it current. The
+    DDL runs after db.create_all() and in the migration that backfills it.
+    Documents are scored by FTS5's bm25() in SQL; at most the
+    SEARCH_MAX_HITS best of them are mapped to quizzes, which bounds the
+    cost of very common words on large catalogues, and the search reports
+    when weaker matches were cut off.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        global _listening
+        from app.extensions import db
+
+        app.config.setdefault('SEARCH_DEFAULT_LIMIT', 20)
+        app.config.setdefault('SEARCH_MAX_LIMIT', 100)
+        app.config.setdefault('SEARCH_MAX_HITS', 500)
+
+        if not _listening:
+            for statement in SEARCH_DDL:
+                event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+            event.listen(db.metadata, 'before_drop', DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect='sqlite'))
+            _listening = True
+        app.extensions['quiz_search'] = self
+
+    @property
+    def available(self):
+        from app.extensions import db
+        return db.engine.dialect.name == 'sqlite'
+
+    def search(self, query, limit, offset=0):
+        """
+        Returns ([(quiz_id, score), ...], truncated): the quizzes best first
+        for `query` (free text), at most `limit` rows after skipping
+        `offset`. truncated is True when more than SEARCH_MAX_HITS documents
+        matched, so only the best of them were mapped to quizzes. Raises ValueError
+        for a query without words.
+        """
+        from app.extensions import db
+
+        match, _ = match_expression(query)
+        if match is None:
+            raise ValueError("'q' must contain at least one word")
+
+        max_hits = current_app.config['SEARCH_MAX_HITS']
+        documents = db.session.execute(_HITS_SQL, {"match": match, "max_hits": max_hits}).all()
+        truncated = len(documents) > max_hits
+        if not documents:
+            return [], truncated
+
+        rows = db.session.execute(_RANK_SQL, {
+            "hits": json.dumps([[rowid, score] for rowid, score in documents[:max_hits]]),
+            "limit": limit,
+            "offset": offset,
+        })
+        return [(quiz_id, score) for quiz_id, score in rows], truncated
@@ -0,0 +1,153 @@
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.extensions import db
+from app.models import QuickPlayGame, Quiz, Result, Topic, User, UserStats
+
+def _percentage(score, total_questions):
+    return score * 100.0 / total_questions if total_questions else 0.0
+
+def record_results(rows):
+    """
+    Adds inserted Result rows (column dicts, see result_store.insert_results)
+    to the user_stats rollups of their users, in the caller's transaction: one overall row per user and one per
+    catalogue topic, aggregated here and upserted with one statement.
+    Results removed later with their quiz are taken out by a rebuild of
+    their users (see api.quiz.delete_quiz).
+    """
+    if not rows:
+        return
+
+    quiz_topics = dict(db.session.query(Quiz.id, Quiz.topic_id).filter(
+        Quiz.id.in_({row['quiz_id'] for row in rows if row.get('quiz_id')})
+    ))
+    game_topics = dict(db.session.query(QuickPlayGame.id, QuickPlayGame.topic_id).filter(
+        QuickPlayGame.id.in_({row['quick_play_game_id'] for row in rows if row.get('quick_play_game_id')})
+    ))
+    deltas = {}
+    for row in rows:
+        percentage = _percentage(row['score'], row['total_questions'])
+        completed_at = row['completed_at']
+        keys = [UserStats.OVERALL]
+        if row.get('quiz_id'):
+            topic_id = quiz_topics.get(row['quiz_id'])
+        else:
+            topic_id = game_topics.get(row.get('quick_play_game_id'))
+        if topic_id:
+            keys.append(topic_id)
+
+        for topic_id in keys:
+            delta = deltas.get((row['user_id'], topic_id))
+            if delta is None:
+                delta = deltas[(row['user_id'], topic_id)] = {
+                    "user_id": row['user_id'], "topic_id": topic_id, "attempts": 0, "total_score": 0,
+                    "total_questions": 0, "best_percentage": 0.0, "percentage_sum": 0.0,
+                    "last_completed_at": completed_at
+                }
+            delta['attempts'] += 1
+            delta['total_score'] += row['score']
+            delta['total_questions'] += row['total_questions']
+            delta['best_percentage'] = max(delta['best_percentage'], percentage)
+            delta['percentage_sum'] += percentage
+            delta['last_completed_at'] = max(delta['last_completed_at'], completed_at)
+
+    db.session.execute(upsert_statement(db.session.get_bind().dialect.name, list(deltas.values())))
+
+def upsert_statement(dialect, values):
+    """
+    The INSERT ... ON CONFLICT / ON DUPLICATE KEY statement adding the
+    `values` deltas to user_stats, for the SQLAlchemy dialect name.
+    Raises NotImplementedError for other databases.
+    """
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite if dialect == 'sqlite' else postgresql).insert(UserStats).values(values)
+        return insert.on_conflict_do_update(
+            index_elements=[UserStats.user_id, UserStats.topic_id],
+            set_=_merged(insert.excluded, dialect)
+        )
+    if dialect in ('mysql', 'mariadb'):
+        insert = mysql.insert(UserStats).values(values)
+        return insert.on_duplicate_key_update(_merged(insert.inserted, dialect))
+    raise NotImplementedError(f"user_stats upserts are not implemented for the '{dialect}' database")
+
+def _merged(new, dialect):
+    """SET clause of the upsert: the stored row combined with the `new` (excluded / inserted) row."""
+    # SQLite's max() with two arguments is the scalar greatest() of the other databases
+    greatest = db.func.max if dialect == 'sqlite' else db.func.greatest
+    return {
+        "attempts": UserStats.attempts + new.attempts,
+        "total_score": UserStats.total_score + new.total_score,
+        "total_questions": UserStats.total_questions + new.total_questions,
+        "best_percentage": greatest(UserStats.best_percentage, new.best_percentage),
+        "percentage_sum": UserStats.percentage_sum + new.percentage_sum,
+        "last_completed_at": greatest(
+            db.func.coalesce(UserStats.last_completed_at, new.last_completed_at), new.last_completed_at
+        ),
+    }
+
+def rebuild_statements(user_ids=None):
+    """
+    The statements that recompute user_stats from the results table (every
+    user, or the given ones): a delete and two INSERT ... SELECT aggregates.
+    """
+    filters = [Result.user_id.in_(user_ids)] if user_ids is not None else []
+    percentage = db.case(
+        (Result.total_questions > 0, Result.score * 100.0 / Result.total_questions), else_=0.0
+    )
+    aggregates = (
+        db.func.count(Result.id),
+        db.func.sum(Result.score),
+        db.func.sum(Result.total_questions),
+        db.func.max(percentage),
+        db.func.sum(percentage),
+        db.func.max(Result.completed_at),
+    )
+    columns = ['user_id', 'topic_id', 'attempts', 'total_score', 'total_questions',
+               'best_percentage', 'percentage_sum', 'last_completed_at']
+
+    delete = db.delete(UserStats).where(*([UserStats.user_id.in_(user_ids)] if user_ids is not None else []))
+    overall = db.select(Result.user_id, db.literal(UserStats.OVERALL), *aggregates) \
+        .join(User, User.id == Result.user_id).where(*filters).group_by(Result.user_id)
+    # A result belongs to the topic of its quiz or of its quick play game
+    topic_id = db.func.coalesce(Quiz.topic_id, QuickPlayGame.topic_id)
+    per_topic = db.select(Result.user_id, topic_id, *aggregates) \
+        .join(User, User.id == Result.user_id) \
+        .outerjoin(Quiz, Quiz.id == Result.quiz_id) \
+        .outerjoin(QuickPlayGame, QuickPlayGame.id == Result.quick_play_game_id) \
+        .where(topic_id.isnot(None), *filters).group_by(Result.user_id, topic_id)
+
+    return [delete] + [db.insert(UserStats).from_select(columns, select) for select in (overall, per_topic)]
+
+def rebuild_user_stats(user_ids=None):
+    """Recomputes user_stats (see rebuild_statements). Returns the number of rows written; the caller commits."""
+    delete, *inserts = rebuild_statements(user_ids)
+    db.session.execute(delete)
+    return sum(db.session.execute(insert).rowcount for insert in inserts)
+
+def _serialize(stats):
+    return {
+        "attempts": stats.attempts,
+        "total_score": stats.total_score,
+        "total_questions": stats.total_questions,
+        "best_percentage": round(stats.best_percentage, 2),
+        "average_percentage": round(stats.percentage_sum / stats.attempts, 2) if stats.attempts else None,
+        "last_completed_at": stats.last_completed_at.isoformat() if stats.last_completed_at else None
+    }
+
+def get_user_stats(user_id):
+    """
+    The stats of a user from the rollup rows (one query, independent of the
+    number of results): the overall totals plus a "topics" breakdown.
+    """
+    rows = db.session.query(UserStats, Topic.name) \
+        .outerjoin(Topic, Topic.id == UserStats.topic_id) \
+        .filter(UserStats.user_id == user_id).all()
+
+    overall = UserStats(attempts=0, total_score=0, total_questions=0, best_percentage=0.0, percentage_sum=0.0)
+    topics = []
+    for stats, topic_name in rows:
+        if stats.topic_id == UserStats.OVERALL:
+            overall = stats
+        elif topic_name is not None:
+            topics.append({"topic_id": stats.topic_id, "topic_name": topic_name, **_serialize(stats)})
+
+    topics.sort(key=lambda item: item['topic_name'])
+    return {**_serialize(overall), "topics": topics}
@@ -0,0 +1,243 @@
+import datetime
+import hashlib
+from functools import wraps
+from flask import current_app, g, make_response, request
+from sqlalchemy import event, select
+
+# Tables whose writes are counted; the public read endpoints derive their ETags from these
+VERSIONED_TABLES = frozenset({'topics', 'quizzes', 'questions'})
+
+def _table_name(obj):
+    table = getattr(obj, '__table__', None)
+    return table.name if table is not None else None
+
+def bump_versions(connection, tables):
+    """Increments the change counters of `tables` on `connection` (inside the caller's transaction)."""
+    from app.models import TableVersion
+
+    tables = sorted(tables)
+    now = datetime.datetime.utcnow()
+    table = TableVersion.__table__
+    updated = connection.execute(
+        table.update()
+        .where(table.c.table_name.in_(tables))
+        .values(version=table.c.version + 1, updated_at=now)
+    ).rowcount
+
+    if updated < len(tables):
+        # First write to a table on a database that was not seeded by the migration
+        existing = {name for (name,) in connection.execute(
+            table.select().with_only_columns(table.c.table_name).where(table.c.table_name.in_(tables))
+        )}
+        connection.execute(table.insert(), [
+            {"table_name": name, "version": 1, "updated_at": now} for name in tables if name not in existing
+        ])
+
+def bump_quiz_versions(connection, where):
+    """Increments the version of the quizzes matching `where` (a clause on the quizzes table)."""
+    from app.models import Quiz
+
+    table = Quiz.__table__
+    connection.execute(
+        table.update().where(where).values(version=table.c.version + 1, updated_at=datetime.datetime.utcnow())
+    )
+
+def _track_row_change(mapper, connection, target):
+    from sqlalchemy.orm import object_session
+
+    name = mapper.local_table.name
+    session = object_session(target)
+    if name in VERSIONED_TABLES and session is not None:
+        session.info.setdefault('changed_tables', set()).add(name)
+
+def _note(target, key, value):
+    from sqlalchemy.orm import object_session
+
+    session = object_session(target)
+    if session is not None and value is not None:
+        session.info.setdefault(key, set()).add(value)
+
+def _track_quiz_update(mapper, connection, target):
+    _note(target, 'changed_quizzes', target.id)
+
+def _track_question_change(mapper, connection, target):
+    _note(target, 'changed_quizzes', target.quiz_id)
+
+def _track_topic_update(mapper, connection, target):
+    # Quizzes embed their topic's name
+    _note(target, 'changed_topics', target.id)
+
+def _after_flush(session, flush_context):
+    from app.models import Quiz
+
+    tables = session.info.pop('changed_tables', None)
+    if tables:
+        bump_versions(session.connection(), tables)
+    quiz_ids = session.info.pop('changed_quizzes', None)
+    if quiz_ids:
+        bump_quiz_versions(session.connection(), Quiz.__table__.c.id.in_(quiz_ids))
+    topic_ids = session.info.pop('changed_topics', None)
+    if topic_ids:
+        bump_quiz_versions(session.connection(), Quiz.__table__.c.topic_id.in_(topic_ids))
+
+def _bulk_quiz_clause(orm_execute_state, name):
+    """
+    The quizzes whose payload a bulk statement on `name` changes, as a clause
+    on the quizzes table, or None. Evaluated before the statement runs.
+    """
+    from app.models import Question, Quiz, Topic
+
+    statement = orm_execute_state.statement
+    quizzes = Quiz.__table__.c
+    if orm_execute_state.is_insert:
+        # Only questions added to a quiz change it; the parameters name the quizzes
+        params = orm_execute_state.parameters
+        if name != 'questions' or not params:
+            return None
+        rows = params if isinstance(params, (list, tuple)) else [params]
+        return quizzes.id.in_({row['quiz_id'] for row in rows if row.get('quiz_id') is not None})
+
+    where = statement.whereclause
+    if name == 'quizzes':
+        return None if orm_execute_state.is_delete else (where if where is not None else quizzes.id.isnot(None))
+    matched = select(Question.quiz_id if name == 'questions' else Topic.id)
+    if where is not None:
+        matched = matched.where(where)
+    return (quizzes.id if name == 'questions' else quizzes.topic_id).in_(matched.scalar_subquery())
+
+def _track_bulk_statement(orm_execute_state):
+    # Bulk ORM statements (query.delete(), update(Model)..., insert(Model) executemany)
+    # bypass the unit of work and with it the mapper events
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        name = getattr(orm_execute_state.statement.table, 'name', None)
+        if name in VERSIONED_TABLES:
+            connection = orm_execute_state.session.connection()
+            bump_versions(connection, {name})
+            clause = _bulk_quiz_clause(orm_execute_state, name)
+            if clause is not None:
+                bump_quiz_versions(connection, clause)
+
+_listening = False
+
+class TableVersions:
+    """
+    Per-table and per-quiz change counters for conditional GETs and caches.
+
+    Every ORM write to a table in VERSIONED_TABLES (unit of work or bulk
+    statement) bumps that table's row in `table_versions` in the same
+    transaction, so a rolled back write leaves the version alone and every
+    worker process sees the same versions. Reading the versions of a few
+    tables is a single primary-key lookup, no matter how many rows they have.
+
+    Writes to a quiz, its questions or its topic's name also bump that
+    quiz's own `version`, so what is built from one quiz (its detail
+    payload, its answer key) is validated against that row only and stays
+    fresh while other quizzes are written.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        global _listening
+        from flask_sqlalchemy.session import Session
+        from app.extensions import db
+
+        if not _listening:
+            from app.models import Question, Quiz, Topic
+
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(db.Model, name, _track_row_change, propagate=True)
+                event.listen(Question, name, _track_question_change)
+            event.listen(Quiz, 'after_update', _track_quiz_update)
+            event.listen(Topic, 'after_update', _track_topic_update)
+            event.listen(Session, 'after_flush', _after_flush)
+            event.listen(Session, 'do_orm_execute', _track_bulk_statement)
+            _listening = True
+        app.extensions['table_versions'] = self
+
+    def get(self, tables):
+        """Returns {table: (version, updated_at)}; tables never written report (0, None)."""
+        from app.extensions import db
+        from app.models import TableVersion
+
+        rows = db.session.query(TableVersion.table_name, TableVersion.version, TableVersion.updated_at) \
+            .filter(TableVersion.table_name.in_(tables)).all()
+        found = {name: (version, updated_at) for name, version, updated_at in rows}
+        return {name: found.get(name, (0, None)) for name in tables}
+
+    def etag(self, tables, key=''):
+        """
+        Strong ETag and Last-Modified for a response built from `tables`.
+        `key` distinguishes responses over the same tables (path, query string).
+        """
+        return _validators(self.get(tables), key)
+
+def _validators(versions, key):
+    """ETag and Last-Modified from {name: (version, updated_at)}."""
+    fingerprint = '|'.join(
+        f"{name}:{version}:{updated_at.isoformat() if updated_at else ''}"
+        for name, (version, updated_at) in sorted(versions.items())
+    )
+    etag = hashlib.sha1(f"{key}|{fingerprint}".encode('utf-8')).hexdigest()
+    stamps = [updated_at for version, updated_at in versions.values() if updated_at is not None]
+    return etag, max(stamps) if stamps else None
+
+def quiz_version(quiz_id):
+    """(version, updated_at) of a quiz, or None if it does not exist. One primary-key lookup."""
+    from app.extensions import db
+    from app.models import Quiz
+
+    row = db.session.execute(select(Quiz.version, Quiz.updated_at).where(Quiz.id == quiz_id)).first()
+    return None if row is None else (row.version, row.updated_at)
+
+def conditional(*tables, resource=None):
+    """
+    Makes a public GET view conditional on the versions of `tables`, or
+    with `resource` on the version of the one resource the view returns:
+    resource(**view_args) gives its (version, updated_at), or None if it
+    does not exist (the view then runs without validators). The view finds
+    that snapshot in g.resource_version, to validate cached data against
+    without another lookup.
+
+    The ETag/Last-Modified are computed before the view runs, so a matching
+    If-None-Match (or a fresh If-Modified-Since) is answered with 304
+    without loading or serializing any rows. Only 200 responses get the
+    validators.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if resource is not None:
+                g.resource_version = snapshot = resource(**kwargs)
+                if snapshot is None:
+                    return fn(*args, **kwargs)
+                etag, last_modified = _validators({'resource': snapshot}, request.full_path)
+            else:
+                etag, last_modified = current_app.extensions['table_versions'].etag(tables, request.full_path)
+            if last_modified is not None:
+                # HTTP dates have a one second resolution
+                last_modified = last_modified.replace(microsecond=0, tzinfo=datetime.timezone.utc)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and last_modified is not None and last_modified <= since
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Let browsers and proxies store the body but always revalidate it
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
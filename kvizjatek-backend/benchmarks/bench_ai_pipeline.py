@@ -0,0 +1,194 @@
+"""
+Offline load test of the AI quiz generation pipeline (POST /api/quiz with ai_generate).
+
+No API key or network is needed. By default the deterministic offline
+provider answers in-process: fan-out, caching and the circuit breaker take
+part, but the OpenAI SDK (and with it its retries) is bypassed.
+
+With --upstream http the real OpenAI provider is used instead, pointed
+(OPENAI_BASE_URL) at a local HTTP stand-in of the chat completions API that
+injects 429/500/503 responses at --error-rate. Those go through the SDK's
+retries (--max-retries, i.e. OPENAI_MAX_RETRIES) before the circuit
+breaker sees them.
+
+    python benchmarks/bench_ai_pipeline.py --requests 200 --concurrency 16 \
+        --latency uniform:0.2,1.5 --error-rate 0.05 --malformed-rate 0.05 --upstream http
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.ai_providers import parse_latency
+from app.models import User
+from config import Config
+
+class StandInUpstream(ThreadingHTTPServer):
+    """
+    Local stand-in of POST /v1/chat/completions with simulated latency,
+    injected 429/500/503 responses and truncated JSON content.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency, error_rate, malformed_rate, seed=0):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.attempts = 0
+        self.injected = {}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def draw(self):
+        """Returns (latency, injected status or None, malformed, question seed) for one attempt."""
+        with self.lock:
+            self.attempts += 1
+            status = self.rng.choice((429, 500, 503)) if self.rng.random() < self.error_rate else None
+            if status:
+                self.injected[status] = self.injected.get(status, 0) + 1
+            return (self.sample_latency(self.rng), status,
+                    self.rng.random() < self.malformed_rate, self.rng.getrandbits(32))
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = request['messages'][0]['content']
+        num_questions = int(re.search(r'generate (\d+) multiple-choice', prompt).group(1))
+        topic = re.search(r'on the topic of "(.*?)"', prompt).group(1)
+
+        latency, status, malformed, seed = self.server.draw()
+        time.sleep(latency)
+        if status:
+            # A short Retry-After keeps the SDK's backoff from dominating the run
+            self._reply(status, {"error": {"message": "Injected upstream failure", "type": "server_error"}},
+                        [('retry-after-ms', '20')])
+            return
+
+        rng = random.Random(seed)
+        questions = []
+        for _ in range(num_questions):
+            token = rng.getrandbits(32)
+            questions.append({
+                "question_text": f"[{topic}] Stand-in question {token:08x}?",
+                "options": [f"Answer {token:08x}-{i}" for i in range(4)],
+                "correct_option_index": rng.randrange(4)
+            })
+        content = json.dumps({"questions": questions})
+        if malformed:
+            content = content[:len(content) // 2]
+
+        self._reply(200, {
+            "id": f"chatcmpl-{seed:08x}", "object": "chat.completion", "created": int(time.time()),
+            "model": request['model'],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4}
+        })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--num-questions', type=int, default=5)
+    parser.add_argument('--topics', type=int, default=10, help="distinct topics (lower = more cache hits)")
+    parser.add_argument('--latency', default='uniform:0.05,0.3')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--upstream', choices=['offline', 'http'], default='offline',
+                        help="offline: in-process provider; http: OpenAI SDK against a local stand-in (with retries)")
+    parser.add_argument('--max-retries', type=int, default=2, help="OPENAI_MAX_RETRIES with --upstream http")
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    upstream = None
+    if args.upstream == 'http':
+        upstream = StandInUpstream(args.latency, args.error_rate, args.malformed_rate)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_file.name
+        AI_PROVIDER = 'openai' if upstream else 'offline'
+        AI_OFFLINE_LATENCY = args.latency
+        AI_OFFLINE_ERROR_RATE = args.error_rate
+        AI_OFFLINE_MALFORMED_RATE = args.malformed_rate
+        AI_CACHE_ENABLED = not args.no_cache
+        OPENAI_API_KEY = 'benchmark'
+        OPENAI_BASE_URL = upstream.base_url if upstream else None
+        OPENAI_MAX_RETRIES = args.max_retries
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='bench', email='bench@test.com', password_hash='pw'))
+        db.session.commit()
+
+        from flask_jwt_extended import create_access_token
+        headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+
+    def one_request(i):
+        payload = {
+            "custom_topic": f"Benchmark topic {i % args.topics}",
+            "difficulty": "Medium",
+            "ai_generate": True,
+            "num_questions": args.num_questions
+        }
+        started = time.perf_counter()
+        response = app.test_client().post('/api/quiz/', json=payload, headers=headers)
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(one_request, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in outcomes)
+    statuses = {}
+    for status, _ in outcomes:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"requests:    {args.requests} in {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)")
+    print(f"status:      {dict(sorted(statuses.items()))}")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"latency max: {latencies[-1] * 1000:.1f} ms")
+    if upstream is not None:
+        upstream.shutdown()
+        print(f"upstream:    {upstream.attempts} attempts, injected {dict(sorted(upstream.injected.items()))} "
+              f"(retried by the SDK up to {args.max_retries} times each)")
+
+    os.unlink(db_file.name)
+
+if __name__ == '__main__':
+    main()
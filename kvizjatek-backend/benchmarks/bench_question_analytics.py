@@ -0,0 +1,91 @@
+"""
+Time of the question analytics job (app.question_analytics) over many
+results, and the per-answer storage it reads.
+
+Fills a fresh SQLite file with --quizzes quizzes of --per-quiz questions
+and --results graded results spread over them, then recomputes the
+question_analytics table.
+
+    python benchmarks/bench_question_analytics.py --results 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.answer_keys import AnswerKey
+from app.extensions import db
+from app.models import Question, Quiz, Result, User
+from app.question_analytics import compute_question_analytics
+from config import Config
+
+def fill(num_quizzes, per_quiz, num_results, rng):
+    db.session.add(User(id=1, username='bench', email='bench@test.com', password_hash='pw'))
+    db.session.execute(db.insert(Quiz), [
+        {"custom_topic": "Benchmark", "difficulty": "Medium", "created_by_user_id": 1} for _ in range(num_quizzes)
+    ])
+    db.session.execute(db.insert(Question), [
+        {"quiz_id": quiz_id, "question_text": f"Q{quiz_id}.{i}", "options": ["A", "B", "C", "D"],
+         "correct_option_index": rng.randrange(4)}
+        for quiz_id in range(1, num_quizzes + 1) for i in range(per_quiz)
+    ])
+    db.session.commit()
+
+    keys = {}
+    for quiz_id, question_id, options, correct in db.session.query(
+        Question.quiz_id, Question.id, Question.options, Question.correct_option_index
+    ).order_by(Question.quiz_id, Question.id):
+        keys.setdefault(quiz_id, []).append((question_id, options, correct))
+    keys = {quiz_id: AnswerKey(rows) for quiz_id, rows in keys.items()}
+
+    for start in range(0, num_results, 50000):
+        rows = []
+        for _ in range(start, min(start + 50000, num_results)):
+            quiz_id = rng.randrange(1, num_quizzes + 1)
+            key = keys[quiz_id]
+            score, correct_bits, selected_options = key.grade([
+                {"question_id": question_id, "selected_answer": rng.choice("ABCD")} for question_id in key.questions
+            ])
+            rows.append({"user_id": 1, "quiz_id": quiz_id, "score": score, "total_questions": len(key),
+                         "correct_bits": correct_bits, "selected_options": selected_options,
+                         "answer_layout": key.layout})
+        db.session.execute(db.insert(Result), rows)
+        db.session.commit()
+        print(f"  inserted {min(start + 50000, num_results)} results", end='\r')
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quizzes', type=int, default=1000)
+    parser.add_argument('--per-quiz', type=int, default=15)
+    parser.add_argument('--results', type=int, default=1000000)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_file.name
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        fill(args.quizzes, args.per_quiz, args.results, random.Random(0))
+
+        per_answer = (args.per_quiz + 7) // 8 + args.per_quiz
+        print(f"per-answer data: {per_answer} bytes per result, "
+              f"{per_answer * args.results / 1024 / 1024:.1f} MiB in total")
+
+        started = time.perf_counter()
+        report = compute_question_analytics()
+        print(f"analytics of {report['questions']} questions from {report['results']} results "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    os.unlink(db_file.name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares the two quiz creation paths of app.quiz_service:
+
+* orm:  build_quiz (validate_question + one ORM Question object per question)
+* bulk: insert_quiz (validate_questions in one pass + one executemany INSERT)
+
+Each run validates, inserts and commits one quiz into a fresh SQLite file.
+
+    python benchmarks/bench_quiz_create.py --sizes 15,100,1000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.models import User
+from app.quiz_service import build_quiz, insert_quiz
+from config import Config
+
+def orm_path(questions):
+    db.session.add(build_quiz(None, "Benchmark", "Medium", 1, questions))
+    db.session.commit()
+
+def bulk_path(questions):
+    insert_quiz(None, "Benchmark", "Medium", 1, questions)
+    db.session.commit()
+
+PATHS = {'orm': orm_path, 'bulk': bulk_path}
+
+def make_questions(count):
+    return [
+        {
+            "question_text": f"Benchmark question number {i}?",
+            "options": [f"Answer {i}", "Other", "Neither", "Both"],
+            "correct_option_index": i % 4
+        }
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='15,100,1000', help="questions per quiz, comma separated")
+    parser.add_argument('--repeat', type=int, default=20, help="quizzes created per path and size")
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_file.name
+        DUPLICATE_QUESTION_POLICY = 'off'
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='bench', email='bench@test.com', password_hash='pw'))
+        db.session.commit()
+
+        print(f"{'questions':>9}  {'path':<5} {'median':>10} {'p95':>10}  {'questions/s':>12}")
+        for size in (int(s) for s in args.sizes.split(',')):
+            questions = make_questions(size)
+            medians = {}
+            for name, create in PATHS.items():
+                create(questions) # warm-up
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    create(questions)
+                    timings.append(time.perf_counter() - started)
+                    db.session.expunge_all()
+                timings.sort()
+                medians[name] = statistics.median(timings)
+                print(f"{size:>9}  {name:<5} {medians[name] * 1000:>8.2f}ms "
+                      f"{timings[int(len(timings) * 0.95) - 1] * 1000:>8.2f}ms  {size / medians[name]:>12.0f}")
+            print(f"{'':>9}  speedup {medians['orm'] / medians['bulk']:.1f}x")
+
+    os.unlink(db_file.name)
+
+if __name__ == '__main__':
+    main()
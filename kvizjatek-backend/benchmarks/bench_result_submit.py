@@ -0,0 +1,109 @@
+"""
+Throughput of POST /api/result under concurrent submissions, comparing:
+
+* commit:       the default path, one commit per request
+* write-behind: RESULT_WRITE_BEHIND, rows group-committed by the writer thread
+
+--clients threads each submit --per-client results for one quiz through
+their own test client against a fresh SQLite file. Failed submissions
+(e.g. "database is locked") are counted.
+
+    python benchmarks/bench_result_submit.py --clients 1,8,32 --per-client 50
+
+On a laptop-class machine (SQLite file, default journal) write-behind was
+about even with the per-request commit at 1 client and ~2x faster at 32,
+with ~100 instead of 1600 commits. The test client holds the GIL, so a real
+multi-process deployment gains more from avoiding the writer lock.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.extensions import db, result_writer
+from app.models import Question, Quiz, User
+from config import Config
+
+MODES = {'commit': False, 'write-behind': True}
+
+def setup(num_users):
+    db.session.add_all([
+        User(id=i, username=f'bench{i}', email=f'bench{i}@test.com', password_hash='pw')
+        for i in range(1, num_users + 1)
+    ])
+    quiz = Quiz(custom_topic="Benchmark", difficulty="Medium", created_by_user_id=1)
+    db.session.add(quiz)
+    db.session.flush()
+    questions = [
+        Question(quiz_id=quiz.id, question_text=f"Q{i}", options=["A", "B", "C", "D"], correct_option_index=i % 4)
+        for i in range(10)
+    ]
+    db.session.add_all(questions)
+    db.session.commit()
+    return {
+        "quiz_id": quiz.id,
+        "answers": [{"question_id": q.id, "selected_answer": "A"} for q in questions]
+    }
+
+def run(write_behind, clients, per_client):
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_file.name
+        RESULT_WRITE_BEHIND = write_behind
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        payload = setup(clients)
+        tokens = [create_access_token(identity=str(i)) for i in range(1, clients + 1)]
+
+    failures = []
+    start = threading.Barrier(clients + 1)
+
+    def client_loop(token):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        start.wait()
+        for _ in range(per_client):
+            if client.post('/api/result/', json=payload, headers=headers).status_code != 201:
+                failures.append(1)
+
+    threads = [threading.Thread(target=client_loop, args=(token,)) for token in tokens]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    batches = result_writer.stats(app)['batches']
+    result_writer.shutdown(app)
+    with app.app_context():
+        db.engine.dispose()
+    os.unlink(db_file.name)
+    return clients * per_client / elapsed, len(failures), batches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', default='1,8,32', help="concurrent submitters, comma separated")
+    parser.add_argument('--per-client', type=int, default=50, help="results submitted by each client")
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'mode':<14} {'results/s':>10} {'failed':>8} {'commits':>8}")
+    for clients in (int(c) for c in args.clients.split(',')):
+        for name, write_behind in MODES.items():
+            throughput, failed, batches = run(write_behind, clients, args.per_client)
+            commits = batches if write_behind else clients * args.per_client - failed
+            print(f"{clients:>8} {name:<14} {throughput:>10.0f} {failed:>8} {commits:>8}")
+
+if __name__ == '__main__':
+    main()
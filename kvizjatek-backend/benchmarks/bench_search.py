@@ -0,0 +1,113 @@
+"""
+Latency of GET /api/quiz/search on a large synthetic catalogue.
+
+Fills a fresh SQLite file with --questions synthetic questions (spread over
+quizzes of --per-quiz questions) through the regular triggers, then times a
+mix of common, rare, prefix and multi-word queries through the test client.
+
+    python benchmarks/bench_search.py --questions 1000000 --repeat 50
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.models import Question, Quiz, Topic, User
+from config import Config
+
+SYLLABLES = ["ka", "lo", "mi", "ter", "vas", "ron", "del", "shi", "pu", "gan", "zol", "be", "ra", "tik", "nu", "fer"]
+
+def make_vocabulary(rng, size=20000):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    # Sorted first: set order depends on the string hash seed
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+def fill(questions, per_quiz, rng):
+    """Questions of 8 words drawn from a Zipf-like distribution (like natural text). Returns the vocabulary."""
+    vocabulary = make_vocabulary(rng)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    topics = [Topic(name=f"{vocabulary[i].title()} studies") for i in range(20)]
+    db.session.add_all(topics)
+    db.session.add(User(id=1, username='bench', email='bench@test.com', password_hash='pw'))
+    db.session.commit()
+
+    num_quizzes = max(1, questions // per_quiz)
+    db.session.execute(db.insert(Quiz), [
+        {"topic_id": topics[i % len(topics)].id, "difficulty": "Medium", "created_by_user_id": 1}
+        for i in range(num_quizzes)
+    ])
+    for start in range(0, questions, 50000):
+        db.session.execute(db.insert(Question), [
+            {
+                "quiz_id": i // per_quiz + 1,
+                "question_text": ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=8)) + '?',
+                "options": rng.choices(vocabulary, cum_weights=cum_weights, k=4),
+                "correct_option_index": 0
+            }
+            for i in range(start, min(start + 50000, questions))
+        ])
+        db.session.commit()
+        print(f"  inserted {min(start + 50000, questions)} questions", end='\r')
+    print()
+    return vocabulary
+
+def make_queries(vocabulary):
+    """From the most common word (in ~1/10 of the questions) down to rare ones, plus prefixes and combinations."""
+    return [
+        vocabulary[0],
+        vocabulary[100],
+        vocabulary[5000],
+        f"{vocabulary[3]} {vocabulary[40]}",
+        f"{vocabulary[20]} {vocabulary[2000]} {vocabulary[7]}",
+        vocabulary[5][:3] + '*',
+        f"{vocabulary[1]} {vocabulary[300][:4]}*",
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=1000000)
+    parser.add_argument('--per-quiz', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + db_file.name
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        vocabulary = fill(args.questions, args.per_quiz, random.Random(0))
+        print(f"filled in {time.perf_counter() - started:.1f}s")
+
+    client = app.test_client()
+    print(f"{'query':<24} {'median':>10} {'p95':>10} {'results':>8}")
+    for query in make_queries(vocabulary):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            response = client.get('/api/quiz/search', query_string={"q": query})
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f"{query:<24} {statistics.median(timings) * 1000:>8.2f}ms "
+              f"{timings[int(len(timings) * 0.95) - 1] * 1000:>8.2f}ms {len(response.get_json()['items']):>8}")
+
+    os.unlink(db_file.name)
+
+if __name__ == '__main__':
+    main()
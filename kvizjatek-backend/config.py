@@ -16,5 +16,120 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'ez_egy_eros_jwt_kulcs'
     
 
+    # 'openai' or 'offline' (deterministic local stand-in for load tests, see app/ai_providers.py)
+    AI_PROVIDER = os.environ.get('AI_PROVIDER', 'openai')
+    AI_OFFLINE_LATENCY = os.environ.get('AI_OFFLINE_LATENCY', 'fixed:0')
+    AI_OFFLINE_ERROR_RATE = float(os.environ.get('AI_OFFLINE_ERROR_RATE', 0))
+    AI_OFFLINE_MALFORMED_RATE = float(os.environ.get('AI_OFFLINE_MALFORMED_RATE', 0))
+    AI_OFFLINE_SEED = os.environ.get('AI_OFFLINE_SEED', '0')
+
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY') 
-    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL') 
\ No newline at end of file
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL')
+    OPENAI_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 5))
+    OPENAI_READ_TIMEOUT = float(os.environ.get('OPENAI_READ_TIMEOUT', 60))
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 2))
+
+    # Fail fast after repeated upstream failures instead of queueing behind a dead endpoint
+    AI_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('AI_CIRCUIT_FAILURE_THRESHOLD', 5))
+    AI_CIRCUIT_RESET_TIMEOUT = int(os.environ.get('AI_CIRCUIT_RESET_TIMEOUT', 30))
+
+    # Background AI generation (POST /api/quiz with "async": true)
+    AI_JOB_WORKERS = int(os.environ.get('AI_JOB_WORKERS', 4))
+    AI_GENERATION_ASYNC = os.environ.get('AI_GENERATION_ASYNC', 'false').lower() == 'true'
+    # Fail the jobs and bulk runs left queued/running by a previous process when the app starts.
+    # With several worker processes turn it off and run `flask recover-jobs` before starting them.
+    JOB_RECOVERY_ON_STARTUP = os.environ.get('JOB_RECOVERY_ON_STARTUP', 'true').lower() == 'true'
+
+    # Pre-warmed AI question pool per (topic, difficulty)
+    QUESTION_POOL_ENABLED = os.environ.get('QUESTION_POOL_ENABLED', 'false').lower() == 'true'
+    QUESTION_POOL_TARGET = int(os.environ.get('QUESTION_POOL_TARGET', 30))
+    QUESTION_POOL_LOW_WATER = int(os.environ.get('QUESTION_POOL_LOW_WATER', 10))
+    QUESTION_POOL_BATCH_SIZE = int(os.environ.get('QUESTION_POOL_BATCH_SIZE', 10))
+    QUESTION_POOL_DIFFICULTIES = ['Easy', 'Medium', 'Hard']
+
+    # AI response cache (normalized topic/difficulty/num_questions keys)
+    AI_CACHE_ENABLED = os.environ.get('AI_CACHE_ENABLED', 'true').lower() == 'true'
+    AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL', 3600))
+    AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', 256))
+    AI_CACHE_SQLITE_PATH = os.environ.get('AI_CACHE_SQLITE_PATH')
+
+    # Large AI requests are split into concurrent completions of this size
+    AI_FANOUT_ENABLED = os.environ.get('AI_FANOUT_ENABLED', 'true').lower() == 'true'
+    AI_FANOUT_CHUNK_SIZE = int(os.environ.get('AI_FANOUT_CHUNK_SIZE', 5))
+    AI_FANOUT_MAX_WORKERS = int(os.environ.get('AI_FANOUT_MAX_WORKERS', 4))
+    AI_FANOUT_SIMILARITY_THRESHOLD = float(os.environ.get('AI_FANOUT_SIMILARITY_THRESHOLD', 0.8))
+
+    # Near-duplicate question detection (MinHash/LSH): 'flag', 'reject' or 'off'
+    DUPLICATE_QUESTION_POLICY = os.environ.get('DUPLICATE_QUESTION_POLICY', 'flag')
+    DUPLICATE_QUESTION_THRESHOLD = float(os.environ.get('DUPLICATE_QUESTION_THRESHOLD', 0.7))
+    DUPLICATE_INDEX_SYNC_INTERVAL = int(os.environ.get('DUPLICATE_INDEX_SYNC_INTERVAL', 5))
+    # Build the index from the database at app start instead of on the first lookup
+    DUPLICATE_INDEX_PRELOAD = os.environ.get('DUPLICATE_INDEX_PRELOAD', 'true').lower() == 'true'
+
+    # AI call instrumentation: optional JSON-lines log of every call, rotated by size
+    AI_METRICS_LOG_FILE = os.environ.get('AI_METRICS_LOG_FILE')
+    AI_METRICS_LOG_MAX_BYTES = int(os.environ.get('AI_METRICS_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    AI_METRICS_LOG_BACKUP_COUNT = int(os.environ.get('AI_METRICS_LOG_BACKUP_COUNT', 5))
+
+    # Admin bulk generation (topic x difficulty x count matrix)
+    BULK_GENERATION_CONCURRENCY = int(os.environ.get('BULK_GENERATION_CONCURRENCY', 4))
+    BULK_GENERATION_MAX_CONCURRENCY = int(os.environ.get('BULK_GENERATION_MAX_CONCURRENCY', 16))
+    BULK_GENERATION_RATE_PER_MINUTE = int(os.environ.get('BULK_GENERATION_RATE_PER_MINUTE', 60))
+    BULK_GENERATION_COMMIT_SIZE = int(os.environ.get('BULK_GENERATION_COMMIT_SIZE', 20))
+    BULK_GENERATION_MAX_ITEMS = int(os.environ.get('BULK_GENERATION_MAX_ITEMS', 2000))
+
+    # Keyset pagination of GET /api/quiz (?limit= / ?cursor=)
+    QUIZ_LIST_DEFAULT_LIMIT = int(os.environ.get('QUIZ_LIST_DEFAULT_LIMIT', 20))
+    QUIZ_LIST_MAX_LIMIT = int(os.environ.get('QUIZ_LIST_MAX_LIMIT', 100))
+
+    # Encoded GET /api/quiz/<id> payloads, validated against the quiz version
+    # on every read (writes from other workers invalidate them too); TTL in seconds
+    QUIZ_DETAIL_CACHE_ENABLED = os.environ.get('QUIZ_DETAIL_CACHE_ENABLED', 'true').lower() == 'true'
+    QUIZ_DETAIL_CACHE_MAX_ENTRIES = int(os.environ.get('QUIZ_DETAIL_CACHE_MAX_ENTRIES', 1024))
+    QUIZ_DETAIL_CACHE_TTL = int(os.environ.get('QUIZ_DETAIL_CACHE_TTL', 300))
+
+    # NDJSON quiz export/import: quizzes per query/transaction
+    QUIZ_TRANSFER_BATCH_SIZE = int(os.environ.get('QUIZ_TRANSFER_BATCH_SIZE', 500))
+    QUIZ_IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('QUIZ_IMPORT_MAX_REPORTED_ERRORS', 100))
+
+    # Full-text search (GET /api/quiz/search); MAX_HITS bounds the documents ranked per query
+    SEARCH_DEFAULT_LIMIT = int(os.environ.get('SEARCH_DEFAULT_LIMIT', 20))
+    SEARCH_MAX_LIMIT = int(os.environ.get('SEARCH_MAX_LIMIT', 100))
+    SEARCH_MAX_HITS = int(os.environ.get('SEARCH_MAX_HITS', 500))
+
+    # Quick play (POST /api/quiz/quick-play): random questions drawn from the catalogue
+    QUICK_PLAY_MAX_QUESTIONS = int(os.environ.get('QUICK_PLAY_MAX_QUESTIONS', 50))
+    QUICK_PLAY_SYNC_INTERVAL = int(os.environ.get('QUICK_PLAY_SYNC_INTERVAL', 5))
+    # `flask prune-quick-play` deletes unplayed quick play games older than this (hours)
+    QUICK_PLAY_UNPLAYED_TTL_HOURS = int(os.environ.get('QUICK_PLAY_UNPLAYED_TTL_HOURS', 24))
+
+    # Answer keys of POST /api/result scoring, validated against their quiz's
+    # version on every read (edits from other workers are seen); TTL in seconds
+    ANSWER_KEY_CACHE_ENABLED = os.environ.get('ANSWER_KEY_CACHE_ENABLED', 'true').lower() == 'true'
+    ANSWER_KEY_CACHE_MAX_ENTRIES = int(os.environ.get('ANSWER_KEY_CACHE_MAX_ENTRIES', 4096))
+    ANSWER_KEY_CACHE_TTL = int(os.environ.get('ANSWER_KEY_CACHE_TTL', 300))
+
+    # Batch result submission (POST /api/result/batch)
+    RESULT_BATCH_MAX_ITEMS = int(os.environ.get('RESULT_BATCH_MAX_ITEMS', 500))
+
+    # Result histories (GET /api/result/): page sizes with ?limit= / ?cursor=,
+    # rows fetched per round trip when the full list is streamed
+    RESULT_LIST_DEFAULT_LIMIT = int(os.environ.get('RESULT_LIST_DEFAULT_LIMIT', 50))
+    RESULT_LIST_MAX_LIMIT = int(os.environ.get('RESULT_LIST_MAX_LIMIT', 500))
+    RESULT_STREAM_BATCH_SIZE = int(os.environ.get('RESULT_STREAM_BATCH_SIZE', 1000))
+
+    # Admin results export (CSV, or Parquet/Arrow with pyarrow): rows fetched per round trip
+    RESULT_EXPORT_BATCH_SIZE = int(os.environ.get('RESULT_EXPORT_BATCH_SIZE', 5000))
+
+    # Per-question analytics (GET /api/admin/analytics/questions), recomputed by a background job
+    QUESTION_ANALYTICS_BATCH_SIZE = int(os.environ.get('QUESTION_ANALYTICS_BATCH_SIZE', 5000))
+    QUESTION_ANALYTICS_DEFAULT_LIMIT = int(os.environ.get('QUESTION_ANALYTICS_DEFAULT_LIMIT', 100))
+    QUESTION_ANALYTICS_MAX_LIMIT = int(os.environ.get('QUESTION_ANALYTICS_MAX_LIMIT', 1000))
+
+    # Write-behind result storage: a writer thread group-commits queued results
+    # (up to BATCH_SIZE rows; FLUSH_INTERVAL > 0 waits that long for a batch to fill)
+    RESULT_WRITE_BEHIND = os.environ.get('RESULT_WRITE_BEHIND', 'false').lower() == 'true'
+    RESULT_WRITE_BEHIND_MAX_QUEUE = int(os.environ.get('RESULT_WRITE_BEHIND_MAX_QUEUE', 10000))
+    RESULT_WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('RESULT_WRITE_BEHIND_BATCH_SIZE', 500))
+    RESULT_WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get('RESULT_WRITE_BEHIND_FLUSH_INTERVAL', 0))
+    RESULT_WRITE_BEHIND_TIMEOUT = int(os.environ.get('RESULT_WRITE_BEHIND_TIMEOUT', 30))
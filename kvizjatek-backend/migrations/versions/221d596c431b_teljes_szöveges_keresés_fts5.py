@@ -0,0 +1,92 @@
+"""Teljes szöveges keresés (FTS5)
+
+Revision ID: 221d596c431b
+Revises: 5c5ab2fe227f
+Create Date: 2026-10-18 12:51:20.723591
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '221d596c431b'
+down_revision = '5c5ab2fe227f'
+branch_labels = None
+depends_on = None
+
+# The search schema as of this revision (app.search may change later).
+# Documents are keyed by rowid = source id * 4 + kind (0 question, 1 quiz, 2 topic).
+FTS_TABLE = 'quiz_search'
+KIND_QUESTION, KIND_QUIZ, KIND_TOPIC = 0, 1, 2
+
+_QUESTION_BODY = "{row}.question_text || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each({row}.options)), '')"
+
+SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_questions_ai AFTER INSERT ON questions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id * 4 + {KIND_QUESTION}, {_QUESTION_BODY.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_questions_au AFTER UPDATE OF question_text, options ON questions BEGIN
+        UPDATE {FTS_TABLE} SET body = {_QUESTION_BODY.format(row='new')} WHERE rowid = new.id * 4 + {KIND_QUESTION};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_questions_ad AFTER DELETE ON questions BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_QUESTION};
+    END""",
+
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_quizzes_ai AFTER INSERT ON quizzes
+        WHEN coalesce(new.custom_topic, '') != '' BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id * 4 + {KIND_QUIZ}, new.custom_topic);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_quizzes_au AFTER UPDATE OF custom_topic ON quizzes BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_QUIZ};
+        INSERT INTO {FTS_TABLE}(rowid, body)
+            SELECT new.id * 4 + {KIND_QUIZ}, new.custom_topic WHERE coalesce(new.custom_topic, '') != '';
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_quizzes_ad AFTER DELETE ON quizzes BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_QUIZ};
+    END""",
+
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_topics_ai AFTER INSERT ON topics BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id * 4 + {KIND_TOPIC}, new.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_topics_au AFTER UPDATE OF name ON topics BEGIN
+        UPDATE {FTS_TABLE} SET body = new.name WHERE rowid = new.id * 4 + {KIND_TOPIC};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_topics_ad AFTER DELETE ON topics BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id * 4 + {KIND_TOPIC};
+    END""",
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for statement in SEARCH_DDL:
+        op.execute(statement)
+
+    # Backfill the existing catalogue; from here on the triggers keep it current
+    op.execute(f"""
+        INSERT INTO {FTS_TABLE}(rowid, body)
+        SELECT id * 4 + {KIND_QUESTION},
+               question_text || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each(options)), '')
+        FROM questions
+    """)
+    op.execute(f"""
+        INSERT INTO {FTS_TABLE}(rowid, body)
+        SELECT id * 4 + {KIND_QUIZ}, custom_topic FROM quizzes WHERE coalesce(custom_topic, '') != ''
+    """)
+    op.execute(f"INSERT INTO {FTS_TABLE}(rowid, body) SELECT id * 4 + {KIND_TOPIC}, name FROM topics")
+    op.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    # Dropping the table does not drop triggers defined on other tables
+    for table in ('questions', 'quizzes', 'topics'):
+        for suffix in ('ai', 'au', 'ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{table}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -0,0 +1,28 @@
+"""Kvízenkénti verzió a feltételes lekérésekhez
+
+Revision ID: 399264d99f53
+Revises: 3a42ee3c9e7b
+Create Date: 2026-10-18 14:18:06.855108
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '399264d99f53'
+down_revision = '3a42ee3c9e7b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nem batch módban: a quizzes tábla újraépítése eldobná a keresési triggereket
+    op.add_column('quizzes', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('quizzes', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE quizzes SET updated_at = created_at")
+
+
+def downgrade():
+    op.drop_column('quizzes', 'updated_at')
+    op.drop_column('quizzes', 'version')
@@ -0,0 +1,45 @@
+"""Gyors játék kérdések kihagyása a keresésből
+
+Revision ID: cf6f99aaee7b
+Revises: dadc1da1cb52
+Create Date: 2026-10-18 14:00:15.731078
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cf6f99aaee7b'
+down_revision = 'dadc1da1cb52'
+branch_labels = None
+depends_on = None
+
+_QUESTION_BODY = "{row}.question_text || ' ' || coalesce((SELECT group_concat(value, ' ') FROM json_each({row}.options)), '')"
+
+QUESTIONS_AI_TRIGGER = f"""CREATE TRIGGER quiz_search_questions_ai AFTER INSERT ON questions{{when}} BEGIN
+        INSERT INTO quiz_search(rowid, body) VALUES (new.id * 4, {_QUESTION_BODY.format(row='new')});
+    END"""
+
+QUICK_PLAY_WHEN = "\n        WHEN NOT coalesce((SELECT is_quick_play FROM quizzes WHERE id = new.quiz_id), 0)"
+
+QUICK_PLAY_QUESTIONS = "SELECT q.id FROM questions q JOIN quizzes z ON z.id = q.quiz_id WHERE z.is_quick_play"
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS quiz_search_questions_ai")
+    op.execute(QUESTIONS_AI_TRIGGER.format(when=QUICK_PLAY_WHEN))
+    op.execute(f"DELETE FROM quiz_search WHERE rowid IN (SELECT id * 4 FROM ({QUICK_PLAY_QUESTIONS}))")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS quiz_search_questions_ai")
+    op.execute(QUESTIONS_AI_TRIGGER.format(when=''))
+    op.execute(
+        f"INSERT INTO quiz_search(rowid, body) SELECT q.id * 4, {_QUESTION_BODY.format(row='q')} "
+        f"FROM questions q WHERE q.id IN ({QUICK_PLAY_QUESTIONS})"
+    )
@@ -0,0 +1,117 @@
+import pytest
+
+QUESTIONS = [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]
+
+def setup_auth_headers(app, user_id=1, username="testuser"):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw")
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def test_cache_key_is_normalized():
+    from app.ai_cache import make_cache_key
+
+    assert make_cache_key("Roman  History ", "Medium", 5) == make_cache_key("roman history", "MEDIUM", 5)
+    assert make_cache_key("Roman History", "Medium", 5) != make_cache_key("Roman History", "Medium", 6)
+
+def test_identical_requests_hit_the_cache(app):
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+    from app.extensions import ai_cache
+
+    with patch('app.ai_generator._request_quiz_questions', return_value=QUESTIONS) as mock_request:
+        first = generate_quiz_questions("Roman History", "Medium", 5)
+        second = generate_quiz_questions("roman   history", "medium", 5)
+
+    assert mock_request.call_count == 1
+    assert first == second == QUESTIONS
+    # Every hit hands out its own copy
+    assert second is not first
+
+    stats = ai_cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+def test_cache_can_be_bypassed_per_request(app):
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+
+    with patch('app.ai_generator._request_quiz_questions', return_value=QUESTIONS) as mock_request:
+        generate_quiz_questions("Roman History", "Medium", 5)
+        generate_quiz_questions("Roman History", "Medium", 5, use_cache=False)
+
+    assert mock_request.call_count == 2
+
+def test_errors_are_not_cached(app):
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+
+    with patch('app.ai_generator._request_quiz_questions', return_value={"error": "boom"}) as mock_request:
+        generate_quiz_questions("Roman History", "Medium", 5)
+        generate_quiz_questions("Roman History", "Medium", 5)
+
+    assert mock_request.call_count == 2
+
+def test_lru_eviction_and_ttl():
+    from unittest.mock import patch
+    from app.caching import LRUCache
+
+    cache = LRUCache(max_entries=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+    with patch('app.caching.time.monotonic', return_value=10**9):
+        assert cache.get("a") is None
+    assert cache.expirations == 1
+
+def test_persistent_tier_survives_restart(tmp_path):
+    from unittest.mock import patch
+    from app import create_app
+    from app.ai_generator import generate_quiz_questions
+
+    class PersistentConfig:
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+        AI_CACHE_SQLITE_PATH = str(tmp_path / 'ai_cache.sqlite')
+
+    with patch('app.ai_generator._request_quiz_questions', return_value=QUESTIONS) as mock_request:
+        with create_app(PersistentConfig).app_context():
+            generate_quiz_questions("Roman History", "Medium", 5)
+        with create_app(PersistentConfig).app_context():
+            assert generate_quiz_questions("Roman History", "Medium", 5) == QUESTIONS
+
+    assert mock_request.call_count == 1
+
+def test_stored_generation_is_not_replayed_as_duplicates(client, app):
+    from unittest.mock import patch
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'flag'
+    headers = setup_auth_headers(app)
+    batches = [
+        [{"question_text": "Which river flows through Budapest?", "options": ["Danube", "Tisza"], "correct_option_index": 0}],
+        [{"question_text": "Which lake is the largest in Central Europe?", "options": ["Balaton", "Neusiedl"], "correct_option_index": 0}],
+    ]
+    payload = {"custom_topic": "Hungarian geography", "difficulty": "Easy", "ai_generate": True, "num_questions": 1}
+
+    with patch('app.ai_generator._request_quiz_questions', side_effect=lambda *a, **kw: batches.pop(0)) as mock_request, \
+            patch('app.ai_generator.generate_replacement_questions') as mock_replace:
+        first = client.post('/api/quiz/', json=payload, headers=headers)
+        second = client.post('/api/quiz/', json=payload, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    # The second request is generated afresh instead of replaying the stored questions
+    assert mock_request.call_count == 2
+    mock_replace.assert_not_called()
@@ -0,0 +1,112 @@
+import pytest
+
+def test_client_is_reused_and_honors_base_url(app):
+    from app.extensions import ai_client
+
+    app.config['OPENAI_API_KEY'] = 'sk-test'
+    app.config['OPENAI_BASE_URL'] = 'http://localhost:9999/v1'
+
+    client = ai_client.get_client()
+
+    assert ai_client.get_client() is client
+    assert str(client.base_url).startswith('http://localhost:9999/v1')
+
+def test_missing_api_key_is_a_configuration_error(app):
+    from app.ai_generator import generate_quiz_questions
+
+    app.config['OPENAI_API_KEY'] = None
+
+    response = generate_quiz_questions("History", "Easy", 1, use_cache=False)
+    assert response['error'] == "Configuration Error"
+
+def test_breaker_opens_after_threshold_and_recovers():
+    from unittest.mock import patch
+    from app.ai_client import CircuitBreaker, CircuitOpenError
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # After the reset timeout a single trial call is let through
+    with patch('app.ai_client.time.monotonic', return_value=breaker.opened_at + 31):
+        assert breaker.state == 'half_open'
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+
+    assert breaker.state == 'closed'
+
+def test_generator_fails_fast_while_circuit_is_open(app):
+    from unittest.mock import patch, MagicMock
+    from app.ai_generator import generate_quiz_questions
+
+    app.config['OPENAI_API_KEY'] = 'sk-test'
+    fake_client = MagicMock()
+    fake_client.chat.completions.create.side_effect = TimeoutError("upstream down")
+
+    with patch('app.ai_client.UPSTREAM_ERRORS', (TimeoutError,)), \
+         patch('app.extensions.ai_client.get_client', return_value=fake_client):
+        for _ in range(app.config['AI_CIRCUIT_FAILURE_THRESHOLD']):
+            assert generate_quiz_questions("History", "Easy", 1, use_cache=False)['error'] == "AI API request failed"
+
+        response = generate_quiz_questions("History", "Easy", 1, use_cache=False)
+
+    assert response['error'] == "AI service temporarily unavailable"
+    assert response['retry_after'] > 0
+    assert fake_client.chat.completions.create.call_count == app.config['AI_CIRCUIT_FAILURE_THRESHOLD']
+
+def stream_chunks(document, fail_after=None):
+    """Fake chat completion stream of `document` in 7 character chunks, raising TimeoutError after `fail_after` chunks."""
+    from types import SimpleNamespace
+
+    for n, i in enumerate(range(0, len(document), 7)):
+        if n == fail_after:
+            raise TimeoutError("connection reset mid-stream")
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=document[i:i + 7]))])
+
+def test_stream_failures_while_reading_open_the_circuit(app):
+    from unittest.mock import patch, MagicMock
+    from app.ai_generator import stream_quiz_questions
+
+    app.config['OPENAI_API_KEY'] = 'sk-test'
+    document = '{"questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]}'
+    fake_client = MagicMock()
+    fake_client.chat.completions.create.side_effect = lambda **kwargs: stream_chunks(document, fail_after=2)
+
+    with patch('app.ai_client.UPSTREAM_ERRORS', (TimeoutError,)), \
+         patch('app.extensions.ai_client.get_client', return_value=fake_client):
+        for _ in range(app.config['AI_CIRCUIT_FAILURE_THRESHOLD']):
+            assert list(stream_quiz_questions("History", "Easy", 1, use_cache=False))[-1]['error'] == "AI API request failed"
+
+        items = list(stream_quiz_questions("History", "Easy", 1, use_cache=False))
+
+    assert items[-1]['error'] == "AI service temporarily unavailable"
+    assert fake_client.chat.completions.create.call_count == app.config['AI_CIRCUIT_FAILURE_THRESHOLD']
+
+def test_abandoned_stream_frees_the_half_open_trial(app):
+    from unittest.mock import patch, MagicMock
+    from app.ai_generator import stream_quiz_questions
+    from app.extensions import ai_client
+
+    app.config['OPENAI_API_KEY'] = 'sk-test'
+    document = '{"questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}, ' \
+               '{"question_text": "Q2", "options": ["A", "B"], "correct_option_index": 1}]}'
+    fake_client = MagicMock()
+    fake_client.chat.completions.create.side_effect = lambda **kwargs: stream_chunks(document)
+
+    breaker = ai_client.breaker
+    breaker.opened_at = 0.0 # long enough ago: half-open
+    with patch('app.extensions.ai_client.get_client', return_value=fake_client):
+        stream = stream_quiz_questions("History", "Easy", 2, use_cache=False)
+        assert next(stream)['question_text'] == "Q1"
+        # The client disconnected before the trial call ended
+        stream.close()
+
+    assert breaker.trial_in_flight is False
+    breaker.before_call()
@@ -0,0 +1,73 @@
+import pytest
+
+def make_questions(texts):
+    return [{"question_text": text, "options": ["A", "B", "C", "D"], "correct_option_index": 0} for text in texts]
+
+def test_large_request_is_split_into_concurrent_chunks(app):
+    import threading
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+
+    sizes = []
+    lock = threading.Lock()
+
+    def fake_request(topic, difficulty, num_questions, exclude=None):
+        with lock:
+            start = len(sizes) * 100
+            sizes.append(num_questions)
+        return make_questions([f"Distinct question number {start + i}" for i in range(num_questions)])
+
+    with patch('app.ai_generator._request_quiz_questions', side_effect=fake_request):
+        questions = generate_quiz_questions("History", "Easy", 12, use_cache=False)
+
+    assert sorted(sizes) == [4, 4, 4]
+    assert len(questions) == 12
+
+def test_small_request_is_a_single_call(app):
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+
+    with patch('app.ai_generator._request_quiz_questions', return_value=make_questions(["Q1"])) as mock_request:
+        generate_quiz_questions("History", "Easy", 5, use_cache=False)
+
+    mock_request.assert_called_once()
+
+def test_fan_out_drops_near_duplicates_and_tops_up(app):
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+
+    app.config['AI_FANOUT_CHUNK_SIZE'] = 2
+    responses = iter([
+        make_questions(["Who founded Rome?", "When did Rome fall?"]),
+        make_questions(["Who  founded Rome ?", "Who was the first emperor of Rome?"]),
+    ])
+    calls = []
+
+    def fake_request(topic, difficulty, num_questions, exclude=None):
+        calls.append(exclude)
+        if exclude:
+            return make_questions(["Which river flows through Rome?"])
+        return next(responses)
+
+    with patch('app.ai_generator._request_quiz_questions', side_effect=fake_request), \
+         patch('app.ai_generator.ThreadPoolExecutor') as mock_executor:
+        # Run the chunks inline to keep the response order deterministic
+        mock_executor.return_value.__enter__.return_value.map = map
+        questions = generate_quiz_questions("Rome", "Easy", 4, use_cache=False)
+
+    texts = [q['question_text'] for q in questions]
+    assert texts == [
+        "Who founded Rome?", "When did Rome fall?",
+        "Who was the first emperor of Rome?", "Which river flows through Rome?"
+    ]
+    # The top-up call is told which questions already exist
+    assert "Who founded Rome?" in calls[-1]
+
+def test_fan_out_returns_error_if_every_chunk_fails(app):
+    from unittest.mock import patch
+    from app.ai_generator import generate_quiz_questions
+
+    with patch('app.ai_generator._request_quiz_questions', return_value={"error": "AI API request failed"}):
+        response = generate_quiz_questions("History", "Easy", 15, use_cache=False)
+
+    assert response == {"error": "AI API request failed"}
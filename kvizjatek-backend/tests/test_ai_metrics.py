@@ -0,0 +1,106 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def fake_completion(content, prompt_tokens=120, completion_tokens=480):
+    from types import SimpleNamespace
+
+    return SimpleNamespace(
+        model="gpt-5-nano-2025-08-07",
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+def test_histogram_quantiles():
+    from app.ai_metrics import Histogram
+
+    histogram = Histogram(bounds=(1, 2, 5))
+    for value in (0.5, 1.5, 1.5, 4, 9):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(0.99) == 9
+
+def test_outcomes_tokens_and_model_are_recorded(app):
+    from unittest.mock import patch, MagicMock
+    from app.ai_generator import generate_quiz_questions
+    from app.extensions import ai_metrics
+
+    app.config['OPENAI_API_KEY'] = 'sk-test'
+    fake_client = MagicMock()
+    fake_client.chat.completions.create.side_effect = [
+        fake_completion('{"questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]}'),
+        fake_completion('{"questions": [{"question_text": '),
+        fake_completion('{"items": []}'),
+        TimeoutError("read timed out"),
+    ]
+
+    with patch('app.extensions.ai_client.get_client', return_value=fake_client):
+        for _ in range(4):
+            generate_quiz_questions("History", "Easy", 1, use_cache=False)
+
+    metrics = ai_metrics.snapshot()
+    assert metrics['calls'] == 4
+    assert metrics['outcomes'] == {"ok": 1, "bad_json": 1, "schema_error": 1, "timeout": 1}
+    assert metrics['duration_seconds']['count'] == 4
+    # The timed out call never got a response
+    assert metrics['ttfb_seconds']['count'] == 3
+
+    model = metrics['models']['gpt-5-nano-2025-08-07']
+    assert model['prompt_tokens'] == 360
+    assert model['completion_tokens'] == 1440
+
+def test_calls_are_logged_to_file(tmp_path):
+    import json
+    from app import create_app
+    from app.ai_generator import generate_quiz_questions
+    from config import Config
+
+    log_file = tmp_path / "ai_calls.log"
+
+    class LoggingConfig(Config):
+        AI_PROVIDER = 'offline'
+        AI_CACHE_ENABLED = False
+        AI_METRICS_LOG_FILE = str(log_file)
+
+    app = create_app(LoggingConfig)
+    with app.app_context():
+        generate_quiz_questions("History", "Easy", 2)
+    app.extensions['ai_metrics']['log_handler'].close()
+
+    entry = json.loads(log_file.read_text().splitlines()[0])
+    assert entry['outcome'] == 'ok'
+    assert entry['model'] == 'offline'
+    assert entry['num_questions'] == 2
+    assert entry['completion_tokens'] > 0
+
+def test_admin_metrics_endpoint(client, app):
+    from app.extensions import ai_metrics
+    from app.ai_metrics import AICall
+
+    ai_metrics.record(AICall('complete', 'openai', 5), 'rate_limit')
+
+    admin_headers = setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+    user_headers = setup_auth_headers(app, user_id=2, username="user")
+
+    assert client.get('/api/admin/ai/metrics', headers=user_headers).status_code == 403
+
+    response = client.get('/api/admin/ai/metrics', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['outcomes'] == {"rate_limit": 1}
+
+    client.delete('/api/admin/ai/metrics', headers=admin_headers)
+    assert client.get('/api/admin/ai/metrics', headers=admin_headers).get_json()['calls'] == 0
@@ -0,0 +1,61 @@
+import pytest
+
+def use_offline_provider(app, **config):
+    app.config['AI_PROVIDER'] = 'offline'
+    app.config['AI_CACHE_ENABLED'] = False
+    app.config.update(config)
+
+def test_parse_latency_specs():
+    import random
+    from app.ai_providers import parse_latency
+
+    rng = random.Random(1)
+    assert parse_latency("fixed:0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("normal:0,0")(rng) == 0.0
+
+    with pytest.raises(ValueError):
+        parse_latency("poisson:1")
+
+def test_offline_provider_is_deterministic(app):
+    from app import create_app
+    from app.ai_generator import generate_quiz_questions
+
+    use_offline_provider(app, AI_OFFLINE_SEED='42')
+    first = generate_quiz_questions("History", "Easy", 3)
+    assert len(first) == 3
+
+    # A fresh app with the same seed replays the same questions
+    other = create_app()
+    use_offline_provider(other, AI_OFFLINE_SEED='42')
+    with other.app_context():
+        assert generate_quiz_questions("History", "Easy", 3) == first
+
+def test_offline_provider_simulates_failures(app):
+    from app.ai_generator import generate_quiz_questions
+
+    use_offline_provider(app, AI_OFFLINE_MALFORMED_RATE=1.0)
+    assert generate_quiz_questions("History", "Easy", 2)['error'] == "AI returned invalid JSON or unexpected schema"
+
+    app.extensions.pop('ai_provider')
+    use_offline_provider(app, AI_OFFLINE_MALFORMED_RATE=0, AI_OFFLINE_ERROR_RATE=1.0)
+    for _ in range(app.config['AI_CIRCUIT_FAILURE_THRESHOLD']):
+        assert generate_quiz_questions("History", "Easy", 2)['error'] == "AI API request failed"
+
+    # Simulated upstream failures trip the circuit breaker like real ones
+    assert generate_quiz_questions("History", "Easy", 2)['error'] == "AI service temporarily unavailable"
+
+def test_offline_provider_streams(app):
+    from app.ai_generator import stream_quiz_questions
+
+    use_offline_provider(app, AI_OFFLINE_STREAM_CHUNK_SIZE=5)
+    questions = list(stream_quiz_questions("History", "Easy", 3))
+
+    assert len(questions) == 3
+    assert all('error' not in q for q in questions)
+
+def test_unknown_provider_is_a_configuration_error(app):
+    from app.ai_generator import generate_quiz_questions
+
+    app.config['AI_PROVIDER'] = 'nope'
+    assert generate_quiz_questions("History", "Easy", 1, use_cache=False)['error'] == "Configuration Error"
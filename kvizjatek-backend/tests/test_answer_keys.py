@@ -0,0 +1,106 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def create_quiz(client, headers):
+    quiz_id = client.post('/api/quiz/', json={
+        "custom_topic": "History",
+        "difficulty": "Easy",
+        "questions": [
+            {"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0},
+            {"question_text": "Q2", "options": ["C", "D"], "correct_option_index": 1}
+        ]
+    }, headers=headers).get_json()['quiz_id']
+    question_ids = [q['id'] for q in client.get(f'/api/quiz/{quiz_id}').get_json()['questions']]
+    return quiz_id, question_ids
+
+def submit(client, headers, quiz_id, answers):
+    response = client.post('/api/result/', json={"quiz_id": quiz_id, "answers": answers}, headers=headers)
+    if response.status_code != 201:
+        return response.status_code
+    return client.get(f"/api/result/{response.get_json()['result_id']}", headers=headers).get_json()['score']
+
+def test_answer_key_is_cached_and_scores_without_loading_questions(client, app):
+    from unittest.mock import patch
+    from app.extensions import answer_keys
+
+    headers = setup_auth_headers(app)
+    quiz_id, (q1, q2) = create_quiz(client, headers)
+    answers = [{"question_id": q1, "selected_answer": "A"}, {"question_id": q2, "selected_answer": "C"}]
+
+    assert submit(client, headers, quiz_id, answers) == 1
+    with patch.object(answer_keys, '_build') as build:
+        assert submit(client, headers, quiz_id, answers) == 1
+    build.assert_not_called()
+    assert answer_keys.stats()['entries'] == 1
+
+    # Answers naming questions of another quiz score nothing
+    assert submit(client, headers, quiz_id, [{"question_id": 999, "selected_answer": "A"}, answers[1]]) == 0
+
+def test_answer_key_follows_quiz_updates_and_delete(client, app):
+    headers = setup_auth_headers(app)
+    quiz_id, (q1, q2) = create_quiz(client, headers)
+    answers = [{"question_id": q1, "selected_answer": "B"}, {"question_id": q2, "selected_answer": "D"}]
+    assert submit(client, headers, quiz_id, answers) == 1
+
+    client.patch(f'/api/quiz/{quiz_id}', json={"update": [{"question_id": q1, "correct_option_index": 1}]}, headers=headers)
+    assert submit(client, headers, quiz_id, answers) == 2
+
+    client.delete(f'/api/quiz/{quiz_id}', headers=headers)
+    assert submit(client, headers, quiz_id, answers) == 404
+
+def test_answer_key_sees_foreign_writes(client, app):
+    from app.extensions import db
+    from app.models import Question
+
+    headers = setup_auth_headers(app)
+    quiz_id, (q1, q2) = create_quiz(client, headers)
+    answers = [{"question_id": q1, "selected_answer": "B"}, {"question_id": q2, "selected_answer": "D"}]
+    assert submit(client, headers, quiz_id, answers) == 1
+
+    # A write that bypasses this process's invalidation (e.g. another worker)
+    Question.query.filter_by(id=q1).update({"correct_option_index": 1})
+    db.session.commit()
+
+    assert submit(client, headers, quiz_id, answers) == 2
+
+def test_answer_key_survives_writes_to_other_quizzes(client, app):
+    from unittest.mock import patch
+    from app.extensions import answer_keys
+
+    headers = setup_auth_headers(app)
+    quiz_id, (q1, q2) = create_quiz(client, headers)
+    answers = [{"question_id": q1, "selected_answer": "A"}, {"question_id": q2, "selected_answer": "D"}]
+    assert submit(client, headers, quiz_id, answers) == 2
+
+    other_id, (other_q, _) = create_quiz(client, headers)
+    client.patch(f'/api/quiz/{other_id}', json={"update": [{"question_id": other_q, "correct_option_index": 1}]}, headers=headers)
+
+    with patch.object(answer_keys, '_build') as build, patch.object(answer_keys, '_build_many') as build_many:
+        assert submit(client, headers, quiz_id, answers) == 2
+        batch = client.post('/api/result/batch', json={"results": [{"quiz_id": quiz_id, "answers": answers}]}, headers=headers)
+    assert batch.get_json()['items'][0]['score'] == 2
+    build.assert_not_called()
+    build_many.assert_not_called()
+
+def test_answer_key_lookup_errors_are_reported_as_json(client, app):
+    from unittest.mock import patch
+    from app.extensions import answer_keys
+
+    headers = setup_auth_headers(app)
+    with patch.object(answer_keys, 'get', side_effect=RuntimeError("database is locked")):
+        response = client.post('/api/result/', json={"quiz_id": 1, "answers": []}, headers=headers)
+    assert response.status_code == 500
+    assert response.get_json()['details'] == "database is locked"
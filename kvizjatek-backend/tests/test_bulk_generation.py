@@ -0,0 +1,240 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def create_topics(app, *names):
+    from app.models import Topic
+    from app.extensions import db
+
+    topics = [Topic(name=name) for name in names]
+    db.session.add_all(topics)
+    db.session.commit()
+    return [topic.id for topic in topics]
+
+def fake_generate(fail_topics=()):
+    def generate(topic, difficulty, num_questions, use_cache=True):
+        if topic in fail_topics:
+            return {"error": "AI API request failed", "details": "upstream down"}
+        return [
+            {"question_text": f"{topic} {difficulty} question {i}?", "options": [f"{topic} {i}", "Other"], "correct_option_index": 0}
+            for i in range(num_questions)
+        ]
+    return generate
+
+def test_rate_limiter_spaces_starts():
+    import time
+    from app.bulk_generation import RateLimiter
+
+    limiter = RateLimiter(rate_per_minute=600) # one start every 0.1 s
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.2
+
+def test_bulk_generation_run_and_resume(client, app):
+    from unittest.mock import patch
+    from app.extensions import jobs
+    from app.models import Quiz
+
+    app.config['BULK_GENERATION_COMMIT_SIZE'] = 2
+    headers = setup_auth_headers(app, is_admin=True)
+    history_id, science_id = create_topics(app, "History", "Science")
+
+    with patch('app.ai_generator.generate_quiz_questions', side_effect=fake_generate(fail_topics={"Science"})):
+        response = client.post('/api/admin/bulk-generation', json={
+            "difficulties": ["Easy", "Hard"],
+            "counts": [3],
+            "concurrency": 2,
+            "rate_per_minute": 0
+        }, headers=headers)
+        assert response.status_code == 202
+        run_id = response.get_json()['run_id']
+        jobs.wait(f"bulk:{run_id}")
+
+    report = client.get(f'/api/admin/bulk-generation/{run_id}', headers=headers).get_json()
+    assert report['status'] == 'partial'
+    assert (report['total'], report['succeeded'], report['failed']) == (4, 2, 2)
+    assert {item['topic_id'] for item in report['failed_items']} == {science_id}
+    assert Quiz.query.filter_by(topic_id=history_id).count() == 2
+
+    # Resuming only regenerates the failed cells
+    with patch('app.ai_generator.generate_quiz_questions', side_effect=fake_generate()) as mock_generate:
+        response = client.post(f'/api/admin/bulk-generation/{run_id}/resume', headers=headers)
+        assert response.get_json()['retried'] == 2
+        jobs.wait(f"bulk:{run_id}")
+
+    assert mock_generate.call_count == 2
+    report = client.get(f'/api/admin/bulk-generation/{run_id}', headers=headers).get_json()
+    assert report['status'] == 'succeeded'
+    assert Quiz.query.count() == 4
+
+def test_unexpected_errors_end_the_run(client, app):
+    from unittest.mock import patch
+    from app.bulk_generation import create_run, run_bulk_generation
+    from app.extensions import db
+    from app.models import BulkGenerationItem
+
+    setup_auth_headers(app, is_admin=True)
+    topic_ids = create_topics(app, "History", "Science")
+    run = create_run(1, topic_ids, ["Easy"], [2], 1, 0)
+    db.session.commit()
+
+    from app.quiz_service import build_quiz
+    history_id = topic_ids[0]
+
+    def build(topic_id, *args):
+        if topic_id == history_id:
+            raise TypeError("'<=' not supported between instances of 'int' and 'str'")
+        return build_quiz(topic_id, *args)
+
+    with patch('app.ai_generator.generate_quiz_questions', side_effect=fake_generate()), \
+            patch('app.quiz_service.build_quiz', side_effect=build):
+        run_bulk_generation(run.id)
+    assert run.status == 'partial'
+    failed = BulkGenerationItem.query.filter_by(run_id=run.id, status='failed').one()
+    assert failed.topic_id == history_id and failed.error.startswith("Could not build the quiz")
+
+    # An error outside a single item still leaves a terminal status, the items stay resumable
+    run = create_run(1, topic_ids, ["Hard"], [2], 1, 0)
+    db.session.commit()
+    with patch('app.ai_generator.generate_quiz_questions', side_effect=fake_generate()), \
+            patch('app.bulk_generation._write_batch', side_effect=RuntimeError("database gone")):
+        with pytest.raises(RuntimeError):
+            run_bulk_generation(run.id)
+    assert (run.status, run.finished_at is not None) == ('failed', True)
+    assert BulkGenerationItem.query.filter_by(run_id=run.id, status='pending').count() == 2
+
+def test_bulk_generation_validation_and_permissions(client, app):
+    admin_headers = setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+    user_headers = setup_auth_headers(app, user_id=2, username="user")
+    create_topics(app, "History")
+
+    payload = {"topic_ids": [999], "difficulties": ["Easy"], "counts": [5]}
+    assert client.post('/api/admin/bulk-generation', json=payload, headers=user_headers).status_code == 403
+
+    response = client.post('/api/admin/bulk-generation', json=payload, headers=admin_headers)
+    assert response.status_code == 400
+    assert "999" in response.get_json()['error']
+
+    payload = {"difficulties": ["Easy"], "counts": [50]}
+    assert client.post('/api/admin/bulk-generation', json=payload, headers=admin_headers).status_code == 400
+
+    for payload in (
+        {"topic_ids": {"1": 1}, "difficulties": ["Easy"], "counts": [5]},
+        {"topic_ids": [[1]], "difficulties": ["Easy"], "counts": [5]},
+        {"difficulties": "Easy", "counts": [5]},
+        {"difficulties": ["Easy"], "counts": "5"},
+        {"difficulties": ["Easy"], "counts": [True]},
+    ):
+        assert client.post('/api/admin/bulk-generation', json=payload, headers=admin_headers).status_code == 400
+
+def test_resume_refuses_a_running_run(client, app):
+    from unittest.mock import patch
+    from app.bulk_generation import create_run
+    from app.extensions import db
+
+    headers = setup_auth_headers(app, is_admin=True)
+    run = create_run(1, create_topics(app, "History"), ["Easy"], [2], 1, 0)
+    # Started by another worker process
+    run.status = 'running'
+    db.session.commit()
+
+    with patch('app.api.admin.jobs.submit') as mock_submit:
+        response = client.post(f'/api/admin/bulk-generation/{run.id}/resume', headers=headers)
+    assert response.status_code == 409
+    mock_submit.assert_not_called()
+
+def test_jobs_orphaned_by_a_restart_are_failed_at_startup(client, app):
+    from unittest.mock import patch
+    from app.bulk_generation import create_run
+    from app.extensions import db, jobs
+    from app.jobs import RESTART_ERROR, new_job_id
+    from app.models import GenerationJob
+
+    headers = setup_auth_headers(app, is_admin=True)
+    run = create_run(1, create_topics(app, "History"), ["Easy"], [2], 1, 0)
+    run.status = 'running'
+    queued = GenerationJob(id=new_job_id(), user_id=1, custom_topic="Space", difficulty="Easy", num_questions=3)
+    done = GenerationJob(id=new_job_id(), user_id=1, custom_topic="Space", difficulty="Easy", num_questions=3,
+                         status='succeeded')
+    db.session.add_all([queued, done])
+    db.session.commit()
+
+    jobs.recover(app)
+    db.session.expire_all()
+
+    assert (queued.status, queued.error) == ('failed', RESTART_ERROR)
+    assert queued.finished_at is not None
+    assert done.status == 'succeeded'
+    assert run.status == 'failed'
+    # The interrupted run can be resumed
+    with patch('app.api.admin.jobs.submit'):
+        response = client.post(f'/api/admin/bulk-generation/{run.id}/resume', headers=headers)
+    assert response.status_code == 202
+
+def test_recover_jobs_cli(app):
+    from app.extensions import db
+    from app.jobs import new_job_id
+    from app.models import GenerationJob
+
+    setup_auth_headers(app, is_admin=True)
+    job = GenerationJob(id=new_job_id(), user_id=1, custom_topic="Space", difficulty="Easy", num_questions=3,
+                        status='running')
+    db.session.add(job)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['recover-jobs'])
+
+    assert result.exit_code == 0, result.output
+    assert "1 generation jobs and 0 bulk runs marked failed" in result.output
+    db.session.expire_all()
+    assert job.status == 'failed'
+
+def test_aborted_run_cancels_queued_generations(client, app):
+    import time
+    from unittest.mock import patch
+    from app.bulk_generation import create_run, run_bulk_generation
+    from app.extensions import db
+
+    setup_auth_headers(app, is_admin=True)
+    app.config['BULK_GENERATION_COMMIT_SIZE'] = 1
+    run = create_run(1, create_topics(app, "History", "Science"), ["Easy", "Medium", "Hard"], [2], 1, 0)
+    db.session.commit()
+
+    def slow_generate(*args, **kwargs):
+        time.sleep(0.05)
+        return fake_generate()(*args, **kwargs)
+
+    with patch('app.ai_generator.generate_quiz_questions', side_effect=slow_generate) as mock_generate, \
+            patch('app.bulk_generation._write_batch', side_effect=RuntimeError("database gone")):
+        with pytest.raises(RuntimeError):
+            run_bulk_generation(run.id)
+    # The first result failed to be written; at most the generation already running finished
+    assert mock_generate.call_count <= 2
+
+def test_bulk_generate_cli(app):
+    from unittest.mock import patch
+    from app.models import Quiz
+
+    setup_auth_headers(app, is_admin=True)
+    create_topics(app, "History")
+
+    runner = app.test_cli_runner()
+    with patch('app.ai_generator.generate_quiz_questions', side_effect=fake_generate()):
+        result = runner.invoke(args=['bulk-generate', '--difficulties', 'Easy,Medium', '--counts', '2', '--rate', '0'])
+
+    assert result.exit_code == 0, result.output
+    assert "2 succeeded, 0 failed of 2" in result.output
+    assert Quiz.query.count() == 2
@@ -0,0 +1,124 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def make_question(text, options=("Romulus", "Remus", "Caesar", "Nero")):
+    return {"question_text": text, "options": list(options), "correct_option_index": 0}
+
+def create_quiz(client, headers, questions, topic="Rome"):
+    return client.post('/api/quiz/', json={
+        "custom_topic": topic,
+        "difficulty": "Easy",
+        "questions": questions
+    }, headers=headers)
+
+def test_signature_similarity_tracks_text_overlap():
+    from app.dedupe import MinHasher, question_shingles, estimate_similarity
+
+    hasher = MinHasher(num_perm=128)
+    base = hasher.signature(question_shingles("Who founded the city of Rome?", ["Romulus", "Remus"]))
+    reworded = hasher.signature(question_shingles("Who founded the city of Rome ?", ["romulus", "Remus "]))
+    other = hasher.signature(question_shingles("What is the capital of Hungary?", ["Budapest", "Vienna"]))
+
+    assert estimate_similarity(base, reworded) == 1.0
+    assert estimate_similarity(base, other) < 0.2
+
+def test_manual_duplicate_is_flagged(client, app):
+    headers = setup_auth_headers(app)
+    assert create_quiz(client, headers, [make_question("Who founded the city of Rome?")]).status_code == 201
+
+    response = create_quiz(client, headers, [
+        make_question("What is the capital of Hungary?", ["Budapest", "Vienna"]),
+        make_question("Who founded the city of Rome ?"),
+    ])
+
+    assert response.status_code == 201
+    duplicates = response.get_json()['duplicates']
+    assert [d['index'] for d in duplicates] == [1]
+    assert duplicates[0]['duplicate_of_question_id'] == 1
+
+def test_index_is_built_at_app_start(client, app):
+    from app import create_app
+
+    headers = setup_auth_headers(app)
+    create_quiz(client, headers, [make_question("Who founded the city of Rome?")])
+
+    # A second worker starting on the same database has the question indexed before any lookup
+    state = create_app().extensions['question_index']
+    assert list(state['entries']) == [1] and state['watermark'] == 1
+
+def test_duplicates_are_scoped_by_topic(client, app):
+    headers = setup_auth_headers(app)
+    create_quiz(client, headers, [make_question("Who founded the city of Rome?")])
+
+    response = create_quiz(client, headers, [make_question("Who founded the city of Rome?")], topic="Legends")
+    assert 'duplicates' not in response.get_json()
+
+def test_reject_policy_refuses_duplicates(client, app):
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'reject'
+    headers = setup_auth_headers(app)
+
+    # Repeats within the same quiz count too
+    response = create_quiz(client, headers, [
+        make_question("Who founded the city of Rome?"),
+        make_question("Who founded the city of Rome?"),
+    ])
+    assert response.status_code == 409
+    assert response.get_json()['duplicates'][0]['duplicate_of_index'] == 0
+
+def test_update_ignores_own_questions_and_delete_unindexes(client, app):
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'reject'
+    headers = setup_auth_headers(app)
+    quiz_id = create_quiz(client, headers, [make_question("Who founded the city of Rome?")]).get_json()['quiz_id']
+
+    # Re-saving the same question is not a duplicate of itself
+    response = client.put(f'/api/quiz/{quiz_id}', json={
+        "questions": [make_question("Who founded the city of Rome?")]
+    }, headers=headers)
+    assert response.status_code == 200
+
+    assert create_quiz(client, headers, [make_question("Who founded the city of Rome?")]).status_code == 409
+
+    client.delete(f'/api/quiz/{quiz_id}', headers=headers)
+    assert create_quiz(client, headers, [make_question("Who founded the city of Rome?")]).status_code == 201
+
+def test_ai_duplicates_are_replaced(client, app):
+    from unittest.mock import patch
+
+    headers = setup_auth_headers(app)
+    create_quiz(client, headers, [make_question("Who founded the city of Rome?")])
+
+    generated = [
+        make_question("Who founded the city of Rome?"),
+        make_question("When did the Western Roman Empire fall?", ["476", "1453"]),
+    ]
+    replacement = [make_question("Which river flows through Rome?", ["Tiber", "Danube"])]
+
+    with patch('app.api.quiz.generate_quiz_questions', return_value=generated), \
+         patch('app.ai_generator.generate_replacement_questions', return_value=replacement) as mock_replace:
+        response = client.post('/api/quiz/', json={
+            "custom_topic": "Rome",
+            "difficulty": "Easy",
+            "ai_generate": True,
+            "num_questions": 2
+        }, headers=headers)
+
+    assert response.status_code == 201
+    assert response.get_json()['questions_count'] == 2
+    assert mock_replace.call_args[0][2] == 1
+
+    quiz = client.get(f"/api/quiz/{response.get_json()['quiz_id']}").get_json()
+    texts = [q['question_text'] for q in quiz['questions']]
+    assert texts == ["When did the Western Roman Empire fall?", "Which river flows through Rome?"]
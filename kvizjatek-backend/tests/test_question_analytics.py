@@ -0,0 +1,117 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def create_quiz(client, headers, count):
+    quiz_id = client.post('/api/quiz/', json={
+        "custom_topic": "Analytics",
+        "difficulty": "Easy",
+        "questions": [
+            {"question_text": f"Question {i}", "options": ["A", "B", "C"], "correct_option_index": i % 3}
+            for i in range(count)
+        ]
+    }, headers=headers).get_json()['quiz_id']
+    return quiz_id, [q['id'] for q in client.get(f'/api/quiz/{quiz_id}').get_json()['questions']]
+
+def test_grade_records_correctness_bits_and_options():
+    from app.answer_keys import NO_OPTION, AnswerKey
+
+    key = AnswerKey([(10 + i, ["A", "B", "C"], i % 3) for i in range(10)])
+    answers = [{"question_id": 10 + i, "selected_answer": "ABC"[i % 3] if i in (0, 8, 9) else "B"} for i in range(9)]
+    answers.append({"question_id": 19, "selected_answer": "not an option"})
+
+    score, correct_bits, selected_options = key.grade(answers)
+    assert score == 5  # questions 0, 8 and those whose answer is "B" (1, 4, 7)
+    assert correct_bits == bytes([0b10010011, 0b01])
+    assert list(selected_options) == [0, 1, 1, 1, 1, 1, 1, 1, 2, NO_OPTION]
+
+def test_question_analytics_job_and_endpoint(client, app):
+    from app.extensions import jobs
+    from app.question_analytics import JOB_KEY
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    admin = setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+    quiz_id, (q0, q1) = create_quiz(client, admin, 2)
+
+    # q0 (correct "A"): A, A, B, A -> 75%; q1 (correct "B"): C, C, C, B -> 25%
+    for selected in (("A", "C"), ("A", "C"), ("B", "C"), ("A", "B")):
+        client.post('/api/result/', json={"quiz_id": quiz_id, "answers": [
+            {"question_id": q0, "selected_answer": selected[0]},
+            {"question_id": q1, "selected_answer": selected[1]}
+        ]}, headers=admin)
+
+    empty = client.get('/api/admin/analytics/questions', headers=admin).get_json()
+    assert empty['computed_at'] is None and empty['items'] == []
+
+    response = client.post('/api/admin/analytics/questions/refresh', headers=admin)
+    assert response.status_code == 202
+    jobs.wait(JOB_KEY)
+
+    data = client.get('/api/admin/analytics/questions', query_string={"quiz_id": quiz_id}, headers=admin).get_json()
+    assert data['computed_at'] is not None
+    assert [(item['question_id'], item['attempts'], item['correct'], item['correct_rate'], item['option_counts'])
+            for item in data['items']] == [(q1, 4, 1, 0.25, [0, 1, 3]), (q0, 4, 3, 0.75, [3, 1, 0])]
+
+    assert client.get('/api/admin/analytics/questions', query_string={"min_attempts": 5}, headers=admin).get_json()['items'] == []
+    assert client.get('/api/admin/analytics/questions', query_string={"quiz_id": "x"}, headers=admin).status_code == 400
+    user = setup_auth_headers(app, user_id=2, username="player")
+    assert client.get('/api/admin/analytics/questions', headers=user).status_code == 403
+
+def test_question_analytics_skip_results_of_an_older_question_set(client, app):
+    from app.extensions import db
+    from app.models import QuestionAnalytics, Result
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    headers = setup_auth_headers(app)
+    quiz_id, (q0, q1) = create_quiz(client, headers, 2)
+    answers = [{"question_id": q0, "selected_answer": "A"}, {"question_id": q1, "selected_answer": "B"}]
+    client.post('/api/result/', json={"quiz_id": quiz_id, "answers": answers}, headers=headers)
+    # A result from before per-answer capture
+    db.session.add(Result(user_id=1, quiz_id=quiz_id, score=1, total_questions=2))
+    db.session.commit()
+
+    output = app.test_cli_runner().invoke(args=['compute-question-analytics']).output
+    assert "2 questions from 1 results (1 results without matching answer data skipped)" in output
+
+    client.patch(f'/api/quiz/{quiz_id}', json={"remove": [q1]}, headers=headers)
+    client.post('/api/result/', json={"quiz_id": quiz_id, "answers": answers[:1]}, headers=headers)
+
+    output = app.test_cli_runner().invoke(args=['compute-question-analytics']).output
+    assert "1 questions from 1 results (2 results without matching answer data skipped)" in output
+    stats = db.session.get(QuestionAnalytics, q0)
+    assert (stats.attempts, stats.correct, stats.option_counts) == (1, 1, [1, 0, 0])
+
+def test_question_analytics_skip_results_of_changed_options_or_answers(client, app):
+    from app.extensions import db
+    from app.models import QuestionAnalytics
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    headers = setup_auth_headers(app)
+    quiz_id, (q0, q1) = create_quiz(client, headers, 2)
+    answers = [{"question_id": q0, "selected_answer": "A"}, {"question_id": q1, "selected_answer": "B"}]
+    client.post('/api/result/', json={"quiz_id": quiz_id, "answers": answers}, headers=headers)
+
+    # Same question ids, but option 0 is now "B": the stored option indexes mean something else
+    client.patch(f'/api/quiz/{quiz_id}', json={"update": [
+        {"question_id": q0, "options": ["B", "A", "C"], "correct_option_index": 1}
+    ]}, headers=headers)
+    output = app.test_cli_runner().invoke(args=['compute-question-analytics']).output
+    assert "0 questions from 0 results (1 results without matching answer data skipped)" in output
+
+    client.post('/api/result/', json={"quiz_id": quiz_id, "answers": answers}, headers=headers)
+    output = app.test_cli_runner().invoke(args=['compute-question-analytics']).output
+    assert "2 questions from 1 results (1 results without matching answer data skipped)" in output
+    stats = db.session.get(QuestionAnalytics, q0)
+    assert (stats.correct, stats.option_counts) == (1, [0, 1, 0])
@@ -0,0 +1,175 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def create_topic_with_pool(app, pooled=3):
+    from app.models import Topic, PooledQuestion
+    from app.extensions import db
+
+    with app.app_context():
+        topic = Topic(name="History")
+        db.session.add(topic)
+        db.session.commit()
+        for i in range(pooled):
+            db.session.add(PooledQuestion(
+                topic_id=topic.id, difficulty="medium",
+                question_text=f"Pooled Q{i}", options=["A", "B"], correct_option_index=0
+            ))
+        db.session.commit()
+        return topic.id
+
+def test_create_quiz_served_from_pool(client, app):
+    from unittest.mock import patch
+    from app.models import PooledQuestion
+
+    app.config['QUESTION_POOL_ENABLED'] = True
+    app.config['QUESTION_POOL_LOW_WATER'] = 0
+    headers = setup_auth_headers(app)
+    topic_id = create_topic_with_pool(app, pooled=3)
+
+    payload = {"topic_id": topic_id, "difficulty": "Medium", "ai_generate": True, "num_questions": 2}
+
+    with patch('app.api.quiz.generate_quiz_questions') as mock_generate:
+        response = client.post('/api/quiz/', json=payload, headers=headers)
+        mock_generate.assert_not_called()
+
+    assert response.status_code == 201
+    assert response.get_json()['questions_count'] == 2
+
+    with app.app_context():
+        assert PooledQuestion.query.count() == 1
+
+def test_pool_miss_falls_back_to_live_call(client, app):
+    from unittest.mock import patch
+
+    app.config['QUESTION_POOL_ENABLED'] = True
+    app.config['QUESTION_POOL_LOW_WATER'] = 0
+    headers = setup_auth_headers(app)
+    topic_id = create_topic_with_pool(app, pooled=1)
+
+    payload = {"topic_id": topic_id, "difficulty": "Medium", "ai_generate": True, "num_questions": 2}
+
+    with patch('app.api.quiz.generate_quiz_questions') as mock_generate:
+        mock_generate.return_value = [
+            {"question_text": "Live Q1", "options": ["A", "B"], "correct_option_index": 0},
+            {"question_text": "Live Q2", "options": ["A", "B"], "correct_option_index": 1}
+        ]
+        response = client.post('/api/quiz/', json=payload, headers=headers)
+        mock_generate.assert_called_once()
+
+    assert response.status_code == 201
+
+def test_refill_tops_up_to_target(app):
+    from unittest.mock import patch
+    from app.extensions import question_pool
+
+    app.config['QUESTION_POOL_TARGET'] = 5
+    app.config['QUESTION_POOL_BATCH_SIZE'] = 3
+    topic_id = create_topic_with_pool(app, pooled=0)
+
+    calls = []
+
+    def fake_generate(topic, difficulty, num_questions, use_cache=True):
+        calls.append(num_questions)
+        # Distinct questions per call: the refill drops near-duplicates of pooled ones
+        return [{"question_text": f"Batch {len(calls)} question {i}", "options": [f"Yes {len(calls)}{i}", f"No {len(calls)}{i}"], "correct_option_index": 0} for i in range(num_questions)]
+
+    with app.app_context():
+        with patch('app.ai_generator.generate_quiz_questions', side_effect=fake_generate) as mock_generate:
+            added = question_pool.refill(topic_id, "Medium")
+
+        assert added == 5
+        assert mock_generate.call_count == 2
+        assert question_pool.depth(topic_id, "Medium") == 5
+        assert question_pool.metrics()['refills'] == 2
+
+def test_pool_metrics_admin_only(client, app):
+    user_headers = setup_auth_headers(app, user_id=1)
+    admin_headers = setup_auth_headers(app, user_id=2, username="admin", is_admin=True)
+
+    assert client.get('/api/admin/question-pool', headers=user_headers).status_code == 403
+
+    response = client.get('/api/admin/question-pool', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['hits'] == 0
+
+def test_unpooled_difficulty_neither_takes_nor_refills(app):
+    from unittest.mock import patch
+    from app.extensions import question_pool
+
+    app.config['QUESTION_POOL_LOW_WATER'] = 10
+    topic_id = create_topic_with_pool(app, pooled=3)
+
+    with app.app_context():
+        with patch('app.extensions.jobs.submit') as mock_submit:
+            assert question_pool.take(topic_id, "Extremely weird", 2) is None
+            assert question_pool.schedule_refill(topic_id, "Extremely weird") is None
+            mock_submit.assert_not_called()
+
+            assert question_pool.take(topic_id, " MEDIUM ", 2) is not None
+            mock_submit.assert_called_once()
+
+def test_pooled_questions_restored_when_quiz_cannot_be_saved(client, app):
+    from unittest.mock import patch
+    from app.models import PooledQuestion
+
+    app.config['QUESTION_POOL_ENABLED'] = True
+    app.config['QUESTION_POOL_LOW_WATER'] = 0
+    headers = setup_auth_headers(app)
+    topic_id = create_topic_with_pool(app, pooled=3)
+
+    payload = {"topic_id": topic_id, "difficulty": "Medium", "ai_generate": True, "num_questions": 2}
+
+    with patch('app.api.quiz.insert_quiz', side_effect=RuntimeError("disk full")):
+        response = client.post('/api/quiz/', json=payload, headers=headers)
+    assert response.status_code == 500
+
+    with patch('app.api.quiz.insert_quiz', side_effect=RuntimeError("disk full")):
+        response = client.post('/api/quiz/stream', json=payload, headers=headers)
+        assert b'event: error' in response.data
+
+    with app.app_context():
+        assert PooledQuestion.query.count() == 3
+
+def test_refill_skips_questions_the_topic_already_has(app):
+    from unittest.mock import patch
+    from app.extensions import db, question_pool
+    from app.models import PooledQuestion, Quiz, Question
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'flag'
+    app.config['QUESTION_POOL_TARGET'] = 3
+    app.config['QUESTION_POOL_BATCH_SIZE'] = 3
+    setup_auth_headers(app)
+    topic_id = create_topic_with_pool(app, pooled=0)
+
+    stored = {"question_text": "Who crowned Charlemagne emperor in the year 800?", "options": ["Pope Leo III", "Otto I"], "correct_option_index": 0}
+    fresh = [
+        {"question_text": "Which treaty ended the Thirty Years' War in 1648?", "options": ["Westphalia", "Utrecht"], "correct_option_index": 0},
+        {"question_text": "Which empire built the city of Cusco as its capital?", "options": ["Inca", "Aztec"], "correct_option_index": 0},
+    ]
+
+    with app.app_context():
+        quiz = Quiz(topic_id=topic_id, difficulty="Medium", created_by_user_id=1)
+        quiz.questions.append(Question(**stored))
+        db.session.add(quiz)
+        db.session.commit()
+
+        batches = [[stored] + fresh, []]
+        with patch('app.ai_generator.generate_quiz_questions', side_effect=lambda *a, **kw: batches.pop(0)):
+            added = question_pool.refill(topic_id, "Medium")
+
+        assert added == 2
+        texts = {row.question_text for row in PooledQuestion.query.all()}
+        assert stored['question_text'] not in texts
@@ -0,0 +1,158 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def catalogue(client, app):
+    """Topic 1 with two Easy quizzes (3 + 2 questions) and one Hard quiz (2 questions)."""
+    from app.extensions import db
+    from app.models import Topic
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    headers = setup_auth_headers(app, user_id=1, username="author")
+    db.session.add(Topic(id=1, name="History"))
+    db.session.commit()
+
+    quiz_ids = []
+    for difficulty, count in (("Easy", 3), ("easy", 2), ("Hard", 2)):
+        response = client.post('/api/quiz/', json={
+            "topic_id": 1,
+            "difficulty": difficulty,
+            "questions": [
+                {"question_text": f"{difficulty} question {i}", "options": [f"Right {i}", "Wrong"], "correct_option_index": 0}
+                for i in range(count)
+            ]
+        }, headers=headers)
+        quiz_ids.append(response.get_json()['quiz_id'])
+    return quiz_ids
+
+def test_quick_play_draws_across_quizzes_and_scores_via_results(client, app, catalogue):
+    from app.extensions import db
+    from app.models import Question, Quiz
+
+    versions = dict(db.session.execute(db.select(Quiz.id, Quiz.version)).all())
+    player = setup_auth_headers(app, user_id=2, username="player")
+    response = client.post('/api/quiz/quick-play', json={"topic_id": 1, "difficulty": "EASY", "num_questions": 5}, headers=player)
+    assert response.status_code == 201
+    game = response.get_json()
+
+    texts = sorted(q['question_text'] for q in game['questions'])
+    assert texts == sorted([f"Easy question {i}" for i in range(3)] + [f"easy question {i}" for i in range(2)])
+    assert all('correct_option_index' not in q for q in game['questions'])
+
+    # The catalogue questions themselves are handed out, nothing is copied or bumped
+    catalogue_ids = set(db.session.scalars(db.select(Question.id).where(Question.quiz_id.in_(catalogue))))
+    assert {q['id'] for q in game['questions']} <= catalogue_ids
+    assert db.session.scalar(db.select(db.func.count()).select_from(Question)) == 7
+    assert dict(db.session.execute(db.select(Quiz.id, Quiz.version)).all()) == versions
+
+    answers = [
+        {"question_id": q['id'], "selected_answer": q['options'][0] if i < 3 else "Wrong"}
+        for i, q in enumerate(game['questions'])
+    ]
+    result = client.post('/api/result/', json={"quick_play_id": game['quick_play_id'], "answers": answers}, headers=player)
+    assert result.status_code == 201
+    stored = client.get(f"/api/result/{result.get_json()['result_id']}", headers=player).get_json()
+    assert (stored['score'], stored['quiz_id'], stored['quick_play_id']) == (3, None, game['quick_play_id'])
+
+    # Another player cannot submit to the game
+    other = setup_auth_headers(app, user_id=3, username="other")
+    assert client.post('/api/result/', json={"quick_play_id": game['quick_play_id'], "answers": answers}, headers=other).status_code == 404
+
+def test_quick_play_results_count_for_the_source_questions(client, app, catalogue):
+    from app.question_analytics import compute_question_analytics
+    from app.extensions import db
+    from app.models import QuestionAnalytics
+
+    player = setup_auth_headers(app, user_id=2, username="player")
+    game = client.post('/api/quiz/quick-play', json={"topic_id": 1, "difficulty": "Hard", "num_questions": 2}, headers=player).get_json()
+    response = client.post('/api/result/batch', json={"results": [{"quick_play_id": game['quick_play_id'], "answers": [
+        {"question_id": q['id'], "selected_answer": q['options'][0]} for q in game['questions']
+    ]}]}, headers=player)
+    assert response.get_json()['saved'] == 1
+
+    report = compute_question_analytics()
+    assert (report['results'], report['skipped']) == (1, 0)
+    rows = db.session.scalars(db.select(QuestionAnalytics)).all()
+    assert {row.quiz_id for row in rows} == {catalogue[2]}
+    assert all((row.attempts, row.correct) == (1, 1) for row in rows)
+
+    stats = client.get('/api/profile/', query_string={"include": "stats"}, headers=player).get_json()['stats']
+    assert stats['attempts'] == 1
+    assert [topic['topic_id'] for topic in stats['topics']] == [1]
+
+    # A rebuild finds the game's topic as well
+    app.test_cli_runner().invoke(args=['rebuild-user-stats'])
+    assert client.get('/api/profile/', query_string={"include": "stats"}, headers=player).get_json()['stats'] == stats
+
+def test_quick_play_validation(client, app, catalogue):
+    player = setup_auth_headers(app, user_id=2, username="player")
+
+    response = client.post('/api/quiz/quick-play', json={"topic_id": 1, "difficulty": "Hard", "num_questions": 3}, headers=player)
+    assert response.status_code == 409
+    assert response.get_json()['available'] == 2
+
+    assert client.post('/api/quiz/quick-play', json={"topic_id": 1}, headers=player).status_code == 400
+    assert client.post('/api/quiz/quick-play', json={"topic_id": 1, "difficulty": "Easy", "num_questions": 0}, headers=player).status_code == 400
+    assert client.post('/api/quiz/quick-play', json={"topic_id": 99, "difficulty": "Easy"}, headers=player).status_code == 404
+
+def test_quick_play_index_follows_writes(client, app, catalogue):
+    from app.extensions import quick_play
+
+    author = setup_auth_headers(app, user_id=1, username="author")
+    easy_quiz, _, hard_quiz = catalogue
+
+    client.patch(f'/api/quiz/{hard_quiz}', json={"difficulty": "Easy"}, headers=author)
+    assert quick_play.count(1, "Easy") == 7
+    assert quick_play.count(1, "Hard") == 0
+
+    client.delete(f'/api/quiz/{easy_quiz}', headers=author)
+    assert quick_play.count(1, "Easy") == 4
+
+def test_quick_play_skips_rows_deleted_by_other_workers(client, app, catalogue):
+    from app.extensions import db, quick_play
+    from app.models import Question
+
+    quick_play.sync(force=True)
+    # Written behind this process's back, like another worker would
+    db.session.execute(db.delete(Question).where(Question.quiz_id == catalogue[0]))
+    db.session.commit()
+
+    player = setup_auth_headers(app, user_id=2, username="player")
+    for _ in range(5):
+        response = client.post('/api/quiz/quick-play', json={"topic_id": 1, "difficulty": "Easy", "num_questions": 2}, headers=player)
+        assert response.status_code == 201
+        assert sorted(q['question_text'] for q in response.get_json()['questions']) == ["easy question 0", "easy question 1"]
+
+def test_prune_quick_play_keeps_played_games(client, app, catalogue):
+    from app.extensions import db
+    from app.models import QuickPlayGame
+
+    player = setup_auth_headers(app, user_id=2, username="player")
+    games = [
+        client.post('/api/quiz/quick-play', json={"topic_id": 1, "difficulty": "Easy", "num_questions": 2}, headers=player).get_json()
+        for _ in range(3)
+    ]
+    played = games[0]
+    client.post('/api/result/', json={"quick_play_id": played['quick_play_id'], "answers": [
+        {"question_id": q['id'], "selected_answer": q['options'][0]} for q in played['questions']
+    ]}, headers=player)
+
+    runner = app.test_cli_runner()
+    assert "0 unplayed" in runner.invoke(args=['prune-quick-play']).output
+    assert "2 unplayed" in runner.invoke(args=['prune-quick-play', '--older-than', '-1']).output
+
+    remaining = db.session.scalars(db.select(QuickPlayGame.id)).all()
+    assert remaining == [played['quick_play_id']]
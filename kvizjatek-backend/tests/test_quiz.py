@@ -109,6 +109,56 @@ def test_create_quiz_ai_success(client, app):
         # Verify the mock was actually called
         mock_generate.assert_called_once()
 
+def test_create_quiz_ai_async_job(client, app):
+    """Async AI generation returns 202 + job id, the job persists the quiz."""
+    from unittest.mock import patch
+    from app.extensions import jobs
+
+    headers = setup_auth_headers(app, user_id=1)
+
+    payload = {
+        "custom_topic": "Science",
+        "difficulty": "Hard",
+        "ai_generate": True,
+        "num_questions": 2,
+        "async": True
+    }
+
+    with patch('app.ai_generator.generate_quiz_questions') as mock_generate:
+        mock_generate.return_value = [
+            {"question_text": "AI Q1", "options": ["A", "B"], "correct_option_index": 0},
+            {"question_text": "AI Q2", "options": ["C", "D"], "correct_option_index": 1}
+        ]
+
+        response = client.post('/api/quiz/', json=payload, headers=headers)
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+
+        with app.app_context():
+            jobs.wait(job_id, timeout=5)
+
+    response = client.get(f'/api/quiz/jobs/{job_id}', headers=headers)
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data['status'] == 'succeeded'
+
+    response = client.get(f'/api/quiz/{data["quiz_id"]}')
+    assert len(response.get_json()['questions']) == 2
+
+def test_generation_job_forbidden_for_other_user(client, app):
+    from app.models import GenerationJob
+    from app.extensions import db
+
+    setup_auth_headers(app, user_id=1)
+    other_headers = setup_auth_headers(app, user_id=2, username="other")
+
+    with app.app_context():
+        db.session.add(GenerationJob(id="abc", user_id=1, custom_topic="X", difficulty="Easy", num_questions=1))
+        db.session.commit()
+
+    response = client.get('/api/quiz/jobs/abc', headers=other_headers)
+    assert response.status_code == 403
+
 # --- DELETE TESTS ---
 
 def test_delete_quiz_owner(client, app):
@@ -175,4 +225,290 @@ def test_update_quiz_success(client, app):
         updated_quiz = Quiz.query.get(quiz_id)
         assert updated_quiz.custom_topic == "New Topic"
         assert len(updated_quiz.questions) == 1
-        assert updated_quiz.questions[0].question_text == "New Q"
\ No newline at end of file
+        assert updated_quiz.questions[0].question_text == "New Q"
+# --- STREAMING (SSE) TESTS ---
+
+def test_stream_parser_yields_questions_incrementally():
+    from app.ai_generator import QuestionStreamParser
+
+    document = '{"questions": [{"question_text": "Q1 {\\"x\\"}", "options": ["A", "B"], "correct_option_index": 0}, ' \
+               '{"question_text": "Q2", "options": ["C", "D"], "correct_option_index": 1}]}'
+    parser = QuestionStreamParser()
+    seen = []
+    for i, c in enumerate(document):
+        for question in parser.feed(c):
+            seen.append((i, question['question_text']))
+
+    assert [text for _, text in seen] == ['Q1 {"x"}', 'Q2']
+    # The first question is available before the second one is even written
+    assert seen[0][0] < document.index('"Q2"')
+    assert parser.finished
+
+def test_stream_quiz_questions_from_model_chunks(app):
+    from types import SimpleNamespace
+    from unittest.mock import patch, MagicMock
+    from app.ai_generator import stream_quiz_questions
+
+    document = '{"questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]}'
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=document[i:i + 7]))])
+        for i in range(0, len(document), 7)
+    ]
+    fake_client = MagicMock()
+    fake_client.chat.completions.create.return_value = iter(chunks)
+
+    with patch('app.extensions.ai_client.get_client', return_value=fake_client):
+        items = list(stream_quiz_questions("Science", "Hard", 1, use_cache=False))
+
+    assert items == [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]
+    assert fake_client.chat.completions.create.call_args.kwargs['stream'] is True
+
+def test_create_quiz_stream_sends_questions_and_persists(client, app):
+    from unittest.mock import patch
+
+    headers = setup_auth_headers(app, user_id=1)
+    payload = {"custom_topic": "Science", "difficulty": "Hard", "num_questions": 2}
+
+    generated = [
+        {"question_text": "AI Q1", "options": ["A", "B"], "correct_option_index": 0},
+        {"question_text": "broken", "options": ["A"], "correct_option_index": 0},
+        {"question_text": "AI Q2", "options": ["C", "D"], "correct_option_index": 1}
+    ]
+    with patch('app.api.quiz.stream_quiz_questions', return_value=iter(generated)):
+        response = client.post('/api/quiz/stream', json=payload, headers=headers)
+        body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = [block.split('\n') for block in body.strip().split('\n\n')]
+    assert [lines[0] for lines in events] == ['event: question', 'event: skipped', 'event: question', 'event: done']
+    assert 'correct_option_index' not in events[0][1]
+
+    import json
+    done = json.loads(events[-1][1][len('data: '):])
+    details = client.get(f'/api/quiz/{done["quiz_id"]}').get_json()
+    assert [q['id'] for q in details['questions']] == done['question_ids']
+
+def test_create_quiz_stream_feeds_quick_play(client, app):
+    from unittest.mock import patch
+    from app.extensions import db, quick_play
+    from app.models import Topic
+
+    app.config['QUICK_PLAY_SYNC_INTERVAL'] = 3600
+    headers = setup_auth_headers(app, user_id=1)
+    db.session.add(Topic(id=1, name="Science"))
+    db.session.commit()
+    quick_play.sync(force=True)
+
+    generated = [
+        {"question_text": "Which planet is the largest?", "options": ["Jupiter", "Mars"], "correct_option_index": 0},
+        {"question_text": "What is the chemical symbol of gold?", "options": ["Ag", "Au"], "correct_option_index": 1}
+    ]
+    with patch('app.api.quiz.stream_quiz_questions', return_value=iter(generated)):
+        response = client.post('/api/quiz/stream', json={"topic_id": 1, "difficulty": "Hard", "num_questions": 2}, headers=headers)
+        assert 'event: done' in response.get_data(as_text=True)
+
+    assert quick_play.count(1, "Hard") == 2
+
+# --- LISTING TESTS ---
+
+def create_listed_quizzes(app, count):
+    import datetime
+    from app.models import Quiz, Topic
+    from app.extensions import db
+
+    topic = Topic(name="Science")
+    db.session.add(topic)
+    db.session.flush()
+    base = datetime.datetime(2025, 1, 1)
+    for i in range(count):
+        db.session.add(Quiz(
+            topic_id=topic.id if i % 2 else None,
+            custom_topic=None if i % 2 else f"Custom {i}",
+            difficulty="Hard" if i % 3 == 0 else "Easy",
+            created_by_user_id=1 + i % 2,
+            # Pairs share a timestamp, the id breaks the tie
+            created_at=base + datetime.timedelta(minutes=i // 2)
+        ))
+    db.session.commit()
+    return topic.id
+
+def test_get_all_quizzes_compat_list(client, app):
+    topic_id = create_listed_quizzes(app, 4)
+
+    response = client.get('/api/quiz/')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [q['id'] for q in data] == [1, 2, 3, 4]
+    assert [q['topic_name'] for q in data] == ["Custom 0", "Science", "Custom 2", "Science"]
+
+    data = client.get(f'/api/quiz/?topic_id={topic_id}&difficulty=easy').get_json()
+    assert [q['id'] for q in data] == [2]
+
+def test_get_all_quizzes_keyset_pages(client, app):
+    create_listed_quizzes(app, 7)
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/quiz/?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        seen.extend(q['id'] for q in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+    page = client.get('/api/quiz/?limit=10&created_by_user_id=2').get_json()
+    assert [q['id'] for q in page['items']] == [6, 4, 2]
+    assert page['next_cursor'] is None
+
+def test_get_all_quizzes_rejects_bad_parameters(client):
+    assert client.get('/api/quiz/?limit=0').status_code == 400
+    assert client.get('/api/quiz/?limit=1000').status_code == 400
+    assert client.get('/api/quiz/?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/quiz/?topic_id=abc').status_code == 400
+
+# --- PATCH TESTS ---
+
+def create_patchable_quiz(client, headers, count=3):
+    response = client.post('/api/quiz/', json={
+        "custom_topic": "Geography",
+        "difficulty": "Easy",
+        "questions": [
+            {"question_text": f"Which river flows through city number {i}?", "options": [f"River {i}", "Other"], "correct_option_index": 0}
+            for i in range(count)
+        ]
+    }, headers=headers)
+    quiz_id = response.get_json()['quiz_id']
+    return quiz_id, [q['id'] for q in client.get(f'/api/quiz/{quiz_id}').get_json()['questions']]
+
+def test_patch_quiz_applies_diff_and_keeps_ids(client, app):
+    from app.models import Question
+
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, ids = create_patchable_quiz(client, headers)
+
+    response = client.patch(f'/api/quiz/{quiz_id}', json={
+        "difficulty": "Hard",
+        "update": [{"question_id": ids[0], "question_text": "What is the longest river in Europe?"}],
+        "remove": [ids[1]],
+        "add": [{"question_text": "Which sea does the Danube flow into?", "options": ["Black Sea", "Baltic Sea"], "correct_option_index": 0}]
+    }, headers=headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['updated_question_ids'] == [ids[0]]
+    assert data['removed_question_ids'] == [ids[1]]
+
+    quiz = client.get(f'/api/quiz/{quiz_id}').get_json()
+    assert quiz['difficulty'] == "Hard"
+    assert [q['id'] for q in quiz['questions']] == [ids[0], ids[2]] + data['added_question_ids']
+    assert quiz['questions'][0]['question_text'] == "What is the longest river in Europe?"
+    # Fields that were not sent are kept
+    assert Question.query.get(ids[0]).options == ["River 0", "Other"]
+
+def test_patch_quiz_does_not_match_added_questions_against_themselves(client, app):
+    # Every lookup re-syncs the index, which used to autoflush the pending questions into it
+    app.config['DUPLICATE_INDEX_SYNC_INTERVAL'] = 0
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, ids = create_patchable_quiz(client, headers)
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'reject'
+    new_question = {"question_text": "How long is the Tisza?", "options": ["966 km", "500 km"], "correct_option_index": 0}
+
+    response = client.patch(f'/api/quiz/{quiz_id}', json={"add": [new_question]}, headers=headers)
+    assert response.status_code == 200
+    assert 'duplicates' not in response.get_json()
+    added_id = response.get_json()['added_question_ids'][0]
+
+    # A rejected diff leaves no phantom ids in the index
+    response = client.patch(f'/api/quiz/{quiz_id}', json={"add": [new_question]}, headers=headers)
+    assert response.status_code == 409
+    assert response.get_json()['duplicates'][0]['duplicate_of_question_id'] == added_id
+    assert sorted(app.extensions['question_index']['entries']) == ids + [added_id]
+
+def test_patch_quiz_validates_like_create(client, app):
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, ids = create_patchable_quiz(client, headers)
+
+    invalid_diffs = [
+        {"update": [{"question_id": ids[0], "correct_option_index": 5}]},
+        {"update": [{"question_id": ids[0], "correct_option_index": "1"}]},
+        {"add": [{"question_text": "Missing options"}]},
+        {"remove": [9999]},
+        {"remove": [[ids[0]]]},
+        {"remove": [True]},
+        {"update": [{"question_id": {"id": ids[0]}, "question_text": "x"}]},
+        {"update": [{"question_id": ids[0], "question_text": "x"}], "remove": [ids[0]]},
+        {"remove": ids},
+    ]
+    for diff in invalid_diffs:
+        assert client.patch(f'/api/quiz/{quiz_id}', json=diff, headers=headers).status_code == 400, diff
+
+    # Nothing was written by the rejected requests
+    quiz = client.get(f'/api/quiz/{quiz_id}').get_json()
+    assert [q['id'] for q in quiz['questions']] == ids
+
+def test_put_quiz_validates_like_create(client, app):
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, ids = create_patchable_quiz(client, headers)
+
+    invalid_questions = [
+        {"questions": [{"question_text": "Q?", "options": ["A", "B"], "correct_option_index": "1"}]},
+        {"questions": [{"question_text": "Q?", "options": "AB", "correct_option_index": 0}]},
+        {"questions": [{"question_text": "Q?", "options": ["A", "B"], "correct_option_index": True}]},
+        {"questions": {"question_text": "Q?"}},
+    ]
+    for payload in invalid_questions:
+        assert client.put(f'/api/quiz/{quiz_id}', json=payload, headers=headers).status_code == 400, payload
+
+    quiz = client.get(f'/api/quiz/{quiz_id}').get_json()
+    assert [q['id'] for q in quiz['questions']] == ids
+
+def test_patch_quiz_forbidden(client, app):
+    owner_headers = setup_auth_headers(app, user_id=1, username="owner")
+    other_headers = setup_auth_headers(app, user_id=2, username="other")
+    quiz_id, ids = create_patchable_quiz(client, owner_headers)
+
+    response = client.patch(f'/api/quiz/{quiz_id}', json={"remove": [ids[0]]}, headers=other_headers)
+    assert response.status_code == 403
+
+# --- BULK INSERT PATH TESTS ---
+
+def test_create_large_manual_quiz_keeps_question_order(client, app):
+    # The generated questions are near-duplicates of each other
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    headers = setup_auth_headers(app, user_id=1)
+    questions = [
+        {"question_text": f"Large quiz question {i}?", "options": [f"A{i}", f"B{i}"], "correct_option_index": i % 2}
+        for i in range(300)
+    ]
+
+    response = client.post('/api/quiz/', json={"custom_topic": "Large", "difficulty": "Easy", "questions": questions}, headers=headers)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['questions_count'] == 300
+    assert set(data) == {"message", "quiz_id", "questions_count"}
+
+    stored = client.get(f"/api/quiz/{data['quiz_id']}").get_json()['questions']
+    assert [q['question_text'] for q in stored] == [q['question_text'] for q in questions]
+
+def test_validate_questions_matches_single_question_rules():
+    import pytest
+    from app.quiz_service import validate_question, validate_questions
+
+    invalid = [
+        {"question_text": "No options", "correct_option_index": 0},
+        {"question_text": "One option", "options": ["A"], "correct_option_index": 0},
+        {"question_text": "Bad index", "options": ["A", "B"], "correct_option_index": 2},
+        {"question_text": "String index", "options": ["A", "B"], "correct_option_index": "1"},
+        {"question_text": "Bool index", "options": ["A", "B"], "correct_option_index": True},
+        "not a dict",
+    ]
+    for q_data in invalid:
+        with pytest.raises(ValueError) as single:
+            validate_question(q_data)
+        with pytest.raises(ValueError) as batch:
+            validate_questions([{"question_text": "Fine", "options": ["A", "B"], "correct_option_index": 1}, q_data])
+        assert str(batch.value) == str(single.value)
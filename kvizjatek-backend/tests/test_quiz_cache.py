@@ -0,0 +1,78 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def test_quiz_detail_cache_serves_encoded_payload(client, app):
+    from unittest.mock import patch
+
+    headers = setup_auth_headers(app)
+    response = client.post('/api/quiz/', json={
+        "custom_topic": "History",
+        "difficulty": "Easy",
+        "questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]
+    }, headers=headers)
+    quiz_id = response.get_json()['quiz_id']
+
+    first = client.get(f'/api/quiz/{quiz_id}')
+    with patch('app.api.quiz.Quiz') as mock_quiz:
+        second = client.get(f'/api/quiz/{quiz_id}')
+    mock_quiz.query.get.assert_not_called()
+    assert second.data == first.data
+    assert second.mimetype == 'application/json'
+
+    client.put(f'/api/quiz/{quiz_id}', json={
+        "questions": [{"question_text": "Q2", "options": ["A", "B"], "correct_option_index": 1}]
+    }, headers=headers)
+    assert client.get(f'/api/quiz/{quiz_id}').get_json()['questions'][0]['question_text'] == "Q2"
+
+    client.delete(f'/api/quiz/{quiz_id}', headers=headers)
+    assert client.get(f'/api/quiz/{quiz_id}').status_code == 404
+
+def test_quiz_detail_cache_sees_foreign_writes(client, app):
+    from app.extensions import db
+    from app.models import Question
+
+    headers = setup_auth_headers(app)
+    quiz_id = client.post('/api/quiz/', json={
+        "custom_topic": "History",
+        "difficulty": "Easy",
+        "questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]
+    }, headers=headers).get_json()['quiz_id']
+    client.get(f'/api/quiz/{quiz_id}')
+
+    # A write that bypasses this process's invalidation (e.g. another worker)
+    Question.query.filter_by(quiz_id=quiz_id).update({"question_text": "Changed"})
+    db.session.commit()
+
+    response = client.get(f'/api/quiz/{quiz_id}')
+    assert response.get_json()['questions'][0]['question_text'] == "Changed"
+    # The body and the ETag agree, so the new copy is what clients revalidate against
+    assert client.get(f'/api/quiz/{quiz_id}', headers={"If-None-Match": response.headers['ETag']}).status_code == 304
+
+def test_quiz_detail_cache_survives_writes_to_other_quizzes(client, app):
+    from unittest.mock import patch
+
+    headers = setup_auth_headers(app)
+    quiz = {"custom_topic": "History", "difficulty": "Easy",
+            "questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]}
+    quiz_id = client.post('/api/quiz/', json=quiz, headers=headers).get_json()['quiz_id']
+    client.get(f'/api/quiz/{quiz_id}')
+
+    other_id = client.post('/api/quiz/', json=dict(quiz, custom_topic="Science"), headers=headers).get_json()['quiz_id']
+    client.patch(f'/api/quiz/{other_id}', json={"difficulty": "Hard"}, headers=headers)
+
+    with patch('app.api.quiz.Quiz') as mock_quiz:
+        assert client.get(f'/api/quiz/{quiz_id}').status_code == 200
+    mock_quiz.query.get.assert_not_called()
@@ -0,0 +1,157 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def create_quizzes(app, count):
+    from app.models import Quiz, Question, Topic
+    from app.extensions import db
+
+    topic = Topic(name="History")
+    db.session.add(topic)
+    for i in range(count):
+        quiz = Quiz(topic=topic if i % 2 else None, custom_topic=None if i % 2 else f"Custom {i}",
+                    difficulty="Easy", created_by_user_id=1)
+        for j in range(2):
+            quiz.questions.append(Question(question_text=f"Quiz {i} question {j}", options=["A", "B"], correct_option_index=j))
+        db.session.add(quiz)
+    db.session.commit()
+
+def test_export_streams_one_quiz_per_line(client, app):
+    import json
+
+    headers = setup_auth_headers(app, is_admin=True)
+    create_quizzes(app, 5)
+    app.config['QUIZ_TRANSFER_BATCH_SIZE'] = 2
+
+    response = client.get('/api/admin/quizzes/export', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['id'] for r in records] == [1, 2, 3, 4, 5]
+    assert records[1]['topic'] == "History"
+    assert records[0]['custom_topic'] == "Custom 0"
+    assert records[0]['questions'][1] == {"question_text": "Quiz 0 question 1", "options": ["A", "B"], "correct_option_index": 1}
+
+def test_import_reports_bad_lines_and_commits_in_batches(client, app):
+    import json
+    from app.models import Quiz, Topic
+
+    headers = setup_auth_headers(app, is_admin=True)
+    app.config['QUIZ_TRANSFER_BATCH_SIZE'] = 2
+    good = {"topic": "Geography", "difficulty": "Hard",
+            "questions": [{"question_text": "Capital of Hungary?", "options": ["Budapest", "Vienna"], "correct_option_index": 0}]}
+    lines = [
+        json.dumps(good),
+        "{not json",
+        json.dumps({**good, "questions": [{"question_text": "Q", "options": ["A"], "correct_option_index": 0}]}),
+        "",
+        json.dumps({**good, "topic": None, "custom_topic": "Trivia"}),
+        json.dumps({**good, "difficulty": None}),
+        json.dumps(good),
+        json.dumps({**good, "questions": [{**good["questions"][0], "correct_option_index": "1"}]}),
+        json.dumps({**good, "topic": 5}),
+    ]
+
+    response = client.post('/api/admin/quizzes/import', data="\n".join(lines) + "\n",
+                           content_type='application/x-ndjson', headers=headers)
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['imported'] == 3
+    assert report['failed'] == 5
+    assert [e['line'] for e in report['errors']] == [2, 3, 6, 8, 9]
+    assert "Invalid question data" in report['errors'][1]['error']
+    assert report['errors'][3]['error'] == "Invalid question data: Invalid 'correct_option_index'"
+    assert report['errors'][4]['error'] == "'topic' must be a string"
+
+    # Missing topics are created once, by name
+    assert Topic.query.filter_by(name="Geography").count() == 1
+    assert Quiz.query.count() == 3
+    # Line 7 repeats line 1 (committed in the previous batch) and is flagged
+    assert [d['line'] for d in report['duplicates']] == [7]
+    assert report['duplicates'][0]['duplicates'][0]['similarity'] == 1.0
+
+def test_import_rejects_near_duplicates(client, app):
+    import json
+    from app.models import Quiz
+
+    headers = setup_auth_headers(app, is_admin=True)
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'reject'
+    question = {"question_text": "Which is the longest river in Europe?", "options": ["Volga", "Danube"], "correct_option_index": 0}
+    other = {"question_text": "Which city is the capital of Austria?", "options": ["Vienna", "Graz"], "correct_option_index": 0}
+    lines = [
+        json.dumps({"topic": "Geography", "difficulty": "Easy", "questions": [question]}),
+        # A repeat within the same batch, and a repeat within the same quiz
+        json.dumps({"topic": "Geography", "difficulty": "Hard", "questions": [other, question]}),
+        json.dumps({"topic": "Geography", "difficulty": "Hard", "questions": [other, other]}),
+        # Questions are only compared within a topic
+        json.dumps({"custom_topic": "Rivers", "difficulty": "Easy", "questions": [question]}),
+        # The questions of the rejected lines were not remembered
+        json.dumps({"topic": "Geography", "difficulty": "Medium", "questions": [other]}),
+    ]
+
+    response = client.post('/api/admin/quizzes/import', data="\n".join(lines), headers=headers)
+    report = response.get_json()
+    assert report['imported'] == 3
+    assert [e['line'] for e in report['errors']] == [2, 3]
+    assert report['errors'][0]['error'] == "Quiz contains near-duplicate questions"
+    assert Quiz.query.count() == 3
+
+def test_import_survives_a_concurrently_created_topic(client, app):
+    import json
+    from unittest.mock import patch
+    from app.extensions import db
+    from app.models import Quiz, Topic
+
+    headers = setup_auth_headers(app, is_admin=True)
+    db.session.add(Topic(name="Geography"))
+    db.session.commit()
+    good = {"topic": "Geography", "difficulty": "Easy",
+            "questions": [{"question_text": "Capital of Hungary?", "options": ["Budapest", "Vienna"], "correct_option_index": 0}]}
+    lines = [json.dumps({**good, "topic": "Science"}), json.dumps(good)]
+
+    # Another import creates the topic between the lookup and the insert
+    with patch('app.quiz_transfer._find_topic', side_effect=[None, None, Topic.query.filter_by(name="Geography").one()]):
+        response = client.post('/api/admin/quizzes/import', data="\n".join(lines), headers=headers)
+
+    report = response.get_json()
+    assert (report['imported'], report['failed']) == (2, 0)
+    geography = Topic.query.filter_by(name="Geography").one()
+    assert Quiz.query.filter_by(topic_id=geography.id).count() == 1
+    assert Topic.query.count() == 2
+
+def test_export_import_round_trip_via_cli(app, tmp_path):
+    from app.models import Quiz, Question
+
+    setup_auth_headers(app, is_admin=True)
+    create_quizzes(app, 3)
+    runner = app.test_cli_runner()
+    dump = tmp_path / "quizzes.ndjson"
+
+    result = runner.invoke(args=['export-quizzes', str(dump)])
+    assert result.exit_code == 0, result.output
+    assert len(dump.read_text(encoding='utf-8').splitlines()) == 3
+
+    result = runner.invoke(args=['import-quizzes', str(dump)])
+    assert result.exit_code == 0, result.output
+    assert "3 quizzes imported, 0 lines failed" in result.output
+    assert Quiz.query.count() == 6
+    assert Question.query.count() == 12
+
+def test_transfer_requires_admin(client, app):
+    headers = setup_auth_headers(app)
+    assert client.get('/api/admin/quizzes/export', headers=headers).status_code == 403
+    assert client.post('/api/admin/quizzes/import', data="", headers=headers).status_code == 403
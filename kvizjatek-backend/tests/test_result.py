@@ -187,4 +187,238 @@ def test_get_results_for_specific_user_admin(client, app):
 def test_get_results_for_user_not_admin(client, app):
     headers_user = setup_auth_headers(app, user_id=2, is_admin=False)
     response = client.get('/api/result/user/1', headers=headers_user)
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+def test_submit_results_batch_per_item_status(client, app):
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+    other_quiz_id, other_ids = create_quiz_environment(app)
+
+    payload = {"results": [
+        {"quiz_id": quiz_id, "answers": [
+            {"question_id": q_ids[0], "selected_answer": "A"},
+            {"question_id": q_ids[1], "selected_answer": "D"}
+        ]},
+        {"quiz_id": 9999, "answers": []},
+        {"quiz_id": other_quiz_id, "answers": [{"question_id": other_ids[0], "selected_answer": "A"}]},
+        {"quiz_id": other_quiz_id, "answers": [
+            {"question_id": other_ids[0], "selected_answer": "B"},
+            {"question_id": other_ids[1], "selected_answer": "D"}
+        ]},
+        "garbage"
+    ]}
+
+    response = client.post('/api/result/batch', json=payload, headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['saved'] == 2
+    assert [item['status'] for item in data['items']] == [201, 404, 400, 201, 400]
+    assert data['items'][0]['score'] == 2
+    assert data['items'][3]['score'] == 1
+
+    from app.models import Result
+    with app.app_context():
+        saved = Result.query.order_by(Result.id).all()
+        assert [(r.id, r.user_id, r.quiz_id, r.score) for r in saved] == [
+            (data['items'][0]['result_id'], 1, quiz_id, 2),
+            (data['items'][3]['result_id'], 1, other_quiz_id, 1)
+        ]
+
+def test_submit_results_batch_validation(client, app):
+    headers = setup_auth_headers(app, user_id=1)
+    app.config['RESULT_BATCH_MAX_ITEMS'] = 2
+
+    assert client.post('/api/result/batch', json={"results": []}, headers=headers).status_code == 400
+    assert client.post('/api/result/batch', json=[1, 2], headers=headers).status_code == 400
+    too_many = {"results": [{"quiz_id": 1, "answers": []}] * 3}
+    assert client.post('/api/result/batch', json=too_many, headers=headers).status_code == 400
+
+def test_write_behind_group_commits_concurrent_submissions(client, app):
+    import threading
+    from app.extensions import result_writer
+    from app.models import Result
+
+    app.config['RESULT_WRITE_BEHIND'] = True
+    app.config['RESULT_WRITE_BEHIND_FLUSH_INTERVAL'] = 0.2
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+
+    responses = []
+    def submit(selected):
+        response = app.test_client().post('/api/result/', json={"quiz_id": quiz_id, "answers": [
+            {"question_id": q_ids[0], "selected_answer": selected},
+            {"question_id": q_ids[1], "selected_answer": "D"}
+        ]}, headers=headers)
+        responses.append((selected, response.status_code, response.get_json().get('result_id')))
+
+    threads = [threading.Thread(target=submit, args=("A" if i % 2 else "B",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result_writer.shutdown(app)
+
+    assert all(status == 201 for _, status, _ in responses)
+    assert result_writer.stats(app)['rows'] == 8
+    assert result_writer.stats(app)['batches'] < 8
+    with app.app_context():
+        for selected, _, result_id in responses:
+            assert Result.query.get(result_id).score == (2 if selected == "A" else 1)
+
+def test_write_behind_rejects_when_queue_is_full(client, app):
+    from unittest.mock import patch
+    from app.result_writer import ResultQueueFull
+
+    app.config['RESULT_WRITE_BEHIND'] = True
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+    payload = {"quiz_id": quiz_id, "answers": [{"question_id": q, "selected_answer": "A"} for q in q_ids]}
+
+    with patch('app.result_writer.ResultWriter.write', side_effect=ResultQueueFull):
+        response = client.post('/api/result/', json=payload, headers=headers)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_result_history_cursor_pagination_and_filters(client, app):
+    import datetime
+    from app.models import Result
+    from app.extensions import db
+
+    headers = setup_auth_headers(app, user_id=1)
+    setup_auth_headers(app, user_id=2, username="other")
+    quiz_id, _ = create_quiz_environment(app)
+    other_quiz_id, _ = create_quiz_environment(app)
+
+    start = datetime.datetime(2026, 1, 1, 12, 0)
+    with app.app_context():
+        for day in range(5):
+            db.session.add(Result(user_id=1, quiz_id=quiz_id if day != 2 else other_quiz_id, score=day,
+                                  total_questions=2, completed_at=start + datetime.timedelta(days=day)))
+        db.session.add(Result(user_id=2, quiz_id=quiz_id, score=9, total_questions=2, completed_at=start))
+        db.session.commit()
+
+    scores, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get('/api/result/', query_string=params, headers=headers).get_json()
+        scores += [item['score'] for item in page['items']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert scores == [4, 3, 2, 1, 0]
+
+    window = client.get('/api/result/', query_string={
+        "from": "2026-01-02", "to": "2026-01-04T12:00:00+00:00", "quiz_id": quiz_id
+    }, headers=headers).get_json()
+    assert [item['score'] for item in window] == [1]
+
+    assert client.get('/api/result/', query_string={"from": "yesterday"}, headers=headers).status_code == 400
+    assert client.get('/api/result/', query_string={"cursor": "bogus"}, headers=headers).status_code == 400
+    assert client.get('/api/result/', query_string={"limit": 0}, headers=headers).status_code == 400
+
+def test_result_history_streams_every_row(client, app):
+    from app.models import Result
+    from app.extensions import db
+
+    app.config['RESULT_STREAM_BATCH_SIZE'] = 3
+    setup_auth_headers(app, user_id=1)
+    admin_headers = setup_auth_headers(app, user_id=3, username="admin", is_admin=True)
+    quiz_id, _ = create_quiz_environment(app)
+    with app.app_context():
+        db.session.add_all([Result(user_id=1, quiz_id=quiz_id, score=i, total_questions=2) for i in range(7)])
+        db.session.commit()
+
+    response = client.get('/api/result/user/1', headers=admin_headers)
+    assert response.status_code == 200
+    assert [item['score'] for item in response.get_json()] == list(range(7))
+    assert 'user_id' not in response.get_json()[0]
+
+def test_submit_results_batch_retry_with_client_ids(client, app):
+    from app.extensions import db
+    from app.models import Result, UserStats
+
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+    answers = [{"question_id": q_ids[0], "selected_answer": "A"}, {"question_id": q_ids[1], "selected_answer": "D"}]
+    payload = {"results": [
+        {"client_id": "attempt-1", "quiz_id": quiz_id, "answers": answers},
+        {"client_id": "attempt-2", "quiz_id": quiz_id, "answers": answers[:1] + [{"question_id": q_ids[1], "selected_answer": "C"}]}
+    ]}
+
+    first = client.post('/api/result/batch', json=payload, headers=headers).get_json()
+    assert first['saved'] == 2
+
+    # The response got lost; the client retries the same batch with one more item
+    payload['results'].append({"client_id": "attempt-3", "quiz_id": quiz_id, "answers": answers})
+    retry = client.post('/api/result/batch', json=payload, headers=headers).get_json()
+    assert retry['saved'] == 1
+    assert [item['status'] for item in retry['items']] == [200, 200, 201]
+    assert retry['items'][0] == dict(first['items'][0], status=200, duplicate=True)
+    assert retry['items'][1]['result_id'] == first['items'][1]['result_id']
+
+    with app.app_context():
+        assert Result.query.count() == 3
+        assert db.session.get(UserStats, (1, UserStats.OVERALL)).attempts == 3
+
+    invalid = {"results": [
+        {"client_id": "", "quiz_id": quiz_id, "answers": answers},
+        {"client_id": "x" * 65, "quiz_id": quiz_id, "answers": answers},
+        {"client_id": "attempt-4", "quiz_id": quiz_id, "answers": answers},
+        {"client_id": "attempt-4", "quiz_id": quiz_id, "answers": answers}
+    ]}
+    assert [item['status'] for item in client.post('/api/result/batch', json=invalid, headers=headers).get_json()['items']] == [400, 400, 201, 400]
+
+def test_submit_results_batch_concurrent_retry_reports_stored_item(client, app):
+    from unittest.mock import patch
+    from app.result_store import stored_results
+
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+    item = {"client_id": "attempt-1", "quiz_id": quiz_id, "answers": [{"question_id": q, "selected_answer": "A"} for q in q_ids]}
+    first = client.post('/api/result/batch', json={"results": [item]}, headers=headers).get_json()['items'][0]
+
+    # The concurrent request's lookup ran before the first one committed
+    with patch('app.result_store.stored_results', side_effect=[{}, stored_results(1, {"attempt-1"})]):
+        retry = client.post('/api/result/batch', json={"results": [item]}, headers=headers)
+    assert retry.status_code == 200
+    assert retry.get_json()['items'][0] == dict(first, status=200, duplicate=True)
+
+def test_write_behind_timeout_is_pending_and_retry_safe(client, app):
+    from app.extensions import result_writer
+    from app.models import Result
+
+    app.config['RESULT_WRITE_BEHIND'] = True
+    app.config['RESULT_WRITE_BEHIND_FLUSH_INTERVAL'] = 0.2
+    app.config['RESULT_WRITE_BEHIND_TIMEOUT'] = 0
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+    payload = {"client_id": "attempt-1", "quiz_id": quiz_id,
+               "answers": [{"question_id": q, "selected_answer": "A"} for q in q_ids]}
+
+    response = client.post('/api/result/', json=payload, headers=headers)
+    assert response.status_code == 202
+    assert response.get_json()['pending'] is True
+
+    # The queued row is committed after the request gave up waiting
+    result_writer.shutdown(app)
+    retry = client.post('/api/result/', json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.get_json()['duplicate'] is True
+    with app.app_context():
+        assert [r.id for r in Result.query.all()] == [retry.get_json()['result_id']]
+
+    assert client.post('/api/result/', json=dict(payload, client_id=7), headers=headers).status_code == 400
+
+def test_batch_write_behind_timeout_is_pending(client, app):
+    from unittest.mock import patch
+    from app.result_writer import ResultWritePending
+
+    app.config['RESULT_WRITE_BEHIND'] = True
+    headers = setup_auth_headers(app, user_id=1)
+    quiz_id, q_ids = create_quiz_environment(app)
+    payload = {"results": [{"client_id": "attempt-1", "quiz_id": quiz_id,
+                            "answers": [{"question_id": q, "selected_answer": "A"} for q in q_ids]}]}
+
+    with patch('app.result_writer.ResultWriter.write', side_effect=ResultWritePending):
+        response = client.post('/api/result/batch', json=payload, headers=headers)
+    assert response.status_code == 202
+    assert response.get_json()['pending'] is True
@@ -0,0 +1,84 @@
+import csv
+import io
+import sys
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def results(client, app):
+    """Five results of two users on a topic quiz and a custom topic quiz."""
+    from app.extensions import db
+    from app.models import Quiz, Result, Topic
+
+    setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+    setup_auth_headers(app, user_id=2, username="player")
+    db.session.add(Topic(id=1, name="History"))
+    db.session.add_all([
+        Quiz(id=1, topic_id=1, difficulty="Easy", created_by_user_id=1),
+        Quiz(id=2, custom_topic="Trivia, \"mixed\"", difficulty="Hard", created_by_user_id=1),
+    ])
+    db.session.add_all([
+        Result(user_id=1 + i % 2, quiz_id=1 + i % 2, score=i, total_questions=4) for i in range(5)
+    ])
+    db.session.commit()
+
+def test_export_results_csv(client, app, results):
+    app.config['RESULT_EXPORT_BATCH_SIZE'] = 2
+    admin = setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+
+    response = client.get('/api/admin/results/export', headers=admin)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+    assert [row['result_id'] for row in rows] == ['1', '2', '3', '4', '5']
+    assert rows[1]['username'] == 'player'
+    assert (rows[0]['topic'], rows[0]['custom_topic'], rows[0]['difficulty']) == ('History', '', 'Easy')
+    assert (rows[1]['topic'], rows[1]['custom_topic']) == ('', 'Trivia, "mixed"')
+    assert (rows[3]['score'], rows[3]['total_questions'], rows[3]['percentage']) == ('3', '4', '75.0')
+    assert rows[4]['completed_at']
+
+    user = setup_auth_headers(app, user_id=2, username="player")
+    assert client.get('/api/admin/results/export', headers=user).status_code == 403
+    assert client.get('/api/admin/results/export', query_string={"format": "xml"}, headers=admin).status_code == 400
+
+def test_export_results_command(app, results, tmp_path):
+    output = tmp_path / 'results.csv'
+    app.test_cli_runner().invoke(args=['export-results', str(output), '--batch-size', '3'])
+
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert lines[0].split(',')[:3] == ['result_id', 'user_id', 'username']
+    assert len(lines) == 6
+
+def test_columnar_export_without_pyarrow(client, app, results, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    admin = setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+
+    assert client.get('/api/admin/results/export', query_string={"format": "parquet"}, headers=admin).status_code == 501
+    result = app.test_cli_runner().invoke(args=['export-results', '--format', 'arrow'])
+    assert result.exit_code != 0 and "requires pyarrow" in result.output
+
+def test_export_results_parquet(client, app, results):
+    pq = pytest.importorskip('pyarrow.parquet')
+    app.config['RESULT_EXPORT_BATCH_SIZE'] = 2
+    admin = setup_auth_headers(app, user_id=1, username="admin", is_admin=True)
+
+    response = client.get('/api/admin/results/export', query_string={"format": "parquet"}, headers=admin)
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.get_data()))
+    assert table.num_rows == 5
+    assert table.column('username').to_pylist()[:2] == ['admin', 'player']
+    assert pq.ParquetFile(io.BytesIO(response.get_data())).num_row_groups == 3
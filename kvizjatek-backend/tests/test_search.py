@@ -0,0 +1,95 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def create_quiz(client, headers, questions, **topic):
+    response = client.post('/api/quiz/', json={
+        **topic,
+        "difficulty": "Easy",
+        "questions": [
+            {"question_text": text, "options": options, "correct_option_index": 0}
+            for text, options in questions
+        ]
+    }, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['quiz_id']
+
+def search_ids(client, q, **params):
+    response = client.get('/api/quiz/search', query_string={"q": q, **params})
+    assert response.status_code == 200
+    return [item['id'] for item in response.get_json()['items']]
+
+def test_search_matches_questions_options_and_topics(client, app):
+    from app.extensions import db
+    from app.models import Topic
+
+    headers = setup_auth_headers(app)
+    db.session.add(Topic(id=1, name="Földrajz"))
+    db.session.commit()
+
+    rivers = create_quiz(client, headers, [("Melyik folyó a leghosszabb?", ["Duna", "Tisza"])], topic_id=1)
+    kings = create_quiz(client, headers, [("Ki volt az első király?", ["István", "Béla"])], custom_topic="Magyar történelem")
+
+    assert search_ids(client, "folyo") == [rivers]      # question text, accents ignored
+    assert search_ids(client, "Tisza") == [rivers]      # answer option
+    assert search_ids(client, "földrajz") == [rivers]   # topic name
+    assert search_ids(client, "történ*") == [kings]     # custom topic, prefix
+    assert search_ids(client, "történ") == []           # whole words without the marker
+    assert search_ids(client, "király Duna") == []      # every word must match the same document
+
+def test_search_follows_writes(client, app):
+    headers = setup_auth_headers(app)
+    quiz_id = create_quiz(client, headers, [("Which planet is the largest?", ["Jupiter", "Mars"])], custom_topic="Space")
+    question_id = client.get(f'/api/quiz/{quiz_id}').get_json()['questions'][0]['id']
+
+    client.patch(f'/api/quiz/{quiz_id}', json={
+        "update": [{"question_id": question_id, "options": ["Saturn", "Mars"]}]
+    }, headers=headers)
+    assert search_ids(client, "jupiter") == []
+    assert search_ids(client, "saturn") == [quiz_id]
+
+    client.delete(f'/api/quiz/{quiz_id}', headers=headers)
+    assert search_ids(client, "planet") == []
+    assert search_ids(client, "space") == []
+
+def test_search_ranks_and_paginates(client, app):
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    headers = setup_auth_headers(app)
+    weak = create_quiz(client, headers, [("A question about volcanoes and many other unrelated words here", ["A", "B"])], custom_topic="Misc")
+    strong = create_quiz(client, headers, [("Volcano volcano volcano", ["Volcano", "Lava"])], custom_topic="Volcanoes")
+    others = [create_quiz(client, headers, [(f"Volcano fact {i}", ["Yes", "No"])], custom_topic="Geology") for i in range(3)]
+
+    first = client.get('/api/quiz/search', query_string={"q": "volcano*", "limit": 2}).get_json()
+    assert first['items'][0]['id'] == strong
+    assert first['next_offset'] == 2
+
+    ids = [item['id'] for item in first['items']] + search_ids(client, "volcano*", offset=2, limit=10)
+    assert sorted(ids) == sorted([weak, strong] + others)
+    assert ids[-1] == weak
+    assert first['truncated'] is False
+
+    # Only the best matches are kept (the question and the topic of the strong quiz), and the response says so
+    app.config['SEARCH_MAX_HITS'] = 2
+    capped = client.get('/api/quiz/search', query_string={"q": "volcano*"}).get_json()
+    assert capped['truncated'] is True
+    assert [item['id'] for item in capped['items']] == [strong]
+
+def test_search_rejects_invalid_queries(client):
+    assert client.get('/api/quiz/search').status_code == 400
+    assert client.get('/api/quiz/search', query_string={"q": '"*()'}).status_code == 400
+    assert client.get('/api/quiz/search', query_string={"q": "x", "offset": -1}).status_code == 400
+    assert client.get('/api/quiz/search', query_string={"q": "x", "limit": 0}).status_code == 400
+    # FTS5 operators in user input are treated as plain words
+    assert client.get('/api/quiz/search', query_string={"q": "NEAR(a OR b"}).status_code == 200
@@ -0,0 +1,131 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def quizzes(client, app):
+    """A 2-question quiz on topic 1 ("History") and a 4-question custom topic quiz, with their question ids."""
+    from app.extensions import db
+    from app.models import Topic
+
+    app.config['DUPLICATE_QUESTION_POLICY'] = 'off'
+    headers = setup_auth_headers(app)
+    db.session.add(Topic(id=1, name="History"))
+    db.session.commit()
+
+    created = []
+    for topic, count in (({"topic_id": 1}, 2), ({"custom_topic": "Trivia"}, 4)):
+        quiz_id = client.post('/api/quiz/', json={
+            **topic,
+            "difficulty": "Easy",
+            "questions": [{"question_text": f"Q{i}", "options": ["Right", "Wrong"], "correct_option_index": 0} for i in range(count)]
+        }, headers=headers).get_json()['quiz_id']
+        created.append((quiz_id, [q['id'] for q in client.get(f'/api/quiz/{quiz_id}').get_json()['questions']]))
+    return created
+
+def answers(question_ids, correct):
+    return [{"question_id": qid, "selected_answer": "Right" if i < correct else "Wrong"} for i, qid in enumerate(question_ids)]
+
+def get_stats(client, headers):
+    response = client.get('/api/profile/', query_string={"include": "stats"}, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['stats']
+
+def test_stats_follow_submitted_results(client, app, quizzes):
+    (history, history_qs), (trivia, trivia_qs) = quizzes
+    headers = setup_auth_headers(app)
+    assert 'stats' not in client.get('/api/profile/', headers=headers).get_json()
+    assert get_stats(client, headers)['attempts'] == 0
+
+    client.post('/api/result/', json={"quiz_id": history, "answers": answers(history_qs, 2)}, headers=headers)
+    client.post('/api/result/', json={"quiz_id": history, "answers": answers(history_qs, 1)}, headers=headers)
+    client.post('/api/result/batch', json={"results": [
+        {"quiz_id": trivia, "answers": answers(trivia_qs, 1)}
+    ]}, headers=headers)
+
+    stats = get_stats(client, headers)
+    assert (stats['attempts'], stats['total_score'], stats['total_questions']) == (3, 4, 8)
+    assert stats['best_percentage'] == 100.0
+    assert stats['average_percentage'] == round((100 + 50 + 25) / 3, 2)
+    assert [(t['topic_name'], t['attempts'], t['average_percentage']) for t in stats['topics']] == [("History", 2, 75.0)]
+
+def test_write_behind_updates_stats(client, app, quizzes):
+    from app.extensions import result_writer
+
+    (history, history_qs), _ = quizzes
+    app.config['RESULT_WRITE_BEHIND'] = True
+    headers = setup_auth_headers(app)
+    client.post('/api/result/', json={"quiz_id": history, "answers": answers(history_qs, 1)}, headers=headers)
+    result_writer.shutdown(app)
+
+    assert get_stats(client, headers)['topics'][0]['total_score'] == 1
+
+def test_rebuild_command_matches_incremental_stats(client, app, quizzes):
+    from app.extensions import db
+    from app.models import Result
+
+    (history, history_qs), (trivia, trivia_qs) = quizzes
+    headers = setup_auth_headers(app)
+    other = setup_auth_headers(app, user_id=2, username="other")
+    client.post('/api/result/', json={"quiz_id": history, "answers": answers(history_qs, 1)}, headers=headers)
+    client.post('/api/result/', json={"quiz_id": trivia, "answers": answers(trivia_qs, 3)}, headers=headers)
+    client.post('/api/result/', json={"quiz_id": trivia, "answers": answers(trivia_qs, 4)}, headers=other)
+    incremental = get_stats(client, headers)
+
+    # Written behind the rollup's back, e.g. restored from a backup
+    db.session.add(Result(user_id=2, quiz_id=history, score=2, total_questions=2))
+    db.session.commit()
+
+    output = app.test_cli_runner().invoke(args=['rebuild-user-stats']).output
+    assert "4 user_stats rows rebuilt" in output
+    assert get_stats(client, headers) == incremental
+    assert get_stats(client, other)['attempts'] == 2
+
+    app.test_cli_runner().invoke(args=['rebuild-user-stats', '--user', '1'])
+    assert get_stats(client, headers) == incremental
+
+def test_deleting_a_quiz_takes_its_results_out_of_the_stats(client, app, quizzes):
+    (history, history_qs), (trivia, trivia_qs) = quizzes
+    headers = setup_auth_headers(app)
+    other = setup_auth_headers(app, user_id=2, username="other")
+    client.post('/api/result/', json={"quiz_id": history, "answers": answers(history_qs, 2)}, headers=headers)
+    client.post('/api/result/', json={"quiz_id": trivia, "answers": answers(trivia_qs, 1)}, headers=headers)
+    client.post('/api/result/', json={"quiz_id": history, "answers": answers(history_qs, 1)}, headers=other)
+
+    assert client.delete(f'/api/quiz/{history}', headers=headers).status_code == 200
+
+    stats = get_stats(client, headers)
+    assert (stats['attempts'], stats['best_percentage'], stats['topics']) == (1, 25.0, [])
+    assert get_stats(client, other)['attempts'] == 0
+
+@pytest.mark.parametrize("dialect", ["sqlite", "postgresql", "mysql"])
+def test_upsert_is_built_for_each_dialect(app, dialect):
+    import datetime
+    from sqlalchemy.dialects import mysql, postgresql, sqlite
+    from app.user_stats import upsert_statement
+
+    delta = {"user_id": 1, "topic_id": 0, "attempts": 1, "total_score": 1, "total_questions": 2,
+             "best_percentage": 50.0, "percentage_sum": 50.0, "last_completed_at": datetime.datetime(2025, 1, 1)}
+    compiled = str(upsert_statement(dialect, [delta]).compile(
+        dialect={"sqlite": sqlite, "postgresql": postgresql, "mysql": mysql}[dialect].dialect()
+    ))
+    assert ("max(" if dialect == "sqlite" else "greatest(") in compiled
+    assert ("ON DUPLICATE KEY UPDATE" if dialect == "mysql" else "ON CONFLICT") in compiled
+
+def test_upsert_refuses_unknown_dialects(app):
+    from app.user_stats import upsert_statement
+
+    with pytest.raises(NotImplementedError):
+        upsert_statement("oracle", [])
@@ -0,0 +1,124 @@
+import pytest
+
+def setup_auth_headers(app, user_id=1, username="testuser", is_admin=False):
+    from app.models import User
+    from app.extensions import db
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        if not User.query.get(user_id):
+            user = User(id=user_id, username=username, email=f"{username}@test.com", password_hash="pw", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+
+        token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+
+def test_writes_bump_table_versions(app):
+    from app.extensions import db, table_versions
+    from app.models import Quiz, Question, Topic
+
+    before = table_versions.get(('topics', 'quizzes', 'questions'))
+
+    quiz = Quiz(custom_topic="History", difficulty="Easy", created_by_user_id=1)
+    quiz.questions.append(Question(question_text="Q1", options=["A", "B"], correct_option_index=0))
+    db.session.add(quiz)
+    db.session.commit()
+
+    after = table_versions.get(('topics', 'quizzes', 'questions'))
+    assert after['quizzes'][0] == before['quizzes'][0] + 1
+    assert after['questions'][0] == before['questions'][0] + 1
+    assert after['topics'] == before['topics']
+
+    # Bulk statements bypass the unit of work but are counted too
+    Question.query.filter_by(quiz_id=quiz.id).delete()
+    db.session.commit()
+    assert table_versions.get(('questions',))['questions'][0] == after['questions'][0] + 1
+
+    # Rolled back writes do not count
+    db.session.add(Topic(name="History"))
+    db.session.commit()
+    topics_before = table_versions.get(('topics',))
+    db.session.add(Topic(name="Science"))
+    db.session.flush()
+    db.session.rollback()
+    assert table_versions.get(('topics',)) == topics_before
+
+def test_topics_conditional_get(client, app):
+    from unittest.mock import patch
+
+    headers = setup_auth_headers(app, is_admin=True)
+    client.post('/api/topics/', json={"name": "History"}, headers=headers)
+
+    first = client.get('/api/topics/')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+
+    # A matching If-None-Match is answered without touching the view
+    with patch('app.api.topics.Topic') as mock_topic:
+        second = client.get('/api/topics/', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+    mock_topic.query.all.assert_not_called()
+
+    client.post('/api/topics/', json={"name": "Science"}, headers=headers)
+    third = client.get('/api/topics/', headers={'If-None-Match': etag})
+    assert third.status_code == 200
+    assert len(third.get_json()) == 2
+
+def test_quiz_detail_etag_changes_on_update(client, app):
+    headers = setup_auth_headers(app)
+    response = client.post('/api/quiz/', json={
+        "custom_topic": "History",
+        "difficulty": "Easy",
+        "questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]
+    }, headers=headers)
+    quiz_id = response.get_json()['quiz_id']
+
+    etag = client.get(f'/api/quiz/{quiz_id}').headers['ETag']
+    assert client.get(f'/api/quiz/{quiz_id}', headers={'If-None-Match': etag}).status_code == 304
+    # Different resources over the same tables have different ETags
+    assert client.get('/api/quiz/').headers['ETag'] != etag
+
+    client.put(f'/api/quiz/{quiz_id}', json={
+        "questions": [{"question_text": "Q2", "options": ["A", "B"], "correct_option_index": 1}]
+    }, headers=headers)
+    assert client.get(f'/api/quiz/{quiz_id}', headers={'If-None-Match': etag}).status_code == 200
+
+    # Errors carry no validators
+    assert 'ETag' not in client.get('/api/quiz/999').headers
+
+def test_quiz_detail_etag_only_follows_its_own_quiz(client, app):
+    from app.extensions import db
+    from app.models import Question, Topic
+
+    headers = setup_auth_headers(app, is_admin=True)
+    db.session.add(Topic(id=1, name="History"))
+    db.session.commit()
+    quiz = {"topic_id": 1, "difficulty": "Easy",
+            "questions": [{"question_text": "Q1", "options": ["A", "B"], "correct_option_index": 0}]}
+    quiz_id = client.post('/api/quiz/', json=quiz, headers=headers).get_json()['quiz_id']
+    etag = client.get(f'/api/quiz/{quiz_id}').headers['ETag']
+
+    # Writes to other quizzes leave it alone
+    other_id = client.post('/api/quiz/', json=dict(quiz, questions=[
+        {"question_text": "Other", "options": ["A", "B"], "correct_option_index": 0}
+    ]), headers=headers).get_json()['quiz_id']
+    client.patch(f'/api/quiz/{other_id}', json={"difficulty": "Hard"}, headers=headers)
+    Question.query.filter_by(quiz_id=other_id).update({"question_text": "Changed"})
+    db.session.commit()
+    assert client.get(f'/api/quiz/{quiz_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    # Bulk writes to its questions and a rename of its topic change it
+    Question.query.filter_by(quiz_id=quiz_id).update({"question_text": "Changed"})
+    db.session.commit()
+    response = client.get(f'/api/quiz/{quiz_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    client.put('/api/topics/1', json={"name": "World history"}, headers=headers)
+    response = client.get(f'/api/quiz/{quiz_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['topic_name'] == "World history"